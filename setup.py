@@ -9,6 +9,11 @@ import versioneer
 
 INSTALL_REQUIRES = ["strct", "numpy", "scipy", "statsmodels"]
 
+EXTRAS_REQUIRE = {
+    # out-of-core stationarization of Parquet files
+    "parquet": ["pyarrow"],
+}
+
 TEST_REQUIRES = [
     # testing and coverage
     "pytest",
@@ -17,6 +22,9 @@ TEST_REQUIRES = [
     # unmandatory dependencies of the package itself
     "pandas",
     "logzero",
+    "pyarrow",
+    "h5py",
+    "zarr",
     # to be able to run `python setup.py checkdocs`
     "collective.checkdocs",
     "pygments",
@@ -42,7 +50,10 @@ setuptools.setup(
     include_package_data=True,
     python_requires=">=3.6",
     install_requires=INSTALL_REQUIRES,
-    extras_require={"test": TEST_REQUIRES + INSTALL_REQUIRES},
+    extras_require={
+        "test": TEST_REQUIRES + INSTALL_REQUIRES,
+        **EXTRAS_REQUIRE,
+    },
     classifiers=[
         # Trove classifiers
         # (https://pypi.python.org/pypi?%3Aaction=list_classifiers)
@@ -1,5 +1,28 @@
 from .core import (  # noqa: F401
     simple_auto_stationarize,
+    stationarize_array,
+)
+from .cache import (  # noqa: F401
+    UnitRootCache,
+)
+from .state import (  # noqa: F401
+    UnitRootStateStore,
+)
+from .estimator import (  # noqa: F401
+    Stationarizer,
+)
+from .online import (  # noqa: F401
+    OnlineStationarizer,
+)
+from .monitor import (  # noqa: F401
+    StationarityMonitor,
+)
+from .rolling import (  # noqa: F401
+    rolling_stationarity,
+)
+from .outofcore import (  # noqa: F401
+    stationarize_chunked,
+    stationarize_parquet,
 )
 
 from ._version import get_versions
@@ -0,0 +1,565 @@
+"""Augmented Dickey-Fuller test engines operating on whole 2D arrays."""
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+
+SUPPORTED_REGRESSIONS = ("n", "c", "ct")
+SUPPORTED_AUTOLAGS = ("aic", "bic", "t-stat")
+
+# upper bound on the number of floats held by a single batch of stacked
+# design matrices; columns are processed in batches of at most this size
+MAX_BATCH_FLOATS = 2 ** 23
+
+
+def default_maxlag(nobs, regression="ct"):
+    """Returns the default maximal ADF lag used by statsmodels' adfuller.
+
+    Parameters
+    ----------
+    nobs : int
+        The length of the tested series.
+    regression : str, default "ct"
+        The deterministic terms included in the test regression.
+
+    Returns
+    -------
+    int
+        The maximal number of lagged differences to consider.
+    """
+    ntrend = _ntrend(regression)
+    # from Greene referencing Schwert 1989
+    maxlag = int(np.ceil(12.0 * np.power(nobs / 100.0, 1 / 4.0)))
+    maxlag = min(nobs // 2 - ntrend - 1, maxlag)
+    if maxlag < 0:
+        raise ValueError(
+            "sample size is too short to use selected regression component"
+        )
+    return maxlag
+
+
+def mackinnonp(teststat, regression="ct"):
+    """Vectorized MacKinnon approximate p-values for ADF test statistics.
+
+    Parameters
+    ----------
+    teststat : numpy.ndarray
+        ADF test statistics.
+    regression : str, default "ct"
+        The deterministic terms included in the test regression.
+
+    Returns
+    -------
+    numpy.ndarray
+        The approximate p-value of each test statistic, computed exactly as
+        statsmodels.tsa.adfvalues.mackinnonp does for a single statistic.
+    """
+    # deferred, as importing scipy.stats and statsmodels is slow
+    from scipy.stats import norm
+    from statsmodels.tsa.adfvalues import (
+        _tau_maxs,
+        _tau_mins,
+        _tau_stars,
+        _tau_smallps,
+        _tau_largeps,
+    )
+
+    teststat = np.asarray(teststat, dtype=float)
+    small = np.polyval(_tau_smallps[regression][0][::-1], teststat)
+    large = np.polyval(_tau_largeps[regression][0][::-1], teststat)
+    pvals = norm.cdf(
+        np.where(teststat <= _tau_stars[regression][0], small, large)
+    )
+    pvals = np.where(teststat > _tau_maxs[regression][0], 1.0, pvals)
+    return np.where(teststat < _tau_mins[regression][0], 0.0, pvals)
+
+
+def _ntrend(regression):
+    if regression not in SUPPORTED_REGRESSIONS:
+        raise ValueError(
+            f"Unsupported regression {regression}; supported values are "
+            f"{SUPPORTED_REGRESSIONS}."
+        )
+    return len(regression) if regression != "n" else 0
+
+
+def _deterministic_basis(nobs, regression):
+    """An orthonormal basis of the deterministic regressors of a sample."""
+    if regression == "n":
+        return np.empty((nobs, 0))
+    terms = [np.ones(nobs)]
+    if regression == "ct":
+        terms.append(np.arange(1, nobs + 1, dtype=float))
+    basis, _ = np.linalg.qr(np.column_stack(terms))
+    return basis
+
+
+def _partial_out(basis, arr):
+    """Residualizes the columns of arr on the given orthonormal basis."""
+    if basis.shape[1] == 0:
+        return arr
+    shape = arr.shape
+    flat = arr.reshape(shape[0], -1)
+    return (flat - basis @ (basis.T @ flat)).reshape(shape)
+
+
+def _stacked_design(X, dX, nlags, nobs):
+    """Stacks [level, dlag_1..dlag_nlags, diff] of all columns of X.
+
+    Returns an array of shape (nobs, ncols, nlags + 2), holding the lagged
+    level, the lagged differences and finally the regressand for the last
+    nobs observations of each column.
+    """
+    n = X.shape[0]
+    design = np.empty((nobs, X.shape[1], nlags + 2))
+    design[:, :, 0] = X[n - nobs - 1 : n - 1]
+    for lag in range(1, nlags + 1):
+        design[:, :, lag] = dX[n - 1 - nobs - lag : n - 1 - lag]
+    design[:, :, -1] = dX[n - 1 - nobs :]
+    return design
+
+
+def _triangular(X, dX, nlags, nobs, regression):
+    """Stacked triangular factors of the trend-free ADF design.
+
+    The deterministic terms are partialled out of every regressor and of the
+    regressand using a single basis shared by all columns (Frisch-Waugh-
+    Lovell), so only the column-specific regressors remain. The returned
+    array holds the R factor of the QR decomposition of the design of each
+    column, with the regressand as its last column.
+    """
+    design = _stacked_design(X, dX, nlags, nobs)
+    design = _partial_out(_deterministic_basis(nobs, regression), design)
+    return np.linalg.qr(design.transpose(1, 0, 2), mode="r")
+
+
+def _nested_ssrs(r):
+    """Residual sums of squares of all the nested models of an R factor.
+
+    Given the (possibly stacked) R factor of the QR decomposition of
+    [x_1, ..., x_p, y], entry k along the last axis of the result holds the
+    SSR of the regression of y on x_1, ..., x_k, for k = 0, ..., p.
+    """
+    squares = r[..., :, -1] ** 2
+    return np.cumsum(squares[..., ::-1], axis=-1)[..., ::-1]
+
+
+def _nested_last_tvalues(r, ssrs, nobs):
+    """t-values of the last regressor of all the nested models of an R factor.
+
+    Entry k - 1 along the last axis holds the t-value of x_k in the
+    regression of y on x_1, ..., x_k, for k = 1, ..., p.
+    """
+    diag = np.diagonal(r, axis1=-2, axis2=-1)[..., :-1]
+    dofs = nobs - np.arange(1, diag.shape[-1] + 1)
+    sigmas = np.sqrt(ssrs[..., 1:] / dofs)
+    return np.sign(diag) * r[..., :-1, -1] / sigmas
+
+
+def _best_lags(ssrs, tlast, nobs, ntrend, autolag):
+    """Selects the lag minimizing the given criterion.
+
+    ssrs and tlast hold, along their last axis, the SSR and the t-value of
+    the last regressor of the models using 0, ..., maxlag lags, all fitted
+    on the same sample of nobs observations, as in statsmodels. Returns the
+    best lag and the best criterion value.
+    """
+    lags = np.arange(ssrs.shape[-1])
+    if autolag == "t-stat":
+        # stop = stats.norm.ppf(.95)
+        stop = 1.6448536269514722
+        significant = np.abs(tlast[..., 1:]) >= stop
+        # the longest lag with a significant last lag, if any, or no lag
+        last = significant.shape[-1] - np.argmax(significant[..., ::-1], -1)
+        bestlag = np.where(significant.any(axis=-1), last, 0)
+        icbest = np.abs(np.take_along_axis(tlast, bestlag[..., None], -1))
+        return bestlag, icbest[..., 0]
+    llf = -nobs / 2 * (np.log(2 * np.pi) + np.log(ssrs / nobs) + 1)
+    nparams = ntrend + 1 + lags
+    if autolag == "aic":
+        ics = -2 * llf + 2 * nparams
+    else:
+        ics = -2 * llf + np.log(nobs) * nparams
+    bestlag = np.argmin(ics, axis=-1)
+    return bestlag, np.min(ics, axis=-1)
+
+
+def _tvalues(r, index, nobs):
+    """t-values of the index-th regressor in the regressions of R factors.
+
+    r holds the (possibly stacked) R factors of [x_1, ..., x_p, y].
+    """
+    inv = np.linalg.inv(r[..., :-1, :-1])
+    beta = np.einsum("...ij,...j->...i", inv, r[..., :-1, -1])
+    dof = nobs - inv.shape[-1]
+    sigma2 = r[..., -1, -1] ** 2 / dof
+    row = inv[..., index, :]
+    variance = sigma2 * np.einsum("...i,...i->...", row, row)
+    return beta[..., index] / np.sqrt(variance)
+
+
+def _select_lags(X, dX, maxlag, regression, autolag):
+    """Selects the lag minimizing the given criterion for every column.
+
+    A single factorization of the maximal lag design of each column yields
+    the criteria of all the nested models with fewer lags.
+    """
+    nobs = X.shape[0] - 1 - maxlag
+    ntrend = _ntrend(regression)
+    r = _triangular(X, dX, maxlag, nobs, regression)
+    ssrs = _nested_ssrs(r)
+    # deterministic terms were partialled out, but still cost a dof each
+    tlast = _nested_last_tvalues(r, ssrs, nobs - ntrend)
+    return _best_lags(ssrs[:, 1:], tlast, nobs, ntrend, autolag)[0]
+
+
+def _adf_stats(X, dX, usedlag, regression):
+    """Computes ADF statistics, fitting columns sharing a lag together."""
+    n = X.shape[0]
+    ntrend = _ntrend(regression)
+    adfstat = np.empty(X.shape[1])
+    for lag in np.unique(usedlag):
+        cols = np.flatnonzero(usedlag == lag)
+        nobs = n - 1 - lag
+        r = _triangular(X[:, cols], dX[:, cols], lag, nobs, regression)
+        adfstat[cols] = _tvalues(r, 0, nobs - ntrend)
+    return adfstat
+
+
+def _nonfinite_columns(X):
+    """Indices of the columns of a 2D array holding NaN or infinite values."""
+    return np.flatnonzero(~np.isfinite(X).all(axis=0))
+
+
+def _batch_size(nobs, maxlag, ncols):
+    return max(1, min(ncols, MAX_BATCH_FLOATS // (nobs * (maxlag + 2))))
+
+
+def adfuller_batch(X, maxlag=None, regression="ct", autolag="AIC"):
+    """Runs the Augmented Dickey-Fuller test on all columns of a 2D array.
+
+    The test is equivalent to running statsmodels' adfuller on each column,
+    but every regression is performed for all columns at once using stacked
+    linear algebra. Deterministic terms are shared by all columns of equal
+    length, and are thus partialled out using a single projection.
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        A 2D array of shape (time, variables) with no missing values.
+    maxlag : int, optional
+        The maximal lag included in the test. If not given, the default of
+        statsmodels' adfuller, 12*(nobs/100)^{1/4}, is used.
+    regression : str, default "ct"
+        Deterministic terms to include in the regression: "n" for none, "c"
+        for a constant only and "ct" for a constant and a linear trend.
+    autolag : str, default "AIC"
+        The method used to select the lag length, out of "AIC", "BIC" and
+        "t-stat". If None, maxlag lags are used for all columns.
+
+    Returns
+    -------
+    adfstat : numpy.ndarray
+        The test statistic of each column.
+    pvalue : numpy.ndarray
+        The MacKinnon approximate p-value of each column.
+    usedlag : numpy.ndarray
+        The number of lags used for each column.
+    nobs : numpy.ndarray
+        The number of observations used in the regression of each column.
+    """
+    X = np.asarray(X, dtype=float)
+    if X.ndim == 1:
+        X = X[:, None]
+    if X.ndim != 2:
+        raise ValueError("X must be a 1D or a 2D array!")
+    n, ncols = X.shape
+    ntrend = _ntrend(regression)
+    if maxlag is None:
+        maxlag = default_maxlag(n, regression)
+    elif maxlag > n // 2 - ntrend - 1:
+        raise ValueError(
+            "maxlag must be less than (nobs/2 - 1 - ntrend) "
+            "where n trend is the number of included "
+            "deterministic regressors"
+        )
+    if autolag is not None:
+        autolag = autolag.lower()
+        if autolag not in SUPPORTED_AUTOLAGS:
+            raise ValueError(
+                f"Information Criterion {autolag} not understood."
+            )
+    missing = _nonfinite_columns(X)
+    if len(missing) > 0:
+        raise ValueError(
+            f"Invalid input, columns {missing.tolist()} have missing or "
+            "infinite values"
+        )
+    constant = np.flatnonzero(X.max(axis=0) == X.min(axis=0))
+    if len(constant) > 0:
+        raise ValueError(
+            f"Invalid input, columns {constant.tolist()} are constant"
+        )
+    usedlag = np.full(ncols, maxlag, dtype=int)
+    adfstat = np.empty(ncols)
+    batch = _batch_size(n, maxlag, ncols)
+    for start in range(0, ncols, batch):
+        cols = slice(start, start + batch)
+        Xb = X[:, cols]
+        dXb = np.diff(Xb, axis=0)
+        if autolag is not None:
+            usedlag[cols] = _select_lags(Xb, dXb, maxlag, regression, autolag)
+        adfstat[cols] = _adf_stats(Xb, dXb, usedlag[cols], regression)
+    pvalue = mackinnonp(adfstat, regression=regression)
+    return adfstat, pvalue, usedlag, n - 1 - usedlag
+
+
+def _precondition(x, dx, regression):
+    """Removes the deterministic terms' fit from the level and differences.
+
+    The regressand and the lagged differences are affine in the differences
+    buffer, and the lagged level in the level buffer. Subtracting the fit of
+    the deterministic terms from each buffer thus only shifts the regression
+    within the span of those terms, leaving the residuals and the t-values of
+    the stochastic regressors unchanged. It does, however, remove the large
+    common components that would otherwise dominate the cross-products.
+    """
+    return tuple(
+        _partial_out(_deterministic_basis(len(buf), regression), buf)
+        for buf in (x, dx)
+    )
+
+
+def _lag_windows(dx, nlags, start, stop):
+    """A zero-copy view of dx and its nlags lags, for dx[start:stop].
+
+    Column j of row i of the view holds dx[start + i - j], so the first
+    column is the regressand and column j is its j-th lagged difference.
+    All columns share the memory of dx.
+    """
+    base = dx[start - nlags : stop]
+    stride = base.strides[0]
+    return as_strided(
+        base[nlags:],
+        shape=(stop - start, nlags + 1),
+        strides=(stride, -stride),
+        writeable=False,
+    )
+
+
+def _dense_regressors(x, ndiff, start, stop, regression):
+    """The deterministic terms and the lagged level, for dx[start:stop].
+
+    The trend is an affine function of time common to all rows of a series
+    with ndiff differences.
+    """
+    ntrend = _ntrend(regression)
+    dense = np.empty((stop - start, ntrend + 1))
+    if ntrend > 0:
+        dense[:, 0] = 1
+    if ntrend > 1:
+        dense[:, 1] = np.arange(start, stop) / ndiff - 0.5
+    dense[:, ntrend] = x[start:stop]
+    return dense
+
+
+def _series_design(x, dx, nlags, start, stop, regression):
+    """The dense ADF design of a single series, for dx[start:stop].
+
+    Columns are the deterministic terms, the lagged level, the nlags lagged
+    differences and finally the regressand.
+    """
+    windows = _lag_windows(dx, nlags, start, stop)
+    return np.column_stack(
+        [
+            _dense_regressors(x, len(dx), start, stop, regression),
+            windows[:, 1:],
+            windows[:, 0],
+        ]
+    )
+
+
+def _series_gram(x, dx, nlags, start, stop, regression):
+    """Cross-products of the ADF design of a single series, for dx[start:stop].
+
+    Equals the Gram matrix of the dense design returned by _series_design,
+    but never materializes the lagged differences: they are strided views
+    over dx, and since they share that single buffer, each diagonal of their
+    cross-products follows from its first entry by adding the element that
+    enters the window and removing the one that leaves it.
+    """
+    windows = _lag_windows(dx, nlags, start, stop)
+    # the deterministic terms and lagged level are O(nobs) to materialize
+    dense = _dense_regressors(x, len(dx), start, stop, regression)
+    k = dense.shape[1]
+    order = np.r_[np.arange(1, nlags + 1), 0]
+    gram = np.empty((k + nlags + 1, k + nlags + 1))
+    gram[:k, :k] = dense.T @ dense
+    gram[:k, k:] = np.einsum("ti,tj->ij", dense, windows)[:, order]
+    gram[k:, :k] = gram[:k, k:].T
+    lagged = np.empty((nlags + 1, nlags + 1))
+    lagged[0] = np.einsum("tj,t->j", windows, windows[:, 0])
+    for offset in range(nlags + 1):
+        m = np.arange(nlags - offset)
+        enters = dx[start - 1 - m] * dx[start - 1 - m - offset]
+        leaves = dx[stop - 1 - m] * dx[stop - 1 - m - offset]
+        diag = lagged[0, offset] + np.cumsum(enters - leaves)
+        lagged[m + 1, m + 1 + offset] = diag
+        lagged[m + 1 + offset, m + 1] = diag
+    lagged[:, 0] = lagged[0]
+    gram[k:, k:] = lagged[np.ix_(order, order)]
+    return gram
+
+
+def _padded_design(x, positions, index, nlags):
+    """Trend ADF design rows of several series, padding lags with zeros.
+
+    Rows regress dx[p] on [1, i, x[p], dx[p - 1], ..., dx[p - nlags]] for
+    each position p in positions of the level buffer x, of shape (time,
+    series), with i the time step given by index. Lagged differences
+    preceding the start of x are set to 0, so rows can start anywhere, as
+    long as regressions only use the lags available to them. The result has
+    shape (rows, series, nlags + 4), the regressand coming last.
+    """
+    dx = np.diff(x, axis=0)
+    design = np.empty((len(index), x.shape[1], nlags + 4))
+    design[:, :, 0] = 1
+    design[:, :, 1] = index[:, None]
+    design[:, :, 2] = x[positions]
+    if nlags:
+        # windows of dx[p - nlags], ..., dx[p - 1], in reverse
+        padded = np.concatenate([np.zeros((nlags, x.shape[1])), dx])
+        windows = _row_windows(padded, nlags)
+        design[:, :, 3:-1] = windows[positions][..., ::-1]
+    design[:, :, -1] = dx[positions]
+    return design
+
+
+def _row_windows(arr, width):
+    """Read-only windows of width consecutive rows of a 2D array.
+
+    Returns a strided view of shape (rows - width + 1, columns, width),
+    whose entry [i, j, w] is arr[i + w, j].
+    """
+    rows, cols = arr.shape
+    row_stride, col_stride = arr.strides
+    return as_strided(
+        arr,
+        shape=(rows - width + 1, cols, width),
+        strides=(row_stride, col_stride, row_stride),
+        writeable=False,
+    )
+
+
+def _cholesky_factor(gram):
+    """Upper triangular factors R of (stacked) gram = R'R, with scaling."""
+    scale = np.sqrt(np.diagonal(gram, axis1=-2, axis2=-1))
+    chol = np.linalg.cholesky(
+        gram / (scale[..., :, None] * scale[..., None, :])
+    )
+    return np.swapaxes(chol, -1, -2) * scale[..., None, :]
+
+
+def adfuller_incremental(x, maxlag=None, regression="ct", autolag="AIC"):
+    """Augmented Dickey-Fuller test with incremental lag selection.
+
+    A drop-in replacement for statsmodels' adfuller. Instead of fitting a
+    separate regression for every candidate lag, a single Cholesky
+    factorization of the cross-products of the design with the maximal
+    number of lags is computed. The residual sums of squares - and thus the
+    information criteria - and the t-values of the last lag of all models
+    with fewer lags are then read directly off its triangular factor. The
+    regression with the selected lag, which uses more observations, is
+    obtained by updating the cross-products with the additional rows rather
+    than by refitting.
+
+    Lagged differences are never materialized: they are strided views over
+    the single differences buffer, so memory use is linear in the length of
+    the series, regardless of the number of lags.
+
+    Parameters
+    ----------
+    x : array_like
+        The 1D series to test, with no missing values.
+    maxlag : int, optional
+        The maximal lag included in the test. If not given, the default of
+        statsmodels' adfuller, 12*(nobs/100)^{1/4}, is used.
+    regression : str, default "ct"
+        Deterministic terms to include in the regression: "n" for none, "c"
+        for a constant only and "ct" for a constant and a linear trend.
+    autolag : str, default "AIC"
+        The method used to select the lag length, out of "AIC", "BIC" and
+        "t-stat". If None, maxlag lags are used.
+
+    Returns
+    -------
+    adfstat : float
+        The test statistic.
+    pvalue : float
+        MacKinnon's approximate p-value.
+    usedlag : int
+        The number of lags used.
+    nobs : int
+        The number of observations used in the regression.
+    critvalues : dict
+        Critical values for the test statistic at the 1%, 5% and 10% levels.
+    icbest : float
+        The best information criterion value; only returned if autolag is
+        not None.
+    """
+    x = np.asarray(x, dtype=float)
+    if x.ndim != 1:
+        raise ValueError("x must be a 1D array!")
+    if not np.isfinite(x).all():
+        raise ValueError("Invalid input, x has missing or infinite values")
+    if x.max() == x.min():
+        raise ValueError("Invalid input, x is constant")
+    n = x.shape[0]
+    ntrend = _ntrend(regression)
+    if maxlag is None:
+        maxlag = default_maxlag(n, regression)
+    elif maxlag > n // 2 - ntrend - 1:
+        raise ValueError(
+            "maxlag must be less than (nobs/2 - 1 - ntrend) "
+            "where n trend is the number of included "
+            "deterministic regressors"
+        )
+    x, dx = _precondition(x, np.diff(x), regression)
+    gram = _series_gram(x, dx, maxlag, maxlag, n - 1, regression)
+    r = _cholesky_factor(gram)
+    ssrs = _nested_ssrs(r)
+    usedlag = maxlag
+    icbest = None
+    if autolag is not None:
+        autolag = autolag.lower()
+        if autolag not in SUPPORTED_AUTOLAGS:
+            raise ValueError(
+                f"Information Criterion {autolag} not understood."
+            )
+        tlast = _nested_last_tvalues(r, ssrs, n - 1 - maxlag)
+        usedlag, icbest = _best_lags(
+            ssrs[ntrend + 1 :], tlast[ntrend:], n - 1 - maxlag, ntrend, autolag
+        )
+        usedlag = int(usedlag)
+    r_used = r
+    if usedlag < maxlag:
+        # the regression with fewer lags starts earlier, so the
+        # cross-products of its regressors are those of the common sample
+        # updated by the rows of the additional observations
+        cols = np.r_[np.arange(ntrend + 1 + usedlag), -1]
+        extra = _series_design(x, dx, usedlag, usedlag, maxlag, regression)
+        r_used = _cholesky_factor(gram[np.ix_(cols, cols)] + extra.T @ extra)
+    nobs = n - 1 - usedlag
+    adfstat = float(_tvalues(r_used, ntrend, nobs))
+    pvalue = float(mackinnonp(adfstat, regression=regression))
+    from statsmodels.tsa.adfvalues import mackinnoncrit
+
+    critvalues = mackinnoncrit(N=1, regression=regression, nobs=nobs)
+    critvalues = {
+        "1%": critvalues[0],
+        "5%": critvalues[1],
+        "10%": critvalues[2],
+    }
+    if autolag is None:
+        return adfstat, pvalue, usedlag, nobs, critvalues
+    return adfstat, pvalue, usedlag, nobs, critvalues, float(icbest)
@@ -0,0 +1,209 @@
+"""Caching of per-column unit root test results."""
+
+import os
+import pickle
+import hashlib
+import tempfile
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+
+DEF_MAXSIZE = 100000
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+def column_key(col, test, **params):
+    """Returns a cache key for running the given test on the given column.
+
+    Parameters
+    ----------
+    col : numpy.ndarray
+        A 1D array holding the tested series.
+    test : str
+        The name of the test.
+    **params
+        The parameters of the test, like regression and lag settings.
+
+    Returns
+    -------
+    str
+        A hex digest of the column's bytes, dtype and length, and of the test
+        name and parameters.
+    """
+    col = np.ascontiguousarray(col)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(col.data)
+    settings = (col.dtype.str, len(col), test, sorted(params.items()))
+    digest.update(repr(settings).encode())
+    return digest.hexdigest()
+
+
+def load_pickle(fpath):
+    """Loads a pickled object from a file, or returns None if unreadable.
+
+    Missing, truncated and otherwise corrupt files are all treated as
+    missing, so a file being written by another process is never fatal.
+
+    Parameters
+    ----------
+    fpath : str
+        The path of the file.
+
+    Returns
+    -------
+    object
+        The unpickled object, or None if the file could not be read.
+    """
+    try:
+        with open(fpath, "rb") as f:
+            return pickle.load(f)
+    except (
+        OSError,
+        EOFError,
+        pickle.UnpicklingError,
+        # raised by unpickling foreign or corrupt data, as documented by
+        # the pickle module
+        ValueError,
+        AttributeError,
+        ImportError,
+        IndexError,
+    ):
+        return None
+
+
+def dump_pickle(obj, fpath):
+    """Pickles an object to a file atomically.
+
+    The object is written to a temporary file in the same directory, which
+    then replaces fpath, so concurrent readers see either the previous file
+    or the complete new one.
+
+    Parameters
+    ----------
+    obj : object
+        A picklable object.
+    fpath : str
+        The path of the file.
+    """
+    fd, tmp_fpath = tempfile.mkstemp(
+        suffix=".tmp", dir=os.path.dirname(fpath)
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(obj, f)
+        os.replace(tmp_fpath, fpath)
+    except BaseException:
+        os.remove(tmp_fpath)
+        raise
+
+
+class UnitRootCache(object):
+    """An LRU cache of unit root test results, keyed by column content.
+
+    Results are kept in memory, with least recently used entries evicted
+    once maxsize entries are stored. If a directory is given, results are
+    also persisted to it, and looked up there on in-memory misses, so they
+    can be shared across processes and runs. Files are replaced atomically,
+    and unreadable ones count as misses.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        The maximal number of results kept in memory. Defaults to 100000.
+    cache_dir : str, optional
+        A directory to persist results to. If not given, results are only
+        kept in memory.
+    """
+
+    def __init__(self, maxsize=None, cache_dir=None):
+        if maxsize is None:
+            maxsize = DEF_MAXSIZE
+        self.maxsize = maxsize
+        if cache_dir is not None:
+            cache_dir = os.path.expanduser(cache_dir)
+            os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+
+    def _fpath(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def _store(self, key, result):
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+    def get(self, key):
+        """Returns the result stored under the given key, or None.
+
+        Parameters
+        ----------
+        key : str
+            A key, as returned by column_key.
+
+        Returns
+        -------
+        object
+            The stored result, or None if no result is stored under key.
+        """
+        try:
+            result = self._results[key]
+            self._results.move_to_end(key)
+            self.hits += 1
+            return result
+        except KeyError:
+            pass
+        if self.cache_dir is not None:
+            result = load_pickle(self._fpath(key))
+            if result is not None:
+                self._store(key, result)
+                self.hits += 1
+                return result
+        self.misses += 1
+        return None
+
+    def set(self, key, result):
+        """Stores the given result under the given key.
+
+        Parameters
+        ----------
+        key : str
+            A key, as returned by column_key.
+        result : object
+            A picklable test result.
+        """
+        self._store(key, result)
+        if self.cache_dir is not None:
+            dump_pickle(result, self._fpath(key))
+
+    def clear(self):
+        """Clears all in-memory results and resets the hit/miss counters.
+
+        Results persisted to disk are kept.
+        """
+        self._results.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def cache_info(self):
+        """Returns hit and miss counts, and the maximal and current sizes."""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self))
+
+    def __len__(self):
+        return len(self._results)
+
+
+_DEFAULT_CACHE = None
+
+
+def get_default_cache():
+    """Returns the in-memory cache shared by calls using cache=True."""
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        _DEFAULT_CACHE = UnitRootCache()
+    return _DEFAULT_CACHE
@@ -0,0 +1,348 @@
+"""Monte Carlo calibration of the joint ADF/KPSS decision rule.
+
+Replicate experiments each stationarize a synthetic panel holding series of
+known process types. Replicates are generated and tested in batches: every
+batch is one wide panel, tested once with the given backend, after which
+the rule is applied under every combination of alpha and multiple testing
+method, which is cheap. Batches run over a process pool, each drawing from
+its own child of a root seed sequence, so results do not depend on the
+number of jobs.
+"""
+
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .core import (
+    DEF_ALPHA,
+    DEF_MULTITEST,
+    CONCLUSIONS,
+    Backend,
+    SimpleConclusion,
+    multitest_conclusions,
+    run_unit_root_tests,
+)
+from .parallel import effective_n_jobs
+from .synthetic import Process, PROCESSES, process_panel
+
+
+DEF_BACKEND = Backend.VECTORIZED
+# the number of replicate experiments generated and tested together
+DEF_BATCH_SIZE = 50
+
+# processes for which the null hypothesis of each test holds
+ADF_H0_PROCESSES = [Process.UNIT_ROOT, Process.TREND_UNIT_ROOT]
+KPSS_H0_PROCESSES = [Process.WHITE_NOISE, Process.TREND_STATIONARY]
+
+# the conclusion leading to the right transformations for each process
+EXPECTED_CONCLUSIONS = {
+    Process.WHITE_NOISE: SimpleConclusion.TREND_STATIONARY,
+    Process.TREND_STATIONARY: SimpleConclusion.TREND_STATIONARY,
+    Process.UNIT_ROOT: SimpleConclusion.UNIT_ROOT,
+    Process.TREND_UNIT_ROOT: SimpleConclusion.NO_REJECTION,
+}
+
+
+def _calibration_batch(
+    seed_seq,
+    replicates,
+    steps,
+    columns_per_process,
+    alphas,
+    multitests,
+    backend,
+    **kwargs,
+):
+    """Runs a batch of replicate experiments, returning summed counts."""
+    rng = np.random.default_rng(seed_seq)
+    ncols = sum(columns_per_process.values())
+    X = np.empty((steps, replicates * ncols), order="F")
+    for r in range(replicates):
+        _, processes = process_panel(
+            steps,
+            columns_per_process,
+            random_state=rng,
+            out=X[:, r * ncols : (r + 1) * ncols],
+            **kwargs,
+        )
+    process_codes = np.array([PROCESSES.index(p) for p in processes])
+    # tests run once for all replicates, and all settings
+    _, adf_pvals, _, kpss_pvals = run_unit_root_tests(X, backend)
+    adf_pvals = adf_pvals.reshape(replicates, ncols)
+    kpss_pvals = kpss_pvals.reshape(replicates, ncols)
+    shape = (len(alphas), len(multitests), len(PROCESSES))
+    rejections = np.zeros(shape + (2,), dtype=int)
+    raw_rejections = np.zeros((len(alphas), len(PROCESSES), 2), dtype=int)
+    conclusions = np.zeros(shape + (len(CONCLUSIONS),), dtype=int)
+    alphas = np.asarray(alphas, dtype=float)
+    # raw p-values are rejected as corrected ones are, at most alpha
+    for i, alpha in enumerate(alphas):
+        raw = np.stack(
+            [(adf_pvals <= alpha).sum(0), (kpss_pvals <= alpha).sum(0)],
+            axis=1,
+        )
+        np.add.at(raw_rejections[i], process_codes, raw)
+    for j, method in enumerate(multitests):
+        # replicates are corrected apart, each under all alphas at once
+        sweeps = [
+            multitest_conclusions(adf, kpss, alphas, method)
+            for adf, kpss in zip(adf_pvals, kpss_pvals)
+        ]
+        # of shape (alphas, replicates, columns)
+        adf_reject, kpss_reject, codes = (
+            np.stack([sweep[field] for sweep in sweeps], axis=1)
+            for field in ("adf_rejections", "kpss_rejections", "conclusions")
+        )
+        for i in range(len(alphas)):
+            np.add.at(
+                rejections[i, j],
+                process_codes,
+                np.stack(
+                    [adf_reject[i].sum(0), kpss_reject[i].sum(0)], axis=1
+                ),
+            )
+            np.add.at(
+                conclusions[i, j],
+                (np.tile(process_codes, replicates), codes[i].ravel()),
+                1,
+            )
+    return rejections, raw_rejections, conclusions
+
+
+class CalibrationResults(object):
+    """Empirical behaviour of the joint ADF/KPSS rule per setting.
+
+    Attributes
+    ----------
+    replicates : int
+        The number of replicate experiments.
+    steps : int
+        The length of every generated series.
+    alphas : list of float
+        The calibrated alpha values.
+    multitests : list of str
+        The calibrated multiple testing methods.
+    processes : list of str
+        The process types, as values of stationarizer.synthetic.Process.
+    series_counts : numpy.ndarray
+        The number of series generated of each process type.
+    rejection_rates : numpy.ndarray
+        An array of shape (alphas, multitests, processes, 2) holding the
+        rates at which the ADF and KPSS null hypotheses were rejected, after
+        multiple testing correction, per process type. These are empirical
+        sizes for processes satisfying the null hypothesis of the test, and
+        empirical powers for the others.
+    raw_rejection_rates : numpy.ndarray
+        An array of shape (alphas, processes, 2) holding the same rates
+        before multiple testing correction, rejecting p-values of at most
+        alpha, as corrected ones are.
+    confusion : numpy.ndarray
+        An array of shape (alphas, multitests, processes, conclusions)
+        holding the rate of each conclusion, ordered as in
+        stationarizer.core.CONCLUSIONS, per process type.
+    """
+
+    def __init__(
+        self,
+        replicates,
+        steps,
+        alphas,
+        multitests,
+        series_counts,
+        rejections,
+        raw_rejections,
+        conclusions,
+    ):
+        self.replicates = replicates
+        self.steps = steps
+        self.alphas = list(alphas)
+        self.multitests = list(multitests)
+        self.processes = list(PROCESSES)
+        self.series_counts = series_counts
+        counts = np.maximum(series_counts, 1)[:, None]
+        self.rejection_rates = rejections / counts
+        self.raw_rejection_rates = raw_rejections / counts
+        self.confusion = conclusions / counts
+
+    def confusion_matrix(self, alpha, multitest):
+        """Returns the conclusion rates of each process type for a setting.
+
+        Parameters
+        ----------
+        alpha : float
+            One of the calibrated alpha values.
+        multitest : str
+            One of the calibrated multiple testing methods.
+
+        Returns
+        -------
+        numpy.ndarray
+            An array of shape (processes, conclusions), with rows ordered as
+            processes and columns as stationarizer.core.CONCLUSIONS.
+        """
+        i = self.alphas.index(alpha)
+        j = self.multitests.index(multitest)
+        return self.confusion[i, j]
+
+    def accuracy(self, alpha, multitest):
+        """Returns, per process type, the rate of the expected conclusion.
+
+        See EXPECTED_CONCLUSIONS for the conclusion expected of each process
+        type.
+        """
+        matrix = self.confusion_matrix(alpha, multitest)
+        expected = [
+            CONCLUSIONS.index(EXPECTED_CONCLUSIONS[p]) for p in self.processes
+        ]
+        return matrix[np.arange(len(self.processes)), expected]
+
+    def records(self):
+        """Returns the results as JSON-serializable records.
+
+        Returns
+        -------
+        list of dict
+            A record per alpha, multiple testing method and process type,
+            with rejection rates before and after correction, whether each
+            null hypothesis holds for the process, the rate of each
+            conclusion and the rate of the expected conclusion.
+        """
+        records = []
+        for i, alpha in enumerate(self.alphas):
+            for j, multitest in enumerate(self.multitests):
+                accuracy = self.accuracy(alpha, multitest)
+                for k, process in enumerate(self.processes):
+                    if not self.series_counts[k]:
+                        continue
+                    records.append(
+                        {
+                            "alpha": alpha,
+                            "multitest": multitest,
+                            "process": process,
+                            "series": int(self.series_counts[k]),
+                            "adf_h0_true": process in ADF_H0_PROCESSES,
+                            "kpss_h0_true": process in KPSS_H0_PROCESSES,
+                            "adf_rejection_rate": float(
+                                self.rejection_rates[i, j, k, 0]
+                            ),
+                            "kpss_rejection_rate": float(
+                                self.rejection_rates[i, j, k, 1]
+                            ),
+                            "adf_raw_rejection_rate": float(
+                                self.raw_rejection_rates[i, k, 0]
+                            ),
+                            "kpss_raw_rejection_rate": float(
+                                self.raw_rejection_rates[i, k, 1]
+                            ),
+                            "conclusions": {
+                                conclusion: float(rate)
+                                for conclusion, rate in zip(
+                                    CONCLUSIONS, self.confusion[i, j, k]
+                                )
+                            },
+                            "accuracy": float(accuracy[k]),
+                        }
+                    )
+        return records
+
+
+def calibrate(
+    steps,
+    replicates,
+    alphas=None,
+    multitests=None,
+    columns_per_process=1,
+    backend=None,
+    n_jobs=None,
+    random_state=None,
+    batch_size=None,
+    **kwargs,
+):
+    """Estimates the size, power and conclusion rates of the decision rule.
+
+    Parameters
+    ----------
+    steps : int
+        The length of every generated series.
+    replicates : int
+        The number of replicate experiments; each stationarizes a panel
+        holding series of every process type.
+    alphas : list of float, optional
+        The alpha values to calibrate. Defaults to [0.05].
+    multitests : list of str, optional
+        The multiple testing methods to calibrate, as supported by
+        statsmodels' multipletests. Defaults to ["fdr_by"].
+    columns_per_process : dict or int, default 1
+        The composition of each replicate panel. See
+        stationarizer.synthetic.process_panel.
+    backend : str, optional
+        The engine running the unit root tests. See
+        simple_auto_stationarize. Defaults to "vectorized".
+    n_jobs : int, optional
+        The number of processes running batches of replicates in parallel.
+        See simple_auto_stationarize.
+    random_state : int or numpy.random.SeedSequence, optional
+        The root seed of the experiments. If not given, fresh OS entropy is
+        used.
+    batch_size : int, optional
+        The number of replicates generated and tested together. Defaults to
+        50.
+    **kwargs
+        Parameters passed to the process generators, like slope and std.
+
+    Returns
+    -------
+    CalibrationResults
+        The empirical rejection and conclusion rates per setting.
+    """
+    if alphas is None:
+        alphas = [DEF_ALPHA]
+    if multitests is None:
+        multitests = [DEF_MULTITEST]
+    if backend is None:
+        backend = DEF_BACKEND
+    if batch_size is None:
+        batch_size = DEF_BATCH_SIZE
+    if not isinstance(columns_per_process, dict):
+        columns_per_process = {
+            process: columns_per_process for process in PROCESSES
+        }
+    if not isinstance(random_state, np.random.SeedSequence):
+        random_state = np.random.SeedSequence(random_state)
+    sizes = [
+        min(batch_size, replicates - start)
+        for start in range(0, replicates, batch_size)
+    ]
+    task = partial(
+        _calibration_batch,
+        steps=steps,
+        columns_per_process=columns_per_process,
+        alphas=list(alphas),
+        multitests=list(multitests),
+        backend=backend,
+        **kwargs,
+    )
+    seeds = random_state.spawn(len(sizes))
+    n_jobs = effective_n_jobs(n_jobs)
+    if n_jobs == 1:
+        results = list(map(task, seeds, sizes))
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(task, seeds, sizes))
+    rejections, raw_rejections, conclusions = [
+        sum(arrays) for arrays in zip(*results)
+    ]
+    series_counts = np.array(
+        [columns_per_process.get(p, 0) * replicates for p in PROCESSES]
+    )
+    return CalibrationResults(
+        replicates,
+        steps,
+        alphas,
+        multitests,
+        series_counts,
+        rejections,
+        raw_rejections,
+        conclusions,
+    )
@@ -1,19 +1,30 @@
 """Core stationarizer functionalities."""
 
+import time
+import logging
+from collections import namedtuple
+
 import numpy as np
-import pandas as pd
-from statsmodels.tsa.stattools import adfuller, kpss
-from statsmodels.tsa.tsatools import detrend
-from statsmodels.tsa.statespace.tools import diff
-from statsmodels.stats.multitest import multipletests
 
 from .util import set_verbosity_level, get_logger
+from .adf import (
+    adfuller_batch,
+    adfuller_incremental,
+    _nonfinite_columns,
+)
+from .kpss import kpss_batch
+from .memory import columns_within, transform_columns_within
+from .parallel import ColumnPool, column_groups
+from .cache import column_key, get_default_cache
+from .transform import trend_coefficients, apply_transformations
+from .profiling import get_profiler, NullProfiler
 
 
 # use a p-value of 1% as default
 # we should consider an adaptive p-value that dependes on the number of
 # variables to deal with the multiple hypothesis testing problem
 DEF_ALPHA = 0.05
+DEF_MULTITEST = "fdr_by"
 H0 = "H0 - The null hypothesis is that the series has a unit root."
 H1 = "H1 - The alternative hypothesis is that the series has no unit root."
 
@@ -25,6 +36,20 @@ KPSS_H0_KEPT = (
 )
 
 
+class Backend(object):
+    INCREMENTAL = "incremental"
+    STATSMODELS = "statsmodels"
+    VECTORIZED = "vectorized"
+
+
+BACKENDS = [Backend.INCREMENTAL, Backend.STATSMODELS, Backend.VECTORIZED]
+DEF_BACKEND = Backend.INCREMENTAL
+
+# test settings; these also key cached test results
+ADF_PARAMS = {"regression": "ct", "maxlag": None, "autolag": "AIC"}
+KPSS_PARAMS = {"regression": "ct", "nlags": "auto"}
+
+
 class SimpleConclusion(object):
     CONTRADICTION = (
         "Contradictory results regarding the existence of unit"
@@ -65,6 +90,682 @@ def conclude_adf_and_kpss_results(adf_reject, kpss_reject):
     return SimpleConclusion.NO_REJECTION
 
 
+# conclusions are encoded per column as indices into this list
+CONCLUSIONS = [
+    SimpleConclusion.CONTRADICTION,
+    SimpleConclusion.NO_REJECTION,
+    SimpleConclusion.TREND_STATIONARY,
+    SimpleConclusion.UNIT_ROOT,
+]
+# conclusion codes, indexed by [adf_reject, kpss_reject]
+_CONCLUSION_CODES = np.array(
+    [
+        [
+            CONCLUSIONS.index(conclude_adf_and_kpss_results(adf, kpss))
+            for kpss in (False, True)
+        ]
+        for adf in (False, True)
+    ]
+)
+# whether each conclusion requires detrending/differentiating, by code
+_DETREND_BY_CODE = np.array(
+    [
+        Transformation.DETREND in CONCLUSION_TO_TRANSFORMATIONS[conclusion]
+        for conclusion in CONCLUSIONS
+    ]
+)
+_DIFF_BY_CODE = np.array(
+    [
+        Transformation.DIFFRENTIATE
+        in CONCLUSION_TO_TRANSFORMATIONS[conclusion]
+        for conclusion in CONCLUSIONS
+    ]
+)
+
+
+class ArrayResults(
+    namedtuple(
+        "ArrayResults",
+        [
+            "adf_stats",
+            "adf_pvals",
+            "kpss_stats",
+            "kpss_pvals",
+            "adf_corrected_pvals",
+            "kpss_corrected_pvals",
+            "adf_rejections",
+            "kpss_rejections",
+            "conclusions",
+            "detrend_mask",
+            "diff_mask",
+        ],
+    )
+):
+    """Per-column results of stationarize_array, as aligned arrays."""
+
+    __slots__ = ()
+
+    def reconclude(self, alpha=None, multitest=None):
+        """Concludes again from the raw p-values, under other settings.
+
+        No test is run again: only the multiple testing correction and the
+        conclusions are recomputed, for all columns at once. Corrected
+        p-values are computed once for all given alphas, unless they depend
+        on alpha, as with two-stage methods.
+
+        Parameters
+        ----------
+        alpha : float or sequence of float, optional
+            See simple_auto_stationarize. If a sequence is given, results are
+            computed for each alpha in it.
+        multitest : str, optional
+            See simple_auto_stationarize.
+
+        Returns
+        -------
+        ArrayResults
+            The same statistics and raw p-values, with corrected p-values,
+            rejections, conclusions and masks recomputed. If a sequence of
+            alphas is given, these have shape (alphas, columns), holding the
+            results of each alpha in turn.
+        """
+        return self._replace(
+            **multitest_conclusions(
+                self.adf_pvals, self.kpss_pvals, alpha, multitest
+            )
+        )
+
+
+def _concat_chunk_results(chunk_results):
+    return [np.concatenate(arrays) for arrays in zip(*chunk_results)]
+
+
+def _test_columns(test, X, params):
+    """Runs a single-series test on each column of X, timing each run."""
+    ncols = X.shape[1]
+    stats, pvals, durations = np.empty(ncols), np.empty(ncols), np.empty(ncols)
+    for i in range(ncols):
+        start = time.perf_counter()
+        result = test(X[:, i], **params)
+        durations[i] = time.perf_counter() - start
+        stats[i], pvals[i] = result[0], result[1]
+    return stats, pvals, durations
+
+
+def _spread_duration(start, ncols):
+    """Spreads the time elapsed since start evenly over ncols columns."""
+    return np.full(ncols, (time.perf_counter() - start) / max(1, ncols))
+
+
+def _adf_chunk(X, backend):
+    """Runs the ADF test on each column of X.
+
+    Returns stats, p-values and per-column durations.
+    """
+    if backend == Backend.VECTORIZED:
+        start = time.perf_counter()
+        adf_stats, adf_pvals, _, _ = adfuller_batch(X, **ADF_PARAMS)
+        return adf_stats, adf_pvals, _spread_duration(start, X.shape[1])
+    if backend == Backend.INCREMENTAL:
+        return _test_columns(adfuller_incremental, X, ADF_PARAMS)
+    # statsmodels and pandas are imported on first use, to keep importing
+    # stationarizer fast
+    from statsmodels.tsa.stattools import adfuller
+
+    return _test_columns(adfuller, X, ADF_PARAMS)
+
+
+def _kpss_chunk(X, backend):
+    """Runs the KPSS test on each column of X.
+
+    Returns stats, p-values and per-column durations.
+    """
+    if backend == Backend.VECTORIZED:
+        start = time.perf_counter()
+        kpss_stats, kpss_pvals, _ = kpss_batch(X, **KPSS_PARAMS)
+        return kpss_stats, kpss_pvals, _spread_duration(start, X.shape[1])
+    from statsmodels.tsa.stattools import kpss
+
+    return _test_columns(kpss, X, KPSS_PARAMS)
+
+
+_TESTS = {
+    "adf": (_adf_chunk, ADF_PARAMS),
+    "kpss": (_kpss_chunk, KPSS_PARAMS),
+}
+
+
+def _run_test(test, pool, backend, cache, cols=None):
+    """Runs a unit root test on columns of the array of a ColumnPool.
+
+    All columns are tested, unless cols is given. If a cache is given, only
+    columns with no cached result are tested. Returns the test statistics,
+    p-values and test durations of the tested columns; the durations of
+    columns with cached results are 0.
+    """
+    chunk_func, params = _TESTS[test]
+    if cache is None:
+        return _concat_chunk_results(
+            pool.map(chunk_func, cols, backend=backend)
+        )
+    columns = np.arange(pool.shape[1])
+    if cols is not None:
+        columns = columns[cols]
+    # backends agree up to rounding, and may select other lags on ties
+    keys = [
+        column_key(pool.X[:, i], test, backend=backend, **params)
+        for i in columns
+    ]
+    results = [cache.get(key) for key in keys]
+    durations = np.zeros(len(columns))
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        stats, pvals, durations[missing] = _concat_chunk_results(
+            pool.map(chunk_func, columns[missing], backend=backend)
+        )
+        for i, stat, pval in zip(missing, stats, pvals):
+            results[i] = (stat, pval)
+            cache.set(keys[i], results[i])
+    stats = np.array([r[0] for r in results])
+    pvals = np.array([r[1] for r in results])
+    return stats, pvals, durations
+
+
+def _run_test_groups(test, pool, groups, backend, cache):
+    """Runs a unit root test on each column group of a ColumnPool in turn.
+
+    Without parallelism, each group is copied into a column-major array, if
+    it is not one already, and released before the next group is tested.
+    Returns the concatenated statistics, p-values and durations of all
+    columns.
+    """
+    return _concat_chunk_results(
+        _run_test(test, pool, backend, cache, group) for group in groups
+    )
+
+
+def run_unit_root_tests(X, backend=None, n_jobs=None):
+    """Runs the ADF and KPSS tests of simple_auto_stationarize on columns.
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        A 2D array of shape (time, variables).
+    backend : str, optional
+        See simple_auto_stationarize.
+    n_jobs : int, optional
+        See simple_auto_stationarize.
+
+    Returns
+    -------
+    adf_stats, adf_pvals, kpss_stats, kpss_pvals : numpy.ndarray
+        The statistics and raw p-values of both tests, per column.
+    """
+    backend = _resolve_backend(backend)
+    with ColumnPool(np.asfortranarray(X, dtype=float), n_jobs) as pool:
+        adf_stats, adf_pvals = _run_test("adf", pool, backend, None)[:2]
+        kpss_stats, kpss_pvals = _run_test("kpss", pool, backend, None)[:2]
+    return adf_stats, adf_pvals, kpss_stats, kpss_pvals
+
+
+def _budget_groups(shape, max_memory, backend):
+    """Returns column groups to test and to transform within a budget.
+
+    Without a budget, all columns form a single group for each stage.
+    """
+    nrows, ncols = shape
+    if max_memory is None:
+        return [slice(0, ncols)], [slice(0, ncols)]
+    test_groups = column_groups(
+        ncols, columns_within(max_memory, nrows, backend)
+    )
+    transform_groups = column_groups(
+        ncols, transform_columns_within(max_memory, nrows)
+    )
+    return test_groups, transform_groups
+
+
+def _transform_chunk(X, detrend_mask, diff_mask, out):
+    """Writes the transformed columns of X into out, returning their length.
+
+    Trends of all detrended columns are fitted with a single least-squares
+    solve over their block, and the transformed block is written to the top
+    rows of out.
+    """
+    slopes = np.zeros(X.shape[1])
+    intercepts = np.zeros(X.shape[1])
+    if detrend_mask.any():
+        slopes[detrend_mask], intercepts[detrend_mask] = trend_coefficients(
+            X[:, detrend_mask]
+        )
+    post = apply_transformations(
+        X, detrend_mask, diff_mask, slopes, intercepts, out=out
+    )
+    return len(post)
+
+
+def _multitest_sweep(pvals, alphas, multitest):
+    """Corrects a family of p-values for each of the given alphas.
+
+    Returns corrected p-values and rejections of shape (alphas, tests).
+    Rejections are those of multipletests for each alpha, rather than
+    comparisons of corrected p-values with alpha, which can differ at the
+    boundary by rounding, as some methods compare raw p-values with
+    adjusted thresholds.
+    """
+    from statsmodels.stats.multitest import multipletests
+
+    if multitest is None:
+        multitest = DEF_MULTITEST
+    # as in multipletests, method names are case insensitive
+    reject, corrected = zip(
+        *(
+            multipletests(pvals, alpha=alpha, method=multitest.lower())[:2]
+            for alpha in alphas
+        )
+    )
+    return np.array(corrected), np.array(reject)
+
+
+def _correct_pvals(adf_pvals, kpss_pvals, alpha, multitest):
+    """Corrects the p-values of both tests over all columns jointly.
+
+    Returns the corrected p-values and rejections of the ADF and KPSS tests.
+    """
+    n = len(adf_pvals)
+    corrected, reject = _multitest_sweep(
+        np.concatenate([adf_pvals, kpss_pvals]), np.array([alpha]), multitest
+    )
+    return corrected[0, :n], corrected[0, n:], reject[0, :n], reject[0, n:]
+
+
+def _conclusion_codes(adf_rejections, kpss_rejections):
+    """Returns conclusion codes, and detrend and diff masks, per column."""
+    codes = _CONCLUSION_CODES[
+        adf_rejections.astype(int), kpss_rejections.astype(int)
+    ]
+    return codes, _DETREND_BY_CODE[codes], _DIFF_BY_CODE[codes]
+
+
+def multitest_conclusions(adf_pvals, kpss_pvals, alpha=None, multitest=None):
+    """Corrects the p-values of both tests jointly, and concludes per column.
+
+    Parameters
+    ----------
+    adf_pvals : numpy.ndarray
+        The raw p-values of the ADF test of each column.
+    kpss_pvals : numpy.ndarray
+        The raw p-values of the KPSS test of each column.
+    alpha : float or sequence of float, optional
+        See simple_auto_stationarize. If a sequence is given, results are
+        computed for each alpha in it.
+    multitest : str, optional
+        See simple_auto_stationarize.
+
+    Returns
+    -------
+    dict
+        The corrected p-values and rejections of both tests, the conclusions,
+        encoded as indices into CONCLUSIONS, and the detrend and diff masks,
+        under the names of the matching ArrayResults fields. Arrays have
+        shape (columns,), or (alphas, columns) if a sequence of alphas is
+        given.
+    """
+    if alpha is None:
+        alpha = DEF_ALPHA
+    alphas = np.atleast_1d(np.asarray(alpha, dtype=float))
+    n = len(adf_pvals)
+    corrected, reject = _multitest_sweep(
+        np.concatenate([adf_pvals, kpss_pvals]), alphas, multitest
+    )
+    codes, detrend_mask, diff_mask = _conclusion_codes(
+        reject[:, :n], reject[:, n:]
+    )
+    fields = dict(
+        adf_corrected_pvals=corrected[:, :n],
+        kpss_corrected_pvals=corrected[:, n:],
+        adf_rejections=reject[:, :n],
+        kpss_rejections=reject[:, n:],
+        conclusions=codes,
+        detrend_mask=detrend_mask,
+        diff_mask=diff_mask,
+    )
+    if np.ndim(alpha) == 0:
+        fields = {name: arr[0] for name, arr in fields.items()}
+    return fields
+
+
+def _resolve_backend(backend):
+    if backend is None:
+        return DEF_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unsupported backend {backend}; supported values are {BACKENDS}."
+        )
+    return backend
+
+
+def stationarize_array(
+    X,
+    verbosity=None,
+    alpha=None,
+    multitest=None,
+    backend=None,
+    n_jobs=None,
+    cache=None,
+    labels=None,
+    profile=None,
+    max_memory=None,
+    test_state=None,
+):
+    """Auto-stationarize the columns of the given 2D array.
+
+    This is the engine behind simple_auto_stationarize, working on arrays
+    end to end. A column-major (Fortran ordered) float array is used as is,
+    while any other input is copied into one, unless max_memory is set, in
+    which case only column groups are copied, one at a time.
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        A 2D array of shape (time, variables). A ValueError is raised if any
+        value is missing or infinite.
+    verbosity : int, logging.Logger, optional
+        See simple_auto_stationarize.
+    alpha : int, optional
+        See simple_auto_stationarize.
+    multitest : str, optional
+        See simple_auto_stationarize.
+    backend : str, optional
+        See simple_auto_stationarize.
+    n_jobs : int, optional
+        See simple_auto_stationarize.
+    cache : bool or stationarizer.cache.UnitRootCache, optional
+        See simple_auto_stationarize.
+    labels : sequence, optional
+        Names of the columns of X, used for logging and to store test states.
+        Defaults to column indices.
+    profile : bool, callable or stationarizer.profiling.Profiler, optional
+        See simple_auto_stationarize. A given Profiler object collects the
+        measurements of this run, in addition to any it already holds.
+    max_memory : int, optional
+        See simple_auto_stationarize.
+    test_state : stationarizer.state.UnitRootStateStore, optional
+        See simple_auto_stationarize.
+
+    Returns
+    -------
+    post : numpy.ndarray
+        The transformed array. If any column is differentiated, all columns
+        are trimmed by one step to a common length.
+    results : ArrayResults
+        A named tuple of per-column arrays: the statistics, raw and corrected
+        p-values and rejections of the ADF and KPSS tests, the conclusions,
+        encoded as indices into CONCLUSIONS, and boolean masks of the
+        detrended and differentiated columns.
+    report : dict
+        Only returned if profile is set. See simple_auto_stationarize.
+    """
+    if alpha is None:
+        alpha = DEF_ALPHA
+    backend = _resolve_backend(backend)
+    if cache is True:
+        cache = get_default_cache()
+    elif cache is False:
+        cache = None
+    if max_memory is None:
+        X = np.asfortranarray(X, dtype=float)
+    else:
+        X = np.asarray(X, dtype=float)
+    if X.ndim != 2:
+        raise ValueError("stationarize_array expects a 2D array!")
+    if labels is None:
+        labels = range(X.shape[1])
+    profiler = get_profiler(profile)
+    if verbosity is not None:
+        prev_verbosity = set_verbosity_level(verbosity)
+    try:
+        # workers of all stages share a single copy of X
+        with ColumnPool(X, n_jobs) as pool:
+            post_arr, results = _stationarize_array(
+                pool,
+                alpha,
+                multitest,
+                backend,
+                cache,
+                labels,
+                profiler,
+                max_memory,
+                test_state,
+            )
+        if isinstance(profiler, NullProfiler):
+            return post_arr, results
+        return post_arr, results, profiler.report()
+    finally:
+        if verbosity is not None:
+            set_verbosity_level(prev_verbosity)
+
+
+def _stationarize_array(
+    pool,
+    alpha,
+    multitest,
+    backend,
+    cache,
+    labels,
+    profiler,
+    max_memory,
+    test_state,
+):
+    logger = get_logger()
+    X = pool.X
+    with profiler.stage("validation"):
+        logger.info("Starting to check input data validity...")
+        logger.info("Data shape (time, variables) is %s.", X.shape)
+        # the first axis - rows - is expected to represent the time
+        # dimension, while the second axis - columns - is expected to
+        # represent variables; thus, the first expected to be much longer
+        # than the second
+        logger.info(
+            "Checking current data orientation "
+            "(rows=time, columns=variables)..."
+        )
+        if X.shape[1] >= X.shape[0]:
+            logger.warning(
+                (
+                    "stationarizer's input dataframe has more columns than "
+                    "rows! Columns are expected to represent variables, "
+                    "while rows represent time steps, and thus the input "
+                    "dataframe is expected to have more rows than columns. "
+                    "Either the input data is inverted, or the data has far "
+                    "more variables than samples."
+                )
+            )
+        else:
+            logger.info("Data orientation is valid.")
+        # a single NaN p-value would poison the joint correction of all
+        # columns
+        missing = _nonfinite_columns(X)
+        if len(missing) > 0:
+            raise ValueError(
+                f"Invalid input, columns {[labels[i] for i in missing]} "
+                "have missing or infinite values"
+            )
+
+    # util var
+    n = X.shape[1]
+    test_groups, transform_groups = _budget_groups(
+        X.shape, max_memory, backend
+    )
+
+    with profiler.stage("adf"):
+        # testing for unit root
+        logger.info(
+            (
+                "Checking for the presence of a unit root in the input time "
+                "series using the Augmented Dicky-Fuller test"
+            )
+        )
+        logger.info(
+            (
+                "Reminder:\n "
+                "Null Hypothesis: The series has a unit root (value of a=1); "
+                "meaning, it is NOT stationary.\n"
+                "Alternate Hypothesis: The series has no unit root; it is "
+                "either stationary or non-stationary of a different model "
+                "than unit root."
+            )
+        )
+        if test_state is None:
+            adf_stats, adf_pvals, adf_durations = _run_test_groups(
+                "adf", pool, test_groups, backend, cache
+            )
+        else:
+            # both tests are run at once, from the stored states
+            state_stats, adf_durations = test_state.test(X, labels)
+            adf_stats, adf_pvals = state_stats.adf_stats, state_stats.adf_pvals
+        if logger.isEnabledFor(logging.INFO):
+            for colname, stat, pval in zip(labels, adf_stats, adf_pvals):
+                logger.info(
+                    f"{colname}: test statistic={stat}, p-val={pval}."
+                )
+    profiler.record_columns("adf", adf_durations)
+
+    with profiler.stage("kpss"):
+        # testing for trend stationarity
+        logger.info(
+            (
+                "Testing for trend stationarity of input series using the "
+                "KPSS test."
+            )
+        )
+        logger.info(
+            (
+                "Reminder:\n"
+                "Null Hypothesis (H0): The series is trend-stationarity.\n"
+                "Alternative Hypothesis (H1): The series has a unit root."
+            )
+        )
+        if test_state is None:
+            kpss_stats, kpss_pvals, kpss_durations = _run_test_groups(
+                "kpss", pool, test_groups, backend, cache
+            )
+        else:
+            kpss_stats = state_stats.kpss_stats
+            kpss_pvals = state_stats.kpss_pvals
+            kpss_durations = np.zeros(n)
+        if logger.isEnabledFor(logging.INFO):
+            for colname, stat, pval in zip(labels, kpss_stats, kpss_pvals):
+                logger.info(
+                    f"{colname}: test statistic={stat}, p-val={pval}."
+                )
+    profiler.record_columns("kpss", kpss_durations)
+
+    with profiler.stage("multitest"):
+        # Controling FDR
+        logger.info(
+            "Controling multiple testing errors using the %s method with "
+            "α=%s.",
+            DEF_MULTITEST if multitest is None else multitest,
+            alpha,
+        )
+        (
+            adf_corrected_pvals,
+            kpss_corrected_pvals,
+            adf_rejections,
+            kpss_rejections,
+        ) = _correct_pvals(adf_pvals, kpss_pvals, alpha, multitest)
+
+    with profiler.stage("conclusions"):
+        # interpret results
+        logger.info("Interpreting test results after FDR control...")
+        codes, detrend_mask, diff_mask = _conclusion_codes(
+            adf_rejections, kpss_rejections
+        )
+        # per-column diagnostics are only built when they are to be logged
+        log_info = logger.isEnabledFor(logging.INFO)
+        if log_info:
+            actions = [
+                CONCLUSION_TO_TRANSFORMATIONS[CONCLUSIONS[c]] for c in codes
+            ]
+            for i, colname in enumerate(labels):
+                logger.info(
+                    (
+                        f"--{colname}--\n "
+                        f"ADF corrected p-val: {adf_corrected_pvals[i]}, "
+                        f"H0 rejected: {adf_rejections[i]}.\n"
+                        f"KPSS corrected p-val: {kpss_corrected_pvals[i]}, "
+                        f"H0 rejected: {kpss_rejections[i]}.\n"
+                        f"Conclusion: {CONCLUSIONS[codes[i]]}\n "
+                        f"Transformations: {actions[i]}."
+                    )
+                )
+
+    with profiler.stage("transform"):
+        # making non-stationary series stationary!
+        if log_info:
+            logger.info(
+                "Pre-transformation shape: %s, #NA: %s",
+                X.shape,
+                np.isnan(X).sum(),
+            )
+        logger.info("Applying transformations...")
+        if log_info:
+            for colname, col_actions in zip(labels, actions):
+                logger.info(
+                    f"Applying {', '.join(col_actions)} to {colname} "
+                    f"(len={len(X)})."
+                )
+        # with n_jobs, workers write into the shared output directly
+        post_arr = pool.output()
+        lengths = []
+        for group in transform_groups:
+            lengths += pool.map(
+                _transform_chunk,
+                group,
+                col_args=[detrend_mask[group], diff_mask[group]],
+                out=True,
+            )
+
+    with profiler.stage("trim"):
+        # equalizing lengths
+        min_len = min(lengths)
+        logger.info("Min length to trim to: %s", min_len)
+        post_arr = post_arr[:min_len]
+        if logger.isEnabledFor(logging.DEBUG):
+            nan_counts = np.isnan(post_arr).sum(axis=0)
+            for colname, nan_count in zip(labels, nan_counts):
+                logger.debug(
+                    f"#NA trimmed {colname} (len={min_len}): {nan_count}"
+                )
+        logger.info("Post trimming shape: %s", post_arr.shape)
+
+        if log_info:
+            counts = np.bincount(codes, minlength=len(CONCLUSIONS))
+            for conclusion, count in zip(CONCLUSIONS, counts):
+                if count:
+                    ratio = 100 * (count / n)
+                    logger.info(
+                        f"{count} series ({ratio}%) found with conclusion: "
+                        f"{conclusion}."
+                    )
+
+    results = ArrayResults(
+        adf_stats=adf_stats,
+        adf_pvals=adf_pvals,
+        kpss_stats=kpss_stats,
+        kpss_pvals=kpss_pvals,
+        adf_corrected_pvals=adf_corrected_pvals,
+        kpss_corrected_pvals=kpss_corrected_pvals,
+        adf_rejections=adf_rejections,
+        kpss_rejections=kpss_rejections,
+        conclusions=codes,
+        detrend_mask=detrend_mask,
+        diff_mask=diff_mask,
+    )
+    return post_arr, results
+
+
 def simple_auto_stationarize(
     df,
     verbosity=None,
@@ -72,13 +773,21 @@ def simple_auto_stationarize(
     multitest=None,
     get_conclusions=False,
     get_actions=False,
+    backend=None,
+    n_jobs=None,
+    cache=None,
+    profile=None,
+    max_memory=None,
+    test_state=None,
+    get_results=False,
 ):
     """Auto-stationarize the given time-series dataframe.
 
     Parameters
     ----------
     df : pandas.DataFrame
-        A dataframe composed solely of numeric columns.
+        A dataframe composed solely of numeric columns, with no missing
+        values.
     verbosity : int, logging.Logger, optional
         If an int is given, it is interpreted as the logging lever to use. See
         https://docs.python.org/3/library/logging.html#levels for details. If a
@@ -91,221 +800,156 @@ def simple_auto_stationarize(
         value is provided, a default value of 0.05 (5%) is used.
     multitest : str, optional
         The multiple hypothesis testing eror control method to use. If no value
-        is provided, the Benjamini–Yekutieli is used. See
-        `the documesimple_auto_stationarizentation of statsmodels' multipletests method for supported values <https://www.statsmodels.org/dev/generated/statsmodels.stats.multitest.multipletests.html>`.
+        is provided, the Benjamini–Yekutieli ("fdr_by") is used. See
+        `the documentation of statsmodels' multipletests method for supported values <https://www.statsmodels.org/dev/generated/statsmodels.stats.multitest.multipletests.html>`.
     get_conclusions : bool, defaults to False
         If set to true, a conclusions dict is returned.
     get_actions : bool, defaults to False
         If set to true, an actions dict is returned.
+    backend : str, optional
+        The engine used to run the unit root tests. "statsmodels" runs
+        statsmodels' tests column by column. "incremental" does the same, but
+        selects the number of ADF lags using a single regression per column.
+        "vectorized" runs each test for all columns at once using stacked
+        linear algebra. If no value is provided, "incremental" is used.
+    n_jobs : int, optional
+        The number of processes used to test and transform columns in
+        parallel. Columns are split into contiguous chunks, a few per process,
+        and results are gathered in the original column order. The input is
+        copied once into shared memory, read by all stages, and workers
+        write transformed columns into a shared block backing the output.
+        -1 uses all CPUs. If no value is provided, no parallelism is used.
+    cache : bool or stationarizer.cache.UnitRootCache, optional
+        If given, unit root test results are cached per column, keyed by a
+        hash of the column's content, the test settings and the backend -
+        whose results agree only up to rounding - and columns with
+        cached results are not tested again. If set to True, an in-memory
+        cache shared by all calls is used. By default, no caching is done.
+    profile : bool or callable, optional
+        If set, the run is profiled, and a report is returned. The wall time,
+        CPU time and peak memory of each stage - validation, adf, kpss,
+        multitest, conclusions, transform and trim - are measured, as well as
+        the time spent testing each column. If a callable is given, it is
+        also called with a stationarizer.profiling.StageProfile as soon as
+        each stage completes. By default, nothing is measured.
+    max_memory : int, optional
+        A budget, in bytes, for the memory used on top of the input data and
+        the transformed output. If set, the working set of testing and
+        transforming a column is estimated from the number of rows and the
+        backend, as done by stationarizer.memory, and columns are processed
+        in groups sized to fit the budget, each released before the next
+        one. A ValueError is raised if a single column does not fit. With
+        n_jobs, the shared copy of the input is not counted in the budget.
+        By default, all columns are processed at once.
+    test_state : stationarizer.state.UnitRootStateStore, optional
+        If given, the test state of each column - the cross-products of its
+        ADF regression and the sums and lagged products of its KPSS test - is
+        stored under its label, and when rows are appended to a column
+        whose earlier rows were already tested, only the new rows are folded
+        into its state, instead of testing the whole column again. Both
+        tests are then run in the adf stage, and backend, n_jobs, cache and
+        max_memory do not apply to them. By default, no state is kept.
+    get_results : bool, defaults to False
+        If set to true, the per-column test results are returned, as a
+        stationarizer.core.ArrayResults. Its reconclude method concludes
+        again under other alphas or multiple testing methods without running
+        any test again.
 
     Returns
     -------
     results : pandas.DataFrame or dict
         By default, only he transformed dataframe is returned. However, if
-        get_conclusions or get_actions are set to True, a dict is returned
-        instead, with the following mappings:
+        get_conclusions, get_actions, profile or get_results are set, a dict
+        is returned instead, with the following mappings:
         - `postdf` - Maps to the transformed dataframe.
         - `conclusions` - Maps to a dict mapping each column name to the
           arrived conclusion regarding its stationarity.
         - `actions` - Maps to a dict mapping each column name to the
           transformations performed on it to stationarize it.
+        - `profile` - Maps to a JSON-serializable profiling report. See
+          stationarizer.profiling.Profiler.report.
+        - `results` - Maps to the stationarizer.core.ArrayResults of the
+          run, if get_results is set.
+
+    See Also
+    --------
+    stationarize_array : The same, for 2D arrays, skipping pandas overhead.
     """  # noqa: E501
+    import pandas as pd
+
+    backend = _resolve_backend(backend)
+    profiler = get_profiler(profile)
     if verbosity is not None:
         prev_verbosity = set_verbosity_level(verbosity)
-    if alpha is None:
-        alpha = DEF_ALPHA
 
     logger = get_logger()
-    logger.info("Starting to auto-stationarize a dataframe!")
-    logger.info("Starting to check input data validity...")
-    logger.info(f"Data shape (time, variables) is {df.shape}.")
-    # the first axis - rows - is expected to represent the time dimension,
-    # while the second axis - columns - is expected to represent variables;
-    # thus, the first expected to be much longer than the second
-    logger.info(
-        "Checking current data orientation (rows=time, columns=variables)..."
-    )
-    if df.shape[1] >= df.shape[0]:
-        logger.warning(
-            (
-                "stationarizer's input dataframe has more columns than rows! "
-                "Columns are expected to represent variables, while rows "
-                "represent time steps, and thus the input dataframe is "
-                "expected to have more rows than columns. Either the input "
-                "data is inverted, or the data has far more variables than "
-                "samples."
+    try:
+        with profiler.stage("dataframe_input"):
+            logger.info("Starting to auto-stationarize a dataframe!")
+            # assert all columns are numeric
+            all_cols_numeric = all(
+                [np.issubdtype(x, np.number) for x in df.dtypes]
             )
-        )
-    else:
-        logger.info("Data orientation is valid.")
-    # assert all columns are numeric
-    all_cols_numeric = all([np.issubdtype(x, np.number) for x in df.dtypes])
-    if not all_cols_numeric:
-        err = ValueError(
-            "All columns of stationarizer's input dataframe must be numeric!"
-        )
-        logger.exception(err)
-
-    # util var
-    n = len(df.columns)
-
-    # testing for unit root
-    logger.info(
-        (
-            "Checking for the presence of a unit root in the input time "
-            "series using the Augmented Dicky-Fuller test"
-        )
-    )
-    logger.info(
-        (
-            "Reminder:\n "
-            "Null Hypothesis: The series has a unit root (value of a=1); "
-            "meaning, it is NOT stationary.\n"
-            "Alternate Hypothesis: The series has no unit root; it is either "
-            "stationary or non-stationary of a different model than unit root."
-        )
-    )
-    adf_results = []
-    for colname in df.columns:
-        srs = df[colname]
-        result = adfuller(srs, regression="ct")
-        logger.info(
-            (f"{colname}: test statistic={result[0]}, p-val={result[1]}.")
-        )
-        adf_results.append(result)
+            if not all_cols_numeric:
+                err = ValueError(
+                    "All columns of stationarizer's input dataframe must be "
+                    "numeric!"
+                )
+                logger.exception(err)
+            # column-major, so that column slices are contiguous
+            if max_memory is None:
+                X = np.asfortranarray(df.values, dtype=float)
+            else:
+                # column groups are copied one at a time later on
+                X = np.asarray(df.values, dtype=float)
 
-    # testing for trend stationarity
-    logger.info(
-        ("Testing for trend stationarity of input series using the KPSS test.")
-    )
-    logger.info(
-        (
-            "Reminder:\n"
-            "Null Hypothesis (H0): The series is trend-stationarity.\n"
-            "Alternative Hypothesis (H1): The series has a unit root."
-        )
-    )
-    kpss_results = []
-    for colname in df.columns:
-        srs = df[colname]
-        result = kpss(srs, regression="ct")
-        logger.info(
-            (f"{colname}: test statistic={result[0]}, p-val={result[1]}.")
-        )
-        kpss_results.append(result)
+        post_arr, results = stationarize_array(
+            X,
+            alpha=alpha,
+            multitest=multitest,
+            backend=backend,
+            n_jobs=n_jobs,
+            cache=cache,
+            labels=df.columns,
+            profile=profiler,
+            max_memory=max_memory,
+            test_state=test_state,
+        )[:2]
 
-    # Controling FDR
-    logger.info(
-        (
-            "Controling the False Discovery Rate (FDR) using the Benjamini-"
-            f"Yekutieli procedure with α={DEF_ALPHA}."
-        )
-    )
-    adf_pvals = [x[1] for x in adf_results]
-    kpss_pvals = [x[1] for x in kpss_results]
-    pvals = adf_pvals + kpss_pvals
-    by_res = multipletests(
-        pvals=pvals, alpha=alpha, method="fdr_by", is_sorted=False
-    )
-    reject = by_res[0]
-    corrected_pvals = by_res[1]
-    adf_rejections = reject[:n]
-    kpss_rejections = reject[n:]
-    adf_corrected_pvals = corrected_pvals[:n]  # noqa: F841
-    kpss_corrected_pvals = corrected_pvals[n:]  # noqa: F841
-    conclusion_counts = {}
-
-    def dict_inc(dicti, key):
-        try:
-            dicti[key] += 1
-        except KeyError:
-            dicti[key] = 1
-
-    # interpret results
-    logger.info("Interpreting test results after FDR control...")
-    conclusions = {}
-    actions = {}
-    for i, colname in enumerate(df.columns):
-        conclusion = conclude_adf_and_kpss_results(
-            adf_reject=adf_rejections[i], kpss_reject=kpss_rejections[i]
-        )
-        dict_inc(conclusion_counts, conclusion)
-        trans = CONCLUSION_TO_TRANSFORMATIONS[conclusion]
-        conclusions[colname] = conclusion
-        actions[colname] = trans
-        logger.info(
-            (
-                f"--{colname}--\n "
-                f"ADF corrected p-val: {adf_corrected_pvals[i]}, "
-                f"H0 rejected: {adf_rejections[i]}.\n"
-                f"KPSS corrected p-val: {kpss_corrected_pvals[i]}, "
-                f"H0 rejected: {kpss_rejections[i]}.\n"
-                f"Conclusion: {conclusion}\n Transformations: {trans}."
+        with profiler.stage("dataframe_output"):
+            postdf = pd.DataFrame(
+                post_arr,
+                columns=df.columns,
+                index=df.index.copy()[: len(post_arr)],
             )
-        )
 
-    # making non-stationary series stationary!
-    logger.info(
-        (
-            f"Pre-transformation shape: {df.shape}, "
-            f"#NA: {df.isna().sum().sum()}"
-        )
-    )
-    post_cols = {}
-    logger.info("Applying transformations...")
-    for colname in df.columns:
-        srs = df[colname]
-        if Transformation.DETREND in actions[colname]:
-            logger.info(f"Detrending {colname} (len={len(srs)}).")
-            srs = detrend(srs, order=1, axis=0)
-            logger.debug(f"# NaN after detrending: {np.isnan(srs).sum()}")
-        if Transformation.DIFFRENTIATE in actions[colname]:
-            logger.info(f"Diffrentiating {colname} (len={len(srs)}).")
-            srs = diff(srs, k_diff=1)
-            logger.debug(f"# NaN after diffrencing: {np.isnan(srs).sum()}")
-        post_cols[colname] = srs
-        logger.info(f"{colname} transformed (len={len(post_cols[colname])}).")
-
-    # equalizing lengths
-    min_len = min([len(post_cols[x]) for x in post_cols])
-    logger.info(f"Min length to trim to: {min_len}")
-    trimmed_cols = {}
-    for colname in df.columns:
-        col = post_cols[colname][:min_len].values
-        trimmed_cols[colname] = col
-        logger.debug(
-            f"#NA trimmed {colname} (len={len(col)}): {np.isnan(col).sum()}"
-        )
-    postdf = pd.DataFrame.from_dict(trimmed_cols)
-    # postdf = postdf[:min_len]
-    logger.debug(f"trimmed df shape: {postdf.shape}")
-    postdf.index = df.index.copy()[:min_len]
-    # postdf = df.copy()
-    # postdf = postdf.iloc[:min_len]
-    # for colname in df.columns:
-    #     postdf[colname] = post_cols[colname]
-    logger.info(f"Post trimming shape: {postdf.shape}")
-
-    # checking for NaNs
-    nan_count = postdf.isna().sum().sum()
-    if nan_count > 0:
-        nan_rows = postdf[postdf.isna().any(axis=1)]
-        logger.debug(f"Post trimming NaN count: {nan_count}")
-        logger.debug(f"Rows with Nan values:\n {nan_rows}")
-
-    for k in conclusion_counts:
-        count = conclusion_counts[k]
-        ratio = 100 * (count / len(df.columns))
-        logger.info(f"{count} series ({ratio}%) found with conclusion: {k}.")
-
-    if verbosity is not None:
-        set_verbosity_level(prev_verbosity)
+            # checking for NaNs
+            if logger.isEnabledFor(logging.DEBUG):
+                nan_count = postdf.isna().sum().sum()
+                if nan_count > 0:
+                    nan_rows = postdf[postdf.isna().any(axis=1)]
+                    logger.debug("Post trimming NaN count: %s", nan_count)
+                    logger.debug("Rows with Nan values:\n %s", nan_rows)
+    finally:
+        if verbosity is not None:
+            set_verbosity_level(prev_verbosity)
 
-    if not get_actions and not get_conclusions:
+    profiled = profile is not None and profile is not False
+    if not (get_actions or get_conclusions or profiled or get_results):
         return postdf
-    results = {"postdf": postdf}
+    results_dict = {"postdf": postdf}
+    if get_results:
+        results_dict["results"] = results
+    if profiled:
+        results_dict["profile"] = profiler.report()
     if get_conclusions:
-        results["conclusions"] = conclusions
+        results_dict["conclusions"] = {
+            colname: CONCLUSIONS[code]
+            for colname, code in zip(df.columns, results.conclusions)
+        }
     if get_actions:
-        results["actions"] = actions
-    return results
+        results_dict["actions"] = {
+            colname: CONCLUSION_TO_TRANSFORMATIONS[CONCLUSIONS[code]]
+            for colname, code in zip(df.columns, results.conclusions)
+        }
+    return results_dict
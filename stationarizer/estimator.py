@@ -0,0 +1,265 @@
+"""A fit/transform stationarizer reusing decisions on new data."""
+
+import sys
+
+import numpy as np
+
+from .core import (
+    Transformation,
+    simple_auto_stationarize,
+)
+from .transform import (
+    trend_coefficients,
+    apply_transformations,
+    invert_transformations,
+)
+
+
+def _is_dataframe(data):
+    # pandas is not imported just to check; if it was never imported, data
+    # cannot be a dataframe
+    pd = sys.modules.get("pandas")
+    return pd is not None and isinstance(data, pd.DataFrame)
+
+
+class Stationarizer(object):
+    """Decides how to stationarize series once, and reuses the decision.
+
+    fit runs the unit root tests of simple_auto_stationarize on a training
+    window, and stores the resulting conclusions and actions, together with
+    the trend coefficients of the detrended columns. transform then applies
+    the stored transformations to new data as vectorized array operations,
+    with no statistical testing.
+
+    Unlike the scikit-learn convention, fit(df).transform(df) does not equal
+    fit_transform(df). transform assumes by default that its data directly
+    follows the training data, and evaluates stored trends from the time
+    step after the last training row, so detrended columns of the training
+    data itself are offset by the trend over the training window. Pass
+    start=0 to transform the training data as fit_transform does.
+
+    Parameters
+    ----------
+    alpha : float, optional
+        See simple_auto_stationarize.
+    multitest : str, optional
+        See simple_auto_stationarize.
+    backend : str, optional
+        See simple_auto_stationarize.
+    n_jobs : int, optional
+        See simple_auto_stationarize.
+    cache : bool or stationarizer.cache.UnitRootCache, optional
+        See simple_auto_stationarize.
+    verbosity : int, logging.Logger, optional
+        See simple_auto_stationarize.
+    max_memory : int, optional
+        See simple_auto_stationarize.
+
+    Attributes
+    ----------
+    columns_ : pandas.Index
+        The columns of the training dataframe.
+    n_obs_ : int
+        The number of rows in the training dataframe.
+    last_obs_ : numpy.ndarray
+        The last row of the training dataframe.
+    conclusions_ : dict
+        Maps each column name to the arrived conclusion regarding its
+        stationarity.
+    actions_ : dict
+        Maps each column name to the transformations to perform on it.
+    detrend_mask_ : numpy.ndarray
+        A boolean array marking the columns to detrend.
+    diff_mask_ : numpy.ndarray
+        A boolean array marking the columns to differentiate.
+    slopes_ : numpy.ndarray
+        The trend slope of each column, per time step; 0 for columns that are
+        not detrended.
+    intercepts_ : numpy.ndarray
+        The trend value of each column at the first training time step; 0
+        for columns that are not detrended.
+    """
+
+    def __init__(
+        self,
+        alpha=None,
+        multitest=None,
+        backend=None,
+        n_jobs=None,
+        cache=None,
+        verbosity=None,
+        max_memory=None,
+    ):
+        self.alpha = alpha
+        self.multitest = multitest
+        self.backend = backend
+        self.n_jobs = n_jobs
+        self.cache = cache
+        self.verbosity = verbosity
+        self.max_memory = max_memory
+
+    def _fit(self, df):
+        results = simple_auto_stationarize(
+            df,
+            verbosity=self.verbosity,
+            alpha=self.alpha,
+            multitest=self.multitest,
+            get_conclusions=True,
+            get_actions=True,
+            backend=self.backend,
+            n_jobs=self.n_jobs,
+            cache=self.cache,
+            max_memory=self.max_memory,
+        )
+        self.columns_ = df.columns.copy()
+        self.n_obs_ = len(df)
+        self.last_obs_ = np.asarray(df.values[-1], dtype=float)
+        self.conclusions_ = results["conclusions"]
+        self.actions_ = results["actions"]
+        self.detrend_mask_ = np.array(
+            [Transformation.DETREND in self.actions_[c] for c in df.columns]
+        )
+        self.diff_mask_ = np.array(
+            [
+                Transformation.DIFFRENTIATE in self.actions_[c]
+                for c in df.columns
+            ]
+        )
+        self.slopes_ = np.zeros(len(df.columns))
+        self.intercepts_ = np.zeros(len(df.columns))
+        if self.detrend_mask_.any():
+            X = np.asarray(df.values[:, self.detrend_mask_], dtype=float)
+            slopes, intercepts = trend_coefficients(X)
+            self.slopes_[self.detrend_mask_] = slopes
+            self.intercepts_[self.detrend_mask_] = intercepts
+        return results["postdf"]
+
+    def fit(self, df):
+        """Decides how to stationarize each column of the given dataframe.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            A training dataframe composed solely of numeric columns.
+
+        Returns
+        -------
+        self : Stationarizer
+            This object.
+        """
+        self._fit(df)
+        return self
+
+    def fit_transform(self, df):
+        """Fits to the given dataframe and returns it stationarized.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            A training dataframe composed solely of numeric columns.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The transformed dataframe.
+        """
+        return self._fit(df)
+
+    def transform(self, data, start=None):
+        """Applies the stored transformations to the given data.
+
+        Parameters
+        ----------
+        data : pandas.DataFrame or numpy.ndarray
+            A dataframe with the training columns, or a 2D array of shape
+            (time, variables) with the training columns in order.
+        start : int, optional
+            The time step of the first row of data, relative to the first row
+            of the training data, used to evaluate stored trends. Defaults to
+            the length of the training data, i.e. data directly following it,
+            as for inverse_transform. Use 0 to transform the training data
+            itself.
+
+        Returns
+        -------
+        pandas.DataFrame or numpy.ndarray
+            The transformed data, of the same type as the input. If any column
+            is differentiated, the output is one row shorter than the input.
+        """
+        if not hasattr(self, "columns_"):
+            raise ValueError("This Stationarizer is not fitted yet!")
+        if start is None:
+            start = self.n_obs_
+        if _is_dataframe(data):
+            X = data[self.columns_].values
+        else:
+            X = np.asarray(data)
+            if X.ndim != 2 or X.shape[1] != len(self.columns_):
+                raise ValueError(
+                    f"Expected a 2D array with {len(self.columns_)} columns!"
+                )
+        post = apply_transformations(
+            X,
+            detrend_mask=self.detrend_mask_,
+            diff_mask=self.diff_mask_,
+            slopes=self.slopes_,
+            intercepts=self.intercepts_,
+            start=start,
+        )
+        if not _is_dataframe(data):
+            return post
+        import pandas as pd
+
+        return pd.DataFrame(
+            post, columns=self.columns_, index=data.index[: len(post)]
+        )
+
+    def inverse_transform(self, data, start=None, last_obs=None):
+        """Maps stationarized data, like forecasts, back to the original scale.
+
+        Parameters
+        ----------
+        data : pandas.DataFrame or numpy.ndarray
+            A dataframe with the training columns, or an array of shape
+            (time, variables) or (time, variables, samples) with the training
+            columns in order, in the stationarized space.
+        start : int, optional
+            The time step of the first row of data, relative to the first row
+            of the training data. Defaults to the length of the training
+            data, i.e. data directly following it, such as forecasts.
+        last_obs : numpy.ndarray, optional
+            The original-scale observation at time step start - 1, anchoring
+            differentiated columns. Defaults to the last training row when
+            start is not given, and is otherwise required if any column is
+            differentiated.
+
+        Returns
+        -------
+        pandas.DataFrame or numpy.ndarray
+            The data on the original scale, of the same type and shape as the
+            input.
+        """
+        if not hasattr(self, "columns_"):
+            raise ValueError("This Stationarizer is not fitted yet!")
+        if start is None:
+            start = self.n_obs_
+            if last_obs is None:
+                last_obs = self.last_obs_
+        if _is_dataframe(data):
+            Y = data[self.columns_].values
+        else:
+            Y = np.asarray(data)
+        post = invert_transformations(
+            Y,
+            detrend_mask=self.detrend_mask_,
+            diff_mask=self.diff_mask_,
+            slopes=self.slopes_,
+            intercepts=self.intercepts_,
+            start=start,
+            last_obs=last_obs,
+        )
+        if not _is_dataframe(data):
+            return post
+        import pandas as pd
+
+        return pd.DataFrame(post, columns=self.columns_, index=data.index)
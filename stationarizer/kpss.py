@@ -0,0 +1,217 @@
+"""KPSS test engines operating on whole 2D arrays."""
+
+import numpy as np
+
+from .adf import _deterministic_basis, _nonfinite_columns, _partial_out
+
+
+KPSS_PVALS = [0.10, 0.05, 0.025, 0.01]
+KPSS_CRIT = {
+    "c": [0.347, 0.463, 0.574, 0.739],
+    "ct": [0.119, 0.146, 0.176, 0.216],
+}
+
+# autocovariances up to lags longer than this are computed using the FFT
+MAX_DIRECT_LAGS = 64
+
+
+def _autocovariances(resids, maxlag):
+    """Returns the sums of lagged products of all columns of resids.
+
+    The returned array has shape (maxlag + 1, ncols), with entry [i, j]
+    holding sum_t resids[t, j] * resids[t - i, j].
+    """
+    nobs = resids.shape[0]
+    if maxlag <= MAX_DIRECT_LAGS:
+        acov = np.empty((maxlag + 1, resids.shape[1]))
+        for i in range(maxlag + 1):
+            acov[i] = np.einsum("tc,tc->c", resids[i:], resids[: nobs - i])
+        return acov
+    nfft = 1 << int(np.ceil(np.log2(2 * nobs - 1)))
+    spectrum = np.fft.rfft(resids, n=nfft, axis=0)
+    spectrum *= np.conj(spectrum)
+    return np.fft.irfft(spectrum, n=nfft, axis=0)[: maxlag + 1]
+
+
+def _autolags(acov, nobs):
+    """The Hobijn et al. (1998) lag selection, for all columns at once."""
+    covlags = int(np.power(nobs, 2.0 / 9.0))
+    lags = np.arange(1, covlags + 1)[:, None]
+    prods = acov[1 : covlags + 1] / (nobs / 2.0)
+    s0 = acov[0] / nobs + prods.sum(axis=0)
+    s1 = (lags * prods).sum(axis=0)
+    s_hat = s1 / s0
+    pwr = 1.0 / 3.0
+    gamma_hat = 1.1447 * np.power(s_hat * s_hat, pwr)
+    return (gamma_hat * np.power(nobs, pwr)).astype(int)
+
+
+def _newey_west(acov, nlags, nobs):
+    """Newey-West long-run variances, with a lag count per column."""
+    lags = np.arange(acov.shape[0])[:, None]
+    weights = np.where(lags <= nlags, 1.0 - lags / (nlags + 1.0), 0.0)
+    weights[0] = 0.5
+    return 2 * (weights * acov).sum(axis=0) / nobs
+
+
+def kpss_lag_bound(nobs):
+    """An upper bound of the KPSS lags selected for a series of nobs.
+
+    The bound holds for series with no negative autocovariances, for which
+    the ratio driving the automatic selection is at most the number of
+    autocovariances it uses.
+    """
+    covlags = int(np.power(nobs, 2.0 / 9.0))
+    bound = 1.1447 * np.power(covlags, 2.0 / 3.0) * np.power(nobs, 1 / 3.0)
+    return int(min(nobs - 1, np.ceil(bound)))
+
+
+def _index_sums(lo, hi):
+    """The count, sum and sum of squares of integers s, lo <= s < hi."""
+
+    def squares(m):
+        return m * (m + 1) * (2 * m + 1) / 6
+
+    lo = np.asarray(lo, dtype=float)
+    return (
+        hi - lo,
+        ((hi - 1) * hi - (lo - 1) * lo) / 2,
+        squares(hi - 1.0) - squares(lo - 1),
+    )
+
+
+def _power_sums(n):
+    """Sums of u**2, u**3 and u**4 over u = 1, ..., n."""
+    n = float(n)
+    p2 = n * (n + 1) * (2 * n + 1) / 6
+    p3 = (n * (n + 1) / 2) ** 2
+    p4 = n * (n + 1) * (2 * n + 1) * (3 * n * n + 3 * n - 1) / 30
+    return p2, p3, p4
+
+
+def _kpss_from_sums(nobs, sums, partial, lagprods, heads, tails):
+    """The trend stationarity KPSS test of series summarized by sums.
+
+    Series of nobs observations y_s, s = 0, ..., nobs - 1, are given, along
+    their last axis, by sums holding the sums of y_s and s*y_s; by partial
+    holding the sums of Y_s^2, u*Y_s and u*(u-1)*Y_s, with Y_s the partial
+    sums of y and u = s + 1; by lagprods holding the sums of y_s * y_{s-l}
+    over s >= l; and by heads and tails holding the sums of y_s and s*y_s
+    over the first and the last l observations, for l = 0, ..., L along
+    their second to last axis. The residuals of the trend fit, their partial
+    sums and their autocovariances follow algebraically.
+
+    Returns the statistics, p-values and lags selected as in kpss_batch,
+    with statistics using the selected lags capped at L.
+    """
+    sum_y, sum_sy = sums
+    # the trend fit a + b*s
+    _, sum_s, sum_s2 = _index_sums(0, nobs)
+    slope = (nobs * sum_sy - sum_s * sum_y) / (nobs * sum_s2 - sum_s ** 2)
+    intercept = (sum_y - slope * sum_s) / nobs
+    # partial sums of the residuals are Y_s - a*u - b*u*(u-1)/2
+    p2, p3, p4 = _power_sums(nobs)
+    eta = (
+        partial[0]
+        - 2 * intercept * partial[1]
+        - slope * partial[2]
+        + intercept ** 2 * p2
+        + intercept * slope * (p3 - p2)
+        + slope ** 2 / 4 * (p4 - 2 * p3 + p2)
+    ) / nobs ** 2
+    # sums of e_s * e_{s-l}, with e_s = y_s - a - b*s, over s >= l
+    nlags = lagprods.shape[0] - 1
+    lags = np.arange(nlags + 1)[:, None]
+    q0, q1, q2 = (q[:, None] for q in _index_sums(lags[:, 0], nobs))
+    acov = (
+        lagprods
+        - (intercept - slope * lags) * (sum_y - heads[0])
+        - slope * (sum_sy - heads[1])
+        - (intercept + slope * lags) * (sum_y - tails[0])
+        - slope * (sum_sy - tails[1])
+        + intercept ** 2 * q0
+        + 2 * intercept * slope * q1
+        + slope ** 2 * q2
+        - slope * lags * (intercept * q0 + slope * q1)
+    )
+    covlags = min(int(np.power(nobs, 2.0 / 9.0)), nlags)
+    usedlag = np.minimum(_autolags(acov[: covlags + 1], nobs), nobs - 1)
+    kpss_stat = eta / _newey_west(acov, np.minimum(usedlag, nlags), nobs)
+    p_value = np.interp(kpss_stat, KPSS_CRIT["ct"], KPSS_PVALS)
+    return kpss_stat, p_value, usedlag
+
+
+def kpss_batch(X, regression="ct", nlags="auto"):
+    """Runs the KPSS stationarity test on all columns of a 2D array.
+
+    The test is equivalent to running statsmodels' kpss on each column. All
+    columns are detrended with a single projection on the shared
+    deterministic terms, partial sums are taken with a single cumulative sum
+    and the Newey-West long-run variances of all columns are computed in one
+    vectorized pass. Unlike statsmodels, no warning is issued for statistics
+    outside of the p-value look-up table; p-values are capped at 0.01 and
+    0.1 as usual.
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        A 2D array of shape (time, variables) with no missing values.
+    regression : str, default "ct"
+        The null hypothesis of the test: "c" for level stationarity and "ct"
+        for trend stationarity.
+    nlags : str or int, default "auto"
+        The number of lags used in the long-run variance estimation. "auto"
+        selects it per column using the method of Hobijn et al. (1998), while
+        "legacy" uses int(12 * (n / 100)**(1 / 4)).
+
+    Returns
+    -------
+    kpss_stat : numpy.ndarray
+        The test statistic of each column.
+    p_value : numpy.ndarray
+        The interpolated p-value of each column.
+    lags : numpy.ndarray
+        The truncation lag used for each column.
+    """
+    X = np.asarray(X, dtype=float)
+    if X.ndim == 1:
+        X = X[:, None]
+    if X.ndim != 2:
+        raise ValueError("X must be a 1D or a 2D array!")
+    if regression not in KPSS_CRIT:
+        raise ValueError(
+            f"Unsupported regression {regression}; supported values are "
+            f"{list(KPSS_CRIT)}."
+        )
+    missing = _nonfinite_columns(X)
+    if len(missing) > 0:
+        raise ValueError(
+            f"Invalid input, columns {missing.tolist()} have missing or "
+            "infinite values"
+        )
+    nobs, ncols = X.shape
+    resids = _partial_out(_deterministic_basis(nobs, regression), X)
+    if nlags == "legacy":
+        nlags = int(np.ceil(12.0 * np.power(nobs / 100.0, 1 / 4.0)))
+        lags = np.full(ncols, min(nlags, nobs - 1))
+        acov = _autocovariances(resids, lags[0])
+    elif nlags == "auto":
+        covlags = int(np.power(nobs, 2.0 / 9.0))
+        acov = _autocovariances(resids, covlags)
+        lags = np.minimum(_autolags(acov, nobs), nobs - 1)
+        if lags.max() > covlags:
+            acov = _autocovariances(resids, lags.max())
+    elif isinstance(nlags, str):
+        raise ValueError("nvals must be 'auto' or 'legacy' when not an int")
+    else:
+        if nlags >= nobs:
+            raise ValueError(
+                f"lags ({nlags}) must be < number of observations ({nobs})"
+            )
+        lags = np.full(ncols, int(nlags))
+        acov = _autocovariances(resids, lags[0])
+    partial_sums = np.cumsum(resids, axis=0)
+    eta = np.einsum("tc,tc->c", partial_sums, partial_sums) / (nobs ** 2)
+    kpss_stat = eta / _newey_west(acov, lags, nobs)
+    p_value = np.interp(kpss_stat, KPSS_CRIT[regression], KPSS_PVALS)
+    return kpss_stat, p_value, lags
@@ -0,0 +1,149 @@
+"""Estimates of the memory used to stationarize columns, for budgeting.
+
+Costs are linear models, in float64 cells, of the peak memory measured with
+tracemalloc while testing and transforming columns of synthetic series. Each
+test engine has a cost per column tested together, including the column
+itself, and a fixed cost for engines testing one column at a time.
+"""
+
+from .adf import default_maxlag
+
+
+ITEMSIZE = 8
+
+# cells per row of a transformed block: its input, which out of core is read
+# into a new array, its output and the temporaries of detrending and
+# differentiating
+TRANSFORM_CELLS_PER_CELL = 5
+
+
+def _test_costs(nrows, backend):
+    """Returns the per-column and fixed test costs, in cells, of a backend.
+
+    Backends are given by the values of stationarizer.core.Backend.
+    """
+    maxlag = max(0, default_maxlag(nrows))
+    if backend == "vectorized":
+        # stacked lagged design matrices, for all columns at once
+        return nrows * (4 + 3 * (maxlag + 2)), 0
+    if backend == "statsmodels":
+        # statsmodels keeps the fitted regression of every candidate lag of
+        # a single column at a time
+        return nrows, (maxlag + 2) ** 2 * nrows
+    # the incremental engine only keeps a few copies of a single column
+    return nrows, 12 * nrows
+
+
+def estimate_test_bytes(nrows, ncols, backend):
+    """Estimates the peak memory of testing columns together, in bytes.
+
+    Parameters
+    ----------
+    nrows : int
+        The length of the columns.
+    ncols : int
+        The number of columns tested together.
+    backend : str
+        The test engine. See simple_auto_stationarize.
+
+    Returns
+    -------
+    int
+        The estimated peak memory, including that of the columns.
+    """
+    per_column, fixed = _test_costs(nrows, backend)
+    return ITEMSIZE * (per_column * ncols + fixed)
+
+
+def columns_within(max_memory, nrows, backend):
+    """Returns the number of columns that can be tested within a budget.
+
+    Parameters
+    ----------
+    max_memory : int
+        The memory budget, in bytes.
+    nrows : int
+        The length of the columns.
+    backend : str
+        The test engine. See simple_auto_stationarize.
+
+    Returns
+    -------
+    int
+        The largest number of columns, of at least 1, that can be tested
+        together within max_memory bytes.
+
+    Raises
+    ------
+    ValueError
+        If a single column cannot be tested within max_memory bytes.
+    """
+    per_column, fixed = _test_costs(nrows, backend)
+    ncols = (max_memory // ITEMSIZE - fixed) // per_column
+    if ncols < 1:
+        raise ValueError(
+            f"A memory budget of {max_memory} bytes is too small to test a "
+            f"column of {nrows} rows with the {backend} backend, which takes "
+            f"about {estimate_test_bytes(nrows, 1, backend)} bytes."
+        )
+    return int(ncols)
+
+
+def _transform_count(max_memory, length, what):
+    cell_bytes = ITEMSIZE * TRANSFORM_CELLS_PER_CELL * max(1, length)
+    count = max_memory // cell_bytes
+    if count < 1:
+        raise ValueError(
+            f"A memory budget of {max_memory} bytes is too small to "
+            f"transform a {what} of length {length}, which takes about "
+            f"{cell_bytes} bytes."
+        )
+    return int(count)
+
+
+def rows_within(max_memory, ncols):
+    """Returns the number of rows that can be transformed within a budget.
+
+    Parameters
+    ----------
+    max_memory : int
+        The memory budget, in bytes.
+    ncols : int
+        The number of columns in each row.
+
+    Returns
+    -------
+    int
+        The largest number of rows, of at least 1, of all columns that can
+        be transformed together within max_memory bytes.
+
+    Raises
+    ------
+    ValueError
+        If a single row cannot be transformed within max_memory bytes.
+    """
+    return _transform_count(max_memory, ncols, "row")
+
+
+def transform_columns_within(max_memory, nrows):
+    """Returns the number of columns that can be transformed within a budget.
+
+    Parameters
+    ----------
+    max_memory : int
+        The memory budget, in bytes.
+    nrows : int
+        The length of the columns.
+
+    Returns
+    -------
+    int
+        The largest number of columns, of at least 1, with all their rows,
+        that can be transformed together within max_memory bytes.
+
+    Raises
+    ------
+    ValueError
+        If a single column cannot be transformed within max_memory bytes.
+    """
+    return _transform_count(max_memory, nrows, "column")
@@ -0,0 +1,342 @@
+"""Streaming stationarity monitoring with constant-time updates.
+
+A StationarityMonitor keeps, per column, sufficient statistics of the ADF
+and KPSS tests run by simple_auto_stationarize - both with a constant and a
+linear trend, with ADF lags selected by AIC and KPSS lags by the method of
+Hobijn et al. - so that both can be recomputed on demand over the whole
+history without scanning it again.
+
+For the ADF test, these are the cross-products of the regression design with
+the maximal number of lags, updated with each new row, and the first rows of
+the series, from which the cross-products of the regressions with fewer lags
+- which start earlier - are derived. For the KPSS test, these are running
+sums of the observations, of their partial sums and of their lagged
+products, from which the trend residuals' partial sums and autocovariances
+follow algebraically. The cost of an update is thus independent of the
+length of the history.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from .adf import (
+    MAX_BATCH_FLOATS,
+    default_maxlag,
+    mackinnonp,
+    _best_lags,
+    _cholesky_factor,
+    _nested_last_tvalues,
+    _nonfinite_columns,
+    _nested_ssrs,
+    _padded_design,
+    _row_windows,
+    _tvalues,
+)
+from .kpss import kpss_lag_bound, _kpss_from_sums
+from .core import (
+    DEF_ALPHA,
+    CONCLUSIONS,
+    _correct_pvals,
+    _conclusion_codes,
+)
+from .transform import trend_coefficients
+
+
+# both tests include a constant and a linear trend, as in core
+NTREND = 2
+# lag capacities are derived from this expected history length by default
+DEF_MAX_NOBS = 10 ** 5
+# the minimal number of first rows the preconditioning trend is fitted on
+DEF_WARMUP = 1000
+
+# the statistics of a StationarityMonitor, per column
+MonitorStatistics = namedtuple(
+    "MonitorStatistics",
+    [
+        "adf_stats",
+        "adf_pvals",
+        "adf_lags",
+        "kpss_stats",
+        "kpss_pvals",
+        "kpss_lags",
+    ],
+)
+
+
+class StationarityMonitor(object):
+    """Tracks the stationarity of streaming series with constant-time updates.
+
+    Rows are fed with update as they arrive, and the ADF and KPSS statistics
+    of the whole history of each column, or the resulting conclusions, are
+    computed on demand with statistics and conclusions. These equal the
+    results of simple_auto_stationarize's tests on the full history, up to
+    rounding, as long as the numbers of lags they select stay within the
+    capacities of the monitor; beyond them, lags are capped.
+
+    A linear trend, fitted on the first rows, is subtracted from all
+    observations. This leaves all statistics unchanged, but keeps the
+    running sums well scaled. Rows are thus buffered until at least 1000 of
+    them, and no fewer than the first rows kept for the ADF regressions,
+    have arrived; a longer history can be given in the first update.
+
+    Parameters
+    ----------
+    ncols : int
+        The number of monitored columns.
+    max_nobs : int, optional
+        The expected maximal history length, from which lag capacities are
+        derived. Defaults to 100000.
+    adf_max_lags : int, optional
+        The maximal number of ADF lags. Defaults to the ADF lags of a series
+        of max_nobs observations. Updates cost O(adf_max_lags**2) per column.
+    kpss_max_lags : int, optional
+        The maximal number of KPSS lags. Defaults to an upper bound of the
+        KPSS lags selected for series of max_nobs observations. Updates cost
+        O(kpss_max_lags) per column.
+    """
+
+    def __init__(
+        self, ncols, max_nobs=None, adf_max_lags=None, kpss_max_lags=None
+    ):
+        if max_nobs is None:
+            max_nobs = DEF_MAX_NOBS
+        if adf_max_lags is None:
+            adf_max_lags = default_maxlag(max_nobs)
+        if kpss_max_lags is None:
+            kpss_max_lags = kpss_lag_bound(max_nobs)
+        self.ncols = ncols
+        self.adf_max_lags = adf_max_lags
+        self.kpss_max_lags = kpss_max_lags
+        # the number of first and of most recent observations kept
+        self._nkeep = max(adf_max_lags + 1, kpss_max_lags)
+        # rows buffered until the preconditioning trend is fitted
+        self._pending = np.empty((0, ncols))
+        self._warmup = max(self._nkeep, DEF_WARMUP)
+        self._nobs = 0
+        self._offsets = np.zeros(ncols)
+        self._slopes = np.zeros(ncols)
+        self._first = np.empty((0, ncols))
+        self._recent = np.empty((0, ncols))
+        # cross-products of the maximal ADF design, over rows past its lags
+        k = NTREND + adf_max_lags + 2
+        self._gram = np.zeros((ncols, k, k))
+        # sums of y_s and s*y_s, the last partial sum Y_s, and sums of Y_s^2,
+        # u*Y_s and u*(u-1)*Y_s, with u = s + 1
+        self._sums = np.zeros((2, ncols))
+        self._cumsum = np.zeros(ncols)
+        self._partial = np.zeros((3, ncols))
+        # sums of y_s * y_{s-lag}, for every lag
+        self._lagprods = np.zeros((kpss_max_lags + 1, ncols))
+
+    @property
+    def n_obs(self):
+        """The number of rows seen so far."""
+        if self._pending is None:
+            return self._nobs
+        return len(self._pending)
+
+    def update(self, rows):
+        """Folds new observations into the statistics of all columns.
+
+        Parameters
+        ----------
+        rows : numpy.ndarray
+            A single row of shape (columns,), or consecutive rows of shape
+            (time, columns).
+
+        Returns
+        -------
+        StationarityMonitor
+            This monitor.
+
+        Raises
+        ------
+        ValueError
+            If any value of rows is missing or infinite; the monitor is left
+            unchanged.
+        """
+        rows = np.asarray(rows, dtype=float)
+        if rows.ndim == 1:
+            rows = rows[None, :]
+        if rows.ndim != 2 or rows.shape[1] != self.ncols:
+            raise ValueError(f"Expected rows of {self.ncols} columns!")
+        # a single NaN would poison the running sums of its column for good
+        missing = _nonfinite_columns(rows)
+        if len(missing) > 0:
+            raise ValueError(
+                f"Invalid input, columns {missing.tolist()} have missing or "
+                "infinite values"
+            )
+        if self._pending is not None:
+            rows = np.concatenate([self._pending, rows])
+            if len(rows) < self._warmup:
+                self._pending = rows
+                return self
+            self._pending = None
+            self._slopes, self._offsets = trend_coefficients(rows)
+        self._fold(rows)
+        return self
+
+    def _fold(self, rows):
+        # bounds the stacked design rows of a chunk
+        chunk = max(1, MAX_BATCH_FLOATS // (self.ncols * self._gram.shape[1]))
+        for start in range(0, len(rows), chunk):
+            self._update_chunk(rows[start : start + chunk])
+
+    def _warmed_up(self):
+        """This monitor, or a copy folding in the rows it still buffers."""
+        if self._pending is None:
+            return self
+        if len(self._pending) < 2:
+            raise ValueError("Too few observations to test!")
+        monitor = StationarityMonitor(
+            self.ncols,
+            adf_max_lags=self.adf_max_lags,
+            kpss_max_lags=self.kpss_max_lags,
+        )
+        monitor._pending = None
+        monitor._slopes, monitor._offsets = trend_coefficients(self._pending)
+        monitor._fold(self._pending)
+        return monitor
+
+    def _update_chunk(self, rows):
+        n, m = self._nobs, len(rows)
+        steps = np.arange(n, n + m, dtype=float)
+        y = rows - (self._offsets + steps[:, None] * self._slopes)
+        # recent observations followed by the new ones; ext[p] is y_{e0+p}
+        ext = np.concatenate([self._recent, y])
+        p0 = len(self._recent)
+        e0 = n - p0
+        if n < self._nkeep:
+            self._first = np.concatenate([self._first, y[: self._nkeep - n]])
+        self._sums[0] += y.sum(axis=0)
+        self._sums[1] += steps @ y
+        cumsums = self._cumsum + np.cumsum(y, axis=0)
+        self._partial[0] += np.einsum("tc,tc->c", cumsums, cumsums)
+        self._partial[1] += (steps + 1) @ cumsums
+        self._partial[2] += ((steps + 1) * steps) @ cumsums
+        self._cumsum = cumsums[-1]
+        # windows of y_{s-K}, ..., y_s for the new s, with K the maximal
+        # lag and zeros before the first observation
+        nlags = self.kpss_max_lags
+        padded = np.concatenate(
+            [np.zeros((max(0, nlags - p0), self.ncols)), ext]
+        )
+        windows = _row_windows(padded, nlags + 1)[-m:]
+        self._lagprods += np.einsum("tc,tcw->wc", y, windows)[::-1]
+        # ADF rows i, regressing y_{i+1} - y_i, completed by the new rows
+        lags = self.adf_max_lags
+        first_row = max(n - 1, lags)
+        if first_row <= n + m - 2:
+            index = np.arange(first_row, n + m - 1)
+            design = _padded_design(ext, index - e0, index, lags)
+            # (columns, k, rows) @ (columns, rows, k)
+            self._gram += design.transpose(1, 2, 0) @ design.transpose(1, 0, 2)
+        self._recent = ext[-self._nkeep :]
+        self._nobs += m
+
+    def _adf_gram(self, head, lag, cols):
+        """Cross-products of the ADF design with lag lags, on rows i >= lag.
+
+        Rows past the monitor's lag capacity are summed in the stored gram,
+        and earlier ones are added from the design of the first rows.
+        """
+        k = self._gram.shape[1]
+        terms = np.r_[np.arange(NTREND + 1 + lag), k - 1]
+        gram = self._gram[np.ix_(cols, terms, terms)]
+        extra = head[lag:][:, cols][:, :, terms]
+        return gram + np.einsum("tci,tcj->cij", extra, extra)
+
+    def _adf(self):
+        n = self._nobs
+        nrows = n - 1
+        maxlag = min(default_maxlag(n), self.adf_max_lags)
+        nhead = min(self.adf_max_lags, nrows)
+        head = _padded_design(
+            self._first, np.arange(nhead), np.arange(nhead), self.adf_max_lags
+        )
+        cols = np.arange(self.ncols)
+        # lags are selected on the common sample of the maximal lag
+        r = _cholesky_factor(self._adf_gram(head, maxlag, cols))
+        ssrs = _nested_ssrs(r)
+        nobs = nrows - maxlag
+        tlast = _nested_last_tvalues(r, ssrs, nobs)
+        usedlag = _best_lags(
+            ssrs[:, NTREND + 1 :], tlast[:, NTREND:], nobs, NTREND, "aic"
+        )[0]
+        adfstat = np.empty(self.ncols)
+        for lag in np.unique(usedlag):
+            lag_cols = np.flatnonzero(usedlag == lag)
+            r = _cholesky_factor(self._adf_gram(head, lag, lag_cols))
+            adfstat[lag_cols] = _tvalues(r, NTREND, nrows - lag)
+        return adfstat, mackinnonp(adfstat, regression="ct"), usedlag
+
+    def _kpss(self):
+        n = self._nobs
+        # sums of y_s and s*y_s over the first and the last lags observations
+        nlags = min(self.kpss_max_lags, n - 1)
+        first = self._first[:nlags]
+        last = self._recent[len(self._recent) - nlags :]
+        heads = np.stack([first, np.arange(nlags)[:, None] * first])
+        tails = np.stack([last, np.arange(n - nlags, n)[:, None] * last])
+        zeros = np.zeros((2, 1, self.ncols))
+        heads = np.concatenate([zeros, np.cumsum(heads, axis=1)], axis=1)
+        tails = np.concatenate(
+            [zeros, np.cumsum(tails[:, ::-1], axis=1)], axis=1
+        )
+        stat, pvals, usedlag = _kpss_from_sums(
+            n,
+            self._sums,
+            self._partial,
+            self._lagprods[: nlags + 1],
+            heads,
+            tails,
+        )
+        return stat, pvals, np.minimum(usedlag, nlags)
+
+    def statistics(self):
+        """Computes the ADF and KPSS tests over the history of each column.
+
+        Returns
+        -------
+        MonitorStatistics
+            A named tuple of per-column arrays: the statistics, p-values and
+            numbers of lags of the ADF and KPSS tests.
+        """
+        monitor = self._warmed_up()
+        adf_stats, adf_pvals, adf_lags = monitor._adf()
+        kpss_stats, kpss_pvals, kpss_lags = monitor._kpss()
+        return MonitorStatistics(
+            adf_stats=adf_stats,
+            adf_pvals=adf_pvals,
+            adf_lags=adf_lags,
+            kpss_stats=kpss_stats,
+            kpss_pvals=kpss_pvals,
+            kpss_lags=kpss_lags,
+        )
+
+    def conclusions(self, alpha=None, multitest=None):
+        """Concludes on the stationarity of the history of each column.
+
+        Parameters
+        ----------
+        alpha : float, optional
+            See simple_auto_stationarize.
+        multitest : str, optional
+            See simple_auto_stationarize.
+
+        Returns
+        -------
+        list of str
+            The SimpleConclusion of each column, as concluded by
+            simple_auto_stationarize from the same p-values.
+        """
+        if alpha is None:
+            alpha = DEF_ALPHA
+        stats = self.statistics()
+        _, _, adf_rejections, kpss_rejections = _correct_pvals(
+            stats.adf_pvals, stats.kpss_pvals, alpha, multitest
+        )
+        codes = _conclusion_codes(adf_rejections, kpss_rejections)[0]
+        return [CONCLUSIONS[code] for code in codes]
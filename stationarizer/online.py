@@ -0,0 +1,118 @@
+"""Online, stateful stationarization of streaming data."""
+
+import numpy as np
+
+
+class OnlineStationarizer(object):
+    """Stationarizes rows arriving one at a time, or in small batches.
+
+    Applies fixed per-column detrend and diff transformations to a stream of
+    rows. Only the trend coefficients, a time step counter and the last
+    detrended observation of differentiated columns are kept, so each row is
+    transformed with a handful of O(columns) array operations, and no history
+    is stored or rescanned.
+
+    Unlike the batch transformations, no row is trimmed: each output row
+    corresponds to the input row arriving at the same time step.
+
+    Parameters
+    ----------
+    detrend_mask : numpy.ndarray
+        A boolean array marking the columns to detrend.
+    diff_mask : numpy.ndarray
+        A boolean array marking the columns to differentiate. Detrending, if
+        any, is applied first.
+    slopes : numpy.ndarray, optional
+        The trend slope of each column; ignored for columns not detrended.
+    intercepts : numpy.ndarray, optional
+        The trend value of each column at time step 0; ignored for columns
+        not detrended.
+    start : int, default 0
+        The time step of the first row of the stream.
+    last_obs : numpy.ndarray, optional
+        The raw observation preceding the first row of the stream, at time
+        step start - 1. If not given, the first transformed row is NaN for
+        differentiated columns.
+    """
+
+    def __init__(
+        self,
+        detrend_mask,
+        diff_mask,
+        slopes=None,
+        intercepts=None,
+        start=0,
+        last_obs=None,
+    ):
+        detrend_mask = np.asarray(detrend_mask, dtype=bool)
+        ncols = len(detrend_mask)
+        if slopes is None:
+            slopes = np.zeros(ncols)
+        if intercepts is None:
+            intercepts = np.zeros(ncols)
+        # zeroing the trends of other columns makes detrending branch-free
+        self.slopes = np.where(detrend_mask, slopes, 0.0)
+        self.intercepts = np.where(detrend_mask, intercepts, 0.0)
+        self.diff_mask = np.asarray(diff_mask, dtype=bool)
+        self.t = start
+        # the value subtracted from the next detrended row: the previous
+        # detrended row for differentiated columns, and zero for the rest
+        self._anchor = np.where(self.diff_mask, np.nan, 0.0)
+        if last_obs is not None:
+            prev = np.asarray(last_obs, dtype=float)
+            prev = prev - self.slopes * (start - 1) - self.intercepts
+            self._anchor = np.where(self.diff_mask, prev, 0.0)
+
+    @classmethod
+    def from_stationarizer(cls, stationarizer):
+        """Continues the stream right after a fitted Stationarizer's data.
+
+        Parameters
+        ----------
+        stationarizer : stationarizer.Stationarizer
+            A fitted Stationarizer object.
+
+        Returns
+        -------
+        OnlineStationarizer
+            A stationarizer for the rows following the training data.
+        """
+        return cls(
+            detrend_mask=stationarizer.detrend_mask_,
+            diff_mask=stationarizer.diff_mask_,
+            slopes=stationarizer.slopes_,
+            intercepts=stationarizer.intercepts_,
+            start=stationarizer.n_obs_,
+            last_obs=stationarizer.last_obs_,
+        )
+
+    def transform(self, rows):
+        """Transforms the next row or rows of the stream, updating the state.
+
+        Parameters
+        ----------
+        rows : numpy.ndarray
+            A single row, as a 1D array of length ncols, or a batch of
+            consecutive rows, as a 2D array of shape (nrows, ncols).
+
+        Returns
+        -------
+        numpy.ndarray
+            The transformed row or rows, of the same shape as the input.
+        """
+        rows = np.asarray(rows, dtype=float)
+        if rows.ndim == 1:
+            detrended = rows - (self.slopes * self.t + self.intercepts)
+            out = detrended - self._anchor
+            # masked rather than multiplied, as 0 * nan is nan
+            self._anchor = np.where(self.diff_mask, detrended, 0.0)
+            self.t += 1
+            return out
+        steps = np.arange(self.t, self.t + len(rows), dtype=float)[:, None]
+        detrended = rows - (steps * self.slopes + self.intercepts)
+        out = detrended.copy()
+        out[0] -= self._anchor
+        out[1:, self.diff_mask] -= detrended[:-1, self.diff_mask]
+        self._anchor = np.where(self.diff_mask, detrended[-1], 0.0)
+        self.t += len(rows)
+        return out
@@ -0,0 +1,625 @@
+"""Out-of-core stationarization of datasets larger than memory.
+
+Datasets are read in two passes. The unit root tests and trend fits need
+whole series, so the first pass reads groups of columns, with all their
+rows, and keeps only per-column results. Transformations then only need
+those results and a single row of lookahead, so the second pass streams
+batches of rows, with all their columns, from the source to the destination.
+Only one column group or one row batch is held in memory at any time.
+"""
+
+import os
+import logging
+
+import numpy as np
+
+from .core import (
+    DEF_ALPHA,
+    ArrayResults,
+    _run_test,
+    _correct_pvals,
+    _conclusion_codes,
+    _resolve_backend,
+)
+from .adf import _nonfinite_columns
+from .cache import get_default_cache
+from .memory import columns_within, rows_within
+from .parallel import ColumnPool, column_groups
+from .transform import trend_coefficients, apply_transformations
+from .util import get_logger, set_verbosity_level
+
+
+# the number of float cells read at once, by default; 128MB of float64
+DEF_WORKING_SET_CELLS = 2 ** 24
+
+
+def _cells_to_count(working_set_cells, length):
+    """The number of rows or columns of the given length fitting in memory."""
+    return max(1, int(working_set_cells // max(1, length)))
+
+
+def _align(count, chunk):
+    """Rounds count down to a multiple of chunk, if it is at least chunk."""
+    if chunk and count >= chunk:
+        return count - count % chunk
+    return count
+
+
+def _plan_chunks(shape, max_memory, backend, group_size, batch_rows, chunks):
+    """Returns the column group size and row batch length to read data by.
+
+    Unless given, both are sized to fit max_memory bytes, or about 2**24
+    float cells if no budget is set, and are then rounded down to multiples
+    of the on-disk chunks, if any, so each chunk is read once per pass.
+    """
+    nrows, ncols = shape
+    chunks = chunks or (None, None)
+    if group_size is None:
+        if max_memory is None:
+            group_size = _cells_to_count(DEF_WORKING_SET_CELLS, nrows)
+        else:
+            group_size = columns_within(max_memory, nrows, backend)
+        group_size = _align(group_size, chunks[1])
+    if batch_rows is None:
+        if max_memory is None:
+            batch_rows = _cells_to_count(DEF_WORKING_SET_CELLS, ncols)
+        else:
+            batch_rows = rows_within(max_memory, ncols)
+        batch_rows = _align(batch_rows, chunks[0])
+    return group_size, batch_rows
+
+
+def _test_column_groups(
+    read_columns, groups, nrows, labels, backend, n_jobs, cache
+):
+    """Runs both tests and fits trends over all columns, a group at a time.
+
+    read_columns is called with each group and a Fortran-ordered float
+    buffer of all the rows of its columns, which it fills. A single buffer
+    is reused by all groups, so no other copy of a group is held. Returns
+    the ADF and KPSS statistics and p-values and the trend slopes and
+    intercepts of all columns.
+
+    Raises a ValueError, as stationarize_array does, if a group holds any
+    missing or infinite value.
+    """
+    logger = get_logger()
+    ncols = len(labels)
+    results = np.empty((6, ncols))
+    width = max(group.stop - group.start for group in groups)
+    buffer = np.empty((nrows, width), order="F")
+    for group in groups:
+        # the leading columns of a Fortran-ordered array are contiguous
+        X = buffer[:, : group.stop - group.start]
+        read_columns(group, X)
+        missing = group.start + _nonfinite_columns(X)
+        if len(missing) > 0:
+            raise ValueError(
+                f"Invalid input, columns {[labels[i] for i in missing]} have "
+                "missing or infinite values"
+            )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Testing columns %s of %s...", group, ncols)
+        # both tests share a single copy of the group with workers
+        with ColumnPool(X, n_jobs) as pool:
+            results[0:2, group] = _run_test("adf", pool, backend, cache)[:2]
+            results[2:4, group] = _run_test("kpss", pool, backend, cache)[:2]
+        results[4:6, group] = trend_coefficients(X)
+    return results
+
+
+def _transform_row_batches(
+    batches, write_rows, detrend_mask, diff_mask, slopes, intercepts
+):
+    """Streams transformed row batches to write_rows.
+
+    The last row of each batch is held back, as differentiated rows depend
+    on the following observation, and is transformed together with the
+    first row of the next one, so the concatenated output equals that of
+    stationarize_array while a single batch is held at a time. Returns the
+    number of rows written.
+    """
+    start = 0
+    last = None
+    for batch in batches:
+        batch = np.asarray(batch, dtype=float)
+        if not len(batch):
+            continue
+        if last is not None:
+            block = np.concatenate([last, batch[:1]])
+            write_rows(
+                apply_transformations(
+                    block, detrend_mask, diff_mask, slopes, intercepts, start
+                )[:1]
+            )
+            start += 1
+        post = apply_transformations(
+            batch, detrend_mask, diff_mask, slopes, intercepts, start
+        )[: len(batch) - 1]
+        if len(post):
+            write_rows(post)
+        start += len(post)
+        last = batch[-1:].copy()
+        # released before the next batch is read
+        del batch, post
+    if last is not None:
+        post = apply_transformations(
+            last, detrend_mask, diff_mask, slopes, intercepts, start
+        )
+        if len(post):
+            write_rows(post)
+        start += len(post)
+    return start
+
+
+def stationarize_out_of_core(
+    read_columns,
+    iter_row_batches,
+    open_writer,
+    shape,
+    group_size,
+    verbosity=None,
+    alpha=None,
+    multitest=None,
+    backend=None,
+    n_jobs=None,
+    cache=None,
+    labels=None,
+):
+    """Auto-stationarizes a dataset read and written through callbacks.
+
+    This is the engine behind the file-level stationarization functions;
+    see the module docstring for how data is read.
+
+    Parameters
+    ----------
+    read_columns : callable
+        Called with a slice of column indices and a Fortran-ordered float 2D
+        array of shape (rows, columns in the slice), which it fills with all
+        rows of these columns.
+    iter_row_batches : callable
+        Called with no arguments, returning an iterable of 2D arrays holding
+        consecutive row batches of all columns, in order.
+    open_writer : callable
+        Called with the number of transformed rows once it is known,
+        returning a callable which is then called with each consecutive
+        batch of transformed rows, as a 2D array.
+    shape : tuple of int
+        The number of rows and columns in the dataset.
+    group_size : int
+        The number of columns tested together.
+    verbosity : int, logging.Logger, optional
+        See simple_auto_stationarize.
+    alpha : int, optional
+        See simple_auto_stationarize.
+    multitest : str, optional
+        See simple_auto_stationarize.
+    backend : str, optional
+        See simple_auto_stationarize.
+    n_jobs : int, optional
+        See simple_auto_stationarize. Applies within each column group.
+    cache : bool or stationarizer.cache.UnitRootCache, optional
+        See simple_auto_stationarize.
+    labels : sequence, optional
+        The labels of the columns, naming them in errors. Defaults to their
+        indices.
+
+    Returns
+    -------
+    ArrayResults
+        The per-column results. See stationarize_array.
+
+    Raises
+    ------
+    ValueError
+        If any value is missing or infinite, as found while testing the
+        column groups; no transformed row is written.
+    """
+    if alpha is None:
+        alpha = DEF_ALPHA
+    backend = _resolve_backend(backend)
+    if cache is True:
+        cache = get_default_cache()
+    elif cache is False:
+        cache = None
+    if verbosity is not None:
+        prev_verbosity = set_verbosity_level(verbosity)
+    try:
+        logger = get_logger()
+        nrows, ncols = shape
+        if labels is None:
+            labels = range(ncols)
+        groups = column_groups(ncols, group_size)
+        logger.info(
+            "Testing %s columns in %s groups...", ncols, len(groups)
+        )
+        (
+            adf_stats,
+            adf_pvals,
+            kpss_stats,
+            kpss_pvals,
+            slopes,
+            intercepts,
+        ) = _test_column_groups(
+            read_columns, groups, nrows, labels, backend, n_jobs, cache
+        )
+        (
+            adf_corrected_pvals,
+            kpss_corrected_pvals,
+            adf_rejections,
+            kpss_rejections,
+        ) = _correct_pvals(adf_pvals, kpss_pvals, alpha, multitest)
+        codes, detrend_mask, diff_mask = _conclusion_codes(
+            adf_rejections, kpss_rejections
+        )
+        post_nrows = nrows - 1 if diff_mask.any() else nrows
+        logger.info("Applying transformations...")
+        _transform_row_batches(
+            iter_row_batches(),
+            open_writer(post_nrows),
+            detrend_mask,
+            diff_mask,
+            slopes,
+            intercepts,
+        )
+        logger.info("Wrote %s transformed rows.", post_nrows)
+        return ArrayResults(
+            adf_stats=adf_stats,
+            adf_pvals=adf_pvals,
+            kpss_stats=kpss_stats,
+            kpss_pvals=kpss_pvals,
+            adf_corrected_pvals=adf_corrected_pvals,
+            kpss_corrected_pvals=kpss_corrected_pvals,
+            adf_rejections=adf_rejections,
+            kpss_rejections=kpss_rejections,
+            conclusions=codes,
+            detrend_mask=detrend_mask,
+            diff_mask=diff_mask,
+        )
+    finally:
+        if verbosity is not None:
+            set_verbosity_level(prev_verbosity)
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(
+            "Parquet support requires pyarrow, which can be installed with "
+            "`pip install stationarizer[parquet]`."
+        )
+    return pyarrow, pyarrow.parquet
+
+
+def _numeric_columns(schema, pa):
+    # a stored dataframe index is a column of the file, but not a feature;
+    # range indices are only described in the metadata
+    metadata = schema.pandas_metadata or {}
+    index_columns = {
+        name
+        for name in metadata.get("index_columns", [])
+        if isinstance(name, str)
+    }
+    return [
+        field.name
+        for field in schema
+        if field.name not in index_columns
+        and (
+            pa.types.is_integer(field.type) or pa.types.is_floating(field.type)
+        )
+    ]
+
+
+def _arrays_to_matrix(arrays, nrows):
+    X = np.empty((nrows, len(arrays)), order="F")
+    for i, array in enumerate(arrays):
+        X[:, i] = array.to_numpy(zero_copy_only=False)
+    return X
+
+
+def stationarize_parquet(
+    source,
+    destination,
+    columns=None,
+    max_memory=None,
+    group_size=None,
+    batch_rows=None,
+    verbosity=None,
+    alpha=None,
+    multitest=None,
+    backend=None,
+    n_jobs=None,
+    cache=None,
+):
+    """Auto-stationarizes the columns of a Parquet file into another one.
+
+    The source is read a group of columns at a time for testing, then a
+    batch of rows at a time for transformation, so only a bounded working
+    set is held in memory, however large the file. Transformed rows are
+    streamed into the destination, a row group per batch. Requires pyarrow.
+
+    Parameters
+    ----------
+    source : str or file-like
+        The Parquet file to stationarize.
+    destination : str or file-like
+        The Parquet file to write, holding a float64 column per stationarized
+        column. Its rows are those of stationarize_array's output.
+    columns : list of str, optional
+        The columns to stationarize. Defaults to all integer and floating
+        point columns, skipping others and any stored dataframe index.
+    max_memory : int, optional
+        A budget, in bytes, for the working set of each pass, excluding
+        pyarrow's read buffers. Column groups and row batches are sized to
+        fit it, using the estimates of stationarizer.memory. If not given,
+        both hold about 2**24 float cells.
+    group_size : int, optional
+        The number of columns read and tested together. Overrides the size
+        derived from max_memory.
+    batch_rows : int, optional
+        The number of rows read and transformed together. Overrides the
+        length derived from max_memory.
+    verbosity : int, logging.Logger, optional
+        See simple_auto_stationarize.
+    alpha : int, optional
+        See simple_auto_stationarize.
+    multitest : str, optional
+        See simple_auto_stationarize.
+    backend : str, optional
+        See simple_auto_stationarize.
+    n_jobs : int, optional
+        See simple_auto_stationarize. Applies within each column group.
+    cache : bool or stationarizer.cache.UnitRootCache, optional
+        See simple_auto_stationarize.
+
+    Returns
+    -------
+    ArrayResults
+        The per-column results, aligned with columns. See stationarize_array.
+
+    Raises
+    ------
+    ValueError
+        If any value of the columns is missing or infinite.
+    """
+    pa, pq = _import_pyarrow()
+    pfile = pq.ParquetFile(source)
+    if columns is None:
+        columns = _numeric_columns(pfile.schema_arrow, pa)
+    columns = list(columns)
+    nrows = pfile.metadata.num_rows
+    shape = (nrows, len(columns))
+    group_size, batch_rows = _plan_chunks(
+        shape,
+        max_memory,
+        _resolve_backend(backend),
+        group_size,
+        batch_rows,
+        None,
+    )
+
+    def read_columns(group, out):
+        # columns are stored apart, so reading them one at a time costs
+        # nothing more and holds a single column outside out
+        for i, name in enumerate(columns[group]):
+            column = pfile.read(columns=[name], use_threads=True).column(0)
+            out[:, i] = column.to_numpy(zero_copy_only=False)
+
+    def iter_row_batches():
+        for batch in pfile.iter_batches(
+            batch_size=batch_rows, columns=columns
+        ):
+            yield _arrays_to_matrix(batch.columns, batch.num_rows)
+
+    schema = pa.schema([(name, pa.float64()) for name in columns])
+    writers = []
+
+    def open_writer(post_nrows):
+        # opened only once all columns are tested, so a failed run leaves
+        # no destination behind
+        writer = pq.ParquetWriter(destination, schema)
+        writers.append(writer)
+
+        def write_rows(rows):
+            writer.write_table(
+                pa.Table.from_arrays(
+                    [pa.array(rows[:, i]) for i in range(rows.shape[1])],
+                    schema=schema,
+                )
+            )
+
+        return write_rows
+
+    try:
+        return stationarize_out_of_core(
+            read_columns,
+            iter_row_batches,
+            open_writer,
+            shape,
+            group_size,
+            verbosity=verbosity,
+            alpha=alpha,
+            multitest=multitest,
+            backend=backend,
+            n_jobs=n_jobs,
+            cache=cache,
+            labels=columns,
+        )
+    finally:
+        for writer in writers:
+            writer.close()
+
+
+def _open_npy_writer(path, ncols, destinations):
+    """Returns an open_writer callback writing rows into a new .npy file."""
+
+    def open_writer(post_nrows):
+        # rows are written in order, so the file is row-major
+        post = np.lib.format.open_memmap(
+            path, mode="w+", dtype=float, shape=(post_nrows, ncols)
+        )
+        destinations.append(post)
+        return _array_writer(post)
+
+    return open_writer
+
+
+def _column_reader(source):
+    """Returns a read_columns callback copying columns of a 2D array-like.
+
+    Slices of numpy arrays, memmaps included, are views, so they are copied
+    straight into the buffer. Other sources, like h5py Datasets or zarr
+    Arrays, return new arrays, so they are copied an on-disk chunk, or a
+    single column if they have no chunks, at a time.
+    """
+    if isinstance(source, np.ndarray):
+
+        def read_columns(group, out):
+            np.copyto(out, source[:, group])
+
+        return read_columns
+    nrows = source.shape[0]
+    chunk_rows, chunk_cols = getattr(source, "chunks", None) or (nrows, 1)
+
+    def read_columns(group, out):
+        for col in range(group.start, group.stop, chunk_cols):
+            cols = slice(col, min(col + chunk_cols, group.stop))
+            out_cols = slice(cols.start - group.start, cols.stop - group.start)
+            for row in range(0, nrows, chunk_rows):
+                rows = slice(row, row + chunk_rows)
+                out[rows, out_cols] = source[rows, cols]
+
+    return read_columns
+
+
+def _array_writer(destination):
+    """Returns a callback writing consecutive row batches into an array."""
+    offset = 0
+
+    def write_rows(rows):
+        nonlocal offset
+        destination[offset : offset + len(rows)] = rows
+        offset += len(rows)
+
+    return write_rows
+
+
+def stationarize_chunked(
+    source,
+    destination,
+    max_memory=None,
+    group_size=None,
+    batch_rows=None,
+    verbosity=None,
+    alpha=None,
+    multitest=None,
+    backend=None,
+    n_jobs=None,
+    cache=None,
+):
+    """Auto-stationarizes a 2D array source too large to be read at once.
+
+    The source can be any 2D array-like supporting shape and slicing, like
+    a numpy.memmap, such as one returned by numpy.load with mmap_mode set, an
+    h5py Dataset or a zarr Array. It is read a group of columns at a time
+    for testing, then a batch of rows at a time for transformation. Unless
+    set explicitly, groups and batches are sized to fit max_memory, then
+    aligned with the chunks of the source, if it has any, so every on-disk
+    chunk is read once per pass.
+
+    Parameters
+    ----------
+    source : array-like
+        A 2D array-like of shape (time, variables).
+    destination : str, os.PathLike or array-like
+        The path of a .npy file to create, holding the transformed array, or
+        a writable 2D array-like of the same shape as source, like a memmap,
+        an h5py Dataset or a zarr Array, into whose top rows the transformed
+        array is written. If any column is differentiated, the last row of
+        such a destination is left as is.
+    max_memory : int, optional
+        A budget, in bytes, for the working set of each pass. Column groups
+        and row batches are sized to fit it, using the estimates of
+        stationarizer.memory. If not given, both hold about 2**24 float
+        cells.
+    group_size : int, optional
+        The number of columns read and tested together. Overrides the size
+        derived from max_memory.
+    batch_rows : int, optional
+        The number of rows read and transformed together. Overrides the
+        length derived from max_memory.
+    verbosity : int, logging.Logger, optional
+        See simple_auto_stationarize.
+    alpha : int, optional
+        See simple_auto_stationarize.
+    multitest : str, optional
+        See simple_auto_stationarize.
+    backend : str, optional
+        See simple_auto_stationarize.
+    n_jobs : int, optional
+        See simple_auto_stationarize. Applies within each column group.
+    cache : bool or stationarizer.cache.UnitRootCache, optional
+        See simple_auto_stationarize.
+
+    Returns
+    -------
+    post : numpy.memmap or array-like
+        The transformed array, memory-mapped from the created .npy file, or
+        the given destination.
+    results : ArrayResults
+        The per-column results. See stationarize_array.
+
+    Raises
+    ------
+    ValueError
+        If any value of source is missing or infinite.
+    """
+    shape = tuple(source.shape)
+    if len(shape) != 2:
+        raise ValueError("stationarize_chunked expects a 2D source!")
+    nrows, ncols = shape
+    group_size, batch_rows = _plan_chunks(
+        shape,
+        max_memory,
+        _resolve_backend(backend),
+        group_size,
+        batch_rows,
+        getattr(source, "chunks", None),
+    )
+    destinations = []
+    if isinstance(destination, (str, os.PathLike)):
+        open_writer = _open_npy_writer(destination, ncols, destinations)
+    else:
+        if tuple(destination.shape) != shape:
+            raise ValueError(
+                f"Expected a destination of shape {shape}, like the source!"
+            )
+        destinations.append(destination)
+        writer = _array_writer(destination)
+
+        def open_writer(post_nrows):
+            return writer
+
+    def iter_row_batches():
+        for start in range(0, nrows, batch_rows):
+            yield source[start : start + batch_rows]
+
+    results = stationarize_out_of_core(
+        _column_reader(source),
+        iter_row_batches,
+        open_writer,
+        shape,
+        group_size,
+        verbosity=verbosity,
+        alpha=alpha,
+        multitest=multitest,
+        backend=backend,
+        n_jobs=n_jobs,
+        cache=cache,
+    )
+    post = destinations[0]
+    if isinstance(post, np.memmap):
+        post.flush()
+    return post, results
@@ -0,0 +1,321 @@
+"""Parallel execution of per-column computations over a process pool."""
+
+import os
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # pragma: no cover
+    # Python < 3.8; chunks are pickled to workers instead
+    shared_memory = None
+
+
+# each worker gets this many column chunks on average; a few chunks per
+# worker balance the load while keeping inter-process communication low
+DEF_CHUNKS_PER_JOB = 4
+
+
+def effective_n_jobs(n_jobs):
+    """Returns the number of worker processes to use for the given n_jobs.
+
+    Parameters
+    ----------
+    n_jobs : int, optional
+        The number of jobs to run in parallel. None and 1 mean no
+        parallelism, while negative values are interpreted as in joblib:
+        -1 uses all CPUs, -2 all CPUs but one, and so on.
+
+    Returns
+    -------
+    int
+        A positive number of worker processes.
+    """
+    if n_jobs is None:
+        return 1
+    if n_jobs == 0:
+        raise ValueError("n_jobs == 0 has no meaning!")
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return n_jobs
+
+
+def column_chunks(ncols, n_jobs, chunks_per_job=None):
+    """Splits ncols columns into contiguous chunks to distribute to workers.
+
+    Parameters
+    ----------
+    ncols : int
+        The number of columns to split.
+    n_jobs : int
+        The number of worker processes.
+    chunks_per_job : int, optional
+        The average number of chunks per worker. Defaults to 4.
+
+    Returns
+    -------
+    list of slice
+        Contiguous column slices covering all columns, in order.
+    """
+    if chunks_per_job is None:
+        chunks_per_job = DEF_CHUNKS_PER_JOB
+    nchunks = max(1, min(ncols, n_jobs * chunks_per_job))
+    bounds = [round(i * ncols / nchunks) for i in range(nchunks + 1)]
+    return [slice(bounds[i], bounds[i + 1]) for i in range(nchunks)]
+
+
+def column_groups(ncols, group_size):
+    """Splits ncols columns into contiguous groups of group_size columns.
+
+    Parameters
+    ----------
+    ncols : int
+        The number of columns to split.
+    group_size : int
+        The number of columns in each group; the last may hold fewer.
+
+    Returns
+    -------
+    list of slice
+        Contiguous column slices covering all columns, in order.
+    """
+    return [
+        slice(start, min(start + group_size, ncols))
+        for start in range(0, ncols, group_size)
+    ]
+
+
+class _SharedBlockArray(object):
+    """Exposes a shared memory block as an array base keeping it open.
+
+    Arrays built from this object, and their views, hold a reference to it,
+    and through it to the block, which is closed once they are all gone.
+    They do not export the block's buffer, so closing it never fails.
+    """
+
+    def __init__(self, block, shape, dtype):
+        self.block = block
+        arr = np.ndarray(shape, dtype=dtype, buffer=block.buf, order="F")
+        self.__array_interface__ = arr.__array_interface__
+
+
+def _create_shared_array(shape, dtype):
+    """Creates a column-major array backed by a new shared memory block."""
+    nbytes = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+    block = shared_memory.SharedMemory(create=True, size=nbytes)
+    return block, np.asarray(_SharedBlockArray(block, shape, dtype))
+
+
+def _attach_shared_array(spec):
+    """Attaches to a shared array given its (name, shape, dtype) spec."""
+    name, shape, dtype = spec
+    block = shared_memory.SharedMemory(name=name)
+    arr = np.ndarray(shape, dtype=dtype, buffer=block.buf, order="F")
+    return block, arr
+
+
+def _as_columns(indices):
+    """Returns a slice selecting the given column indices, if contiguous."""
+    if len(indices) and np.array_equal(
+        indices, np.arange(indices[0], indices[0] + len(indices))
+    ):
+        return slice(int(indices[0]), int(indices[0]) + len(indices))
+    return indices
+
+
+def _apply_to_columns(func, X, cols, out, col_args, kwargs):
+    """Applies func to columns cols of X, writing into the same ones of out."""
+    chunk = np.asfortranarray(X[:, cols])
+    if out is None:
+        return func(chunk, *col_args, **kwargs)
+    if isinstance(cols, slice):
+        return func(chunk, *col_args, out=out[:, cols], **kwargs)
+    out_chunk = np.empty(chunk.shape, order="F")
+    result = func(chunk, *col_args, out=out_chunk, **kwargs)
+    out[:, cols] = out_chunk
+    return result
+
+
+def _call_on_chunk(func, kwargs, X, has_out, *col_args):
+    if not has_out:
+        return func(X, *col_args, **kwargs)
+    out = np.empty(X.shape, order="F")
+    return func(X, *col_args, out=out, **kwargs), out
+
+
+def _call_on_shared_chunk(func, kwargs, in_spec, out_spec, cols, *col_args):
+    in_block, X = _attach_shared_array(in_spec)
+    out_block, out = None, None
+    try:
+        if out_spec is not None:
+            out_block, out = _attach_shared_array(out_spec)
+        return _apply_to_columns(func, X, cols, out, col_args, kwargs)
+    finally:
+        # views must be released before their blocks can be closed
+        del X, out
+        in_block.close()
+        if out_block is not None:
+            out_block.close()
+
+
+class ColumnPool(object):
+    """Applies functions to column chunks of a 2D array, in parallel.
+
+    A single process pool serves all calls to map. When running in
+    parallel, X is copied once, on the first call, into a shared memory
+    block laid out column-major, and every worker attaches to the column
+    slices of its chunk without copying them. The output array returned by
+    output is allocated in a shared memory block as well, into which
+    workers write directly; it is not copied, and stays valid after the
+    pool is closed. On Python versions lacking multiprocessing's
+    shared_memory module, chunks are pickled to workers instead.
+
+    Use as a context manager, or call close once done.
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        A 2D array of shape (time, variables). Columns given to functions
+        are made column-major, so a column-major array avoids copying them.
+    n_jobs : int, optional
+        The number of jobs to run in parallel. See effective_n_jobs.
+    """
+
+    def __init__(self, X, n_jobs):
+        self.X = X
+        self.shape = X.shape
+        self.n_jobs = effective_n_jobs(n_jobs)
+        self._out = None
+        self._in_block = None
+        self._out_block = None
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def _shared(self):
+        return self.n_jobs > 1 and shared_memory is not None
+
+    def output(self):
+        """Returns the column-major output array of map, of the shape of X.
+
+        Returns
+        -------
+        numpy.ndarray
+            An uninitialized array, allocated on the first call.
+        """
+        if self._out is None:
+            if self._shared:
+                self._out_block, self._out = _create_shared_array(
+                    self.shape, float
+                )
+            else:
+                self._out = np.empty(self.shape, order="F")
+        return self._out
+
+    def _spec(self, block):
+        if block is None:
+            return None
+        return (block.name, self.shape, np.dtype(float))
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self._shared:
+                self._in_block, shared_X = _create_shared_array(
+                    self.shape, float
+                )
+                shared_X[:] = self.X
+                del shared_X
+            self._executor = ProcessPoolExecutor(max_workers=self.n_jobs)
+        return self._executor
+
+    def map(self, func, cols=None, col_args=None, out=False, **kwargs):
+        """Applies a function to column chunks of the given columns of X.
+
+        Parameters
+        ----------
+        func : callable
+            A picklable function accepting a column chunk of X, followed by
+            the matching chunk of each of the col_args sequences and the
+            given keyword arguments.
+        cols : slice or sequence of int, optional
+            The columns of X to apply func to. Defaults to all columns.
+        col_args : list of sequences, optional
+            Sequences aligned with the selected columns, chunked alongside
+            them.
+        out : bool, default False
+            If set, the matching columns of the output array are passed to
+            func as the out keyword argument, and func is expected to write
+            its output into them. See output.
+        **kwargs
+            Keyword arguments passed as is to every call of func.
+
+        Returns
+        -------
+        list
+            The results of func on each chunk, in column order. If only a
+            single job is used, func is applied to all selected columns at
+            once, so this list holds a single result.
+        """
+        if col_args is None:
+            col_args = []
+        indices = np.arange(self.shape[1])
+        if cols is not None:
+            indices = indices[cols]
+        out_arr = self.output() if out else None
+        if self.n_jobs == 1:
+            cols = _as_columns(indices)
+            result = _apply_to_columns(
+                func, self.X, cols, out_arr, col_args, kwargs
+            )
+            return [result]
+        chunks = column_chunks(len(indices), self.n_jobs)
+        chunk_cols = [_as_columns(indices[chunk]) for chunk in chunks]
+        chunk_args = [[arg[chunk] for chunk in chunks] for arg in col_args]
+        executor = self._get_executor()
+        if not self._shared:  # pragma: no cover
+            task = partial(_call_on_chunk, func, kwargs)
+            results = list(
+                executor.map(
+                    task,
+                    [np.asfortranarray(self.X[:, c]) for c in chunk_cols],
+                    [out] * len(chunks),
+                    *chunk_args,
+                )
+            )
+            if not out:
+                return results
+            for c, (_, out_chunk) in zip(chunk_cols, results):
+                out_arr[:, c] = out_chunk
+            return [result for result, _ in results]
+        task = partial(
+            _call_on_shared_chunk,
+            func,
+            kwargs,
+            self._spec(self._in_block),
+            self._spec(self._out_block) if out else None,
+        )
+        return list(executor.map(task, chunk_cols, *chunk_args))
+
+    def close(self):
+        """Shuts the process pool down and releases the shared input.
+
+        The output array, if any, remains valid.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._in_block is not None:
+            self._in_block.close()
+            self._in_block.unlink()
+            self._in_block = None
+        if self._out_block is not None:
+            # the block is closed once the output array is released
+            self._out_block.unlink()
+            self._out_block = None
@@ -0,0 +1,161 @@
+"""Profiling of the stages of a stationarization run."""
+
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from collections import namedtuple
+
+
+StageProfile = namedtuple(
+    "StageProfile", ["stage", "wall_time", "cpu_time", "peak_memory"]
+)
+
+
+def _cpu_time():
+    # terminated worker processes are accounted for in children times
+    times = os.times()
+    return sum(times[:4])
+
+
+class Profiler(object):
+    """Collects the wall time, CPU time and peak memory of named stages.
+
+    CPU times include those of worker processes that terminated during a
+    stage, such as the process pool used when n_jobs is set. Peak memory is
+    traced with tracemalloc, and so only covers allocations of the calling
+    process, including those of NumPy arrays. If tracemalloc is already
+    tracing, as started by the caller, its peak is left untouched; a stage
+    that stays below the peak reached before it then reports the memory it
+    still holds when it ends, a lower bound of its peak.
+
+    Parameters
+    ----------
+    callback : callable, optional
+        If given, called with the StageProfile of each stage as soon as it
+        completes.
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.stages = []
+        self.column_durations = {}
+
+    @contextmanager
+    def stage(self, name):
+        """A context manager profiling the code it wraps as the named stage.
+
+        Parameters
+        ----------
+        name : str
+            The name of the stage.
+        """
+        owns_tracing = not tracemalloc.is_tracing()
+        if owns_tracing:
+            tracemalloc.start()
+        # the peak of a tracer started by the caller is never reset
+        base_memory, base_peak = tracemalloc.get_traced_memory()
+        wall_start = time.perf_counter()
+        cpu_start = _cpu_time()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = _cpu_time() - cpu_start
+            memory, peak = tracemalloc.get_traced_memory()
+            if owns_tracing:
+                tracemalloc.stop()
+            if peak <= base_peak:
+                # the stage stayed below the caller's earlier peak, so its
+                # own peak is unknown; the memory it still holds bounds it
+                peak = memory
+            peak_memory = peak - base_memory
+            profile = StageProfile(
+                name, wall_time, cpu_time, max(0, peak_memory)
+            )
+            self.stages.append(profile)
+            if self.callback is not None:
+                self.callback(profile)
+
+    def record_columns(self, name, durations):
+        """Records per-column durations of the named computation.
+
+        Parameters
+        ----------
+        name : str
+            The name of the computation, like a test name.
+        durations : sequence of float
+            The wall time, in seconds, spent on each column, in column order.
+        """
+        self.column_durations[name] = [float(d) for d in durations]
+
+    def report(self):
+        """Returns all collected measurements as a JSON-serializable dict.
+
+        Returns
+        -------
+        dict
+            A dict with the following mappings:
+            - `stages` - Maps to a list of dicts, one per stage in order of
+              completion, with the stage name, its wall and CPU times, in
+              seconds, and its peak memory above the memory in use when the
+              stage started, in bytes.
+            - `wall_time` - Maps to the total wall time of all stages.
+            - `cpu_time` - Maps to the total CPU time of all stages.
+            - `column_durations` - Maps each recorded computation to a list
+              of per-column wall times, in column order.
+        """
+        return {
+            "stages": [dict(profile._asdict()) for profile in self.stages],
+            "wall_time": sum(profile.wall_time for profile in self.stages),
+            "cpu_time": sum(profile.cpu_time for profile in self.stages),
+            "column_durations": dict(self.column_durations),
+        }
+
+
+class _NoStage(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class NullProfiler(object):
+    """A profiler that measures nothing, used when profiling is off."""
+
+    _NO_STAGE = _NoStage()
+
+    def stage(self, name):
+        return self._NO_STAGE
+
+    def record_columns(self, name, durations):
+        pass
+
+
+def get_profiler(profile):
+    """Returns the profiler matching the given profile argument.
+
+    Parameters
+    ----------
+    profile : bool, callable or Profiler, optional
+        True for a new Profiler, a callable for a new Profiler calling it
+        with each completed stage, and None or False for a NullProfiler.
+        Profiler and NullProfiler objects are returned as is.
+
+    Returns
+    -------
+    Profiler or NullProfiler
+        The matching profiler.
+    """
+    if profile is None or profile is False:
+        return NullProfiler()
+    if isinstance(profile, (Profiler, NullProfiler)):
+        return profile
+    if profile is True:
+        return Profiler()
+    if callable(profile):
+        return Profiler(callback=profile)
+    raise TypeError(
+        "Valid types for profile param: bool, callable, Profiler only!"
+    )
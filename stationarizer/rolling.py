@@ -0,0 +1,349 @@
+"""Sliding-window stationarity profiles sharing work between windows.
+
+Windows are processed in groups of consecutive windows, each group spanning
+about two window lengths. Within a group, every window sum needed by the
+ADF and KPSS tests - the cross-products of the ADF regressions, and the
+sums, partial sums and lagged products of the KPSS test - is a difference of
+two cumulative sums over the span of the group, so the cost of a window
+only depends on the stride and the number of lags, not on its length.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from .adf import (
+    MAX_BATCH_FLOATS,
+    default_maxlag,
+    mackinnonp,
+    _best_lags,
+    _cholesky_factor,
+    _nested_last_tvalues,
+    _nested_ssrs,
+    _nonfinite_columns,
+    _padded_design,
+    _row_windows,
+    _tvalues,
+)
+from .kpss import kpss_batch, kpss_lag_bound, _kpss_from_sums
+from .core import DEF_ALPHA, _correct_pvals, _conclusion_codes
+from .parallel import column_groups
+from .transform import trend_coefficients
+
+
+# both tests include a constant and a linear trend, as in core
+NTREND = 2
+
+# the results of rolling_stationarity, per window and column
+RollingResults = namedtuple(
+    "RollingResults",
+    [
+        "starts",
+        "adf_stats",
+        "adf_pvals",
+        "adf_lags",
+        "kpss_stats",
+        "kpss_pvals",
+        "kpss_lags",
+        "conclusions",
+    ],
+)
+
+
+def _cumulative(terms):
+    """Sums of terms[:i] along the first axis, for i = 0, ..., len(terms)."""
+    prefix = np.zeros((len(terms) + 1,) + terms.shape[1:])
+    np.cumsum(terms, axis=0, out=prefix[1:])
+    return prefix
+
+
+def _window_grams(design, firsts, stops):
+    """Cross-products of design rows firsts, ..., stops - 1, of each column.
+
+    design has shape (columns, rows, k), and firsts and stops are arrays of
+    window bounds. The rows between consecutive bounds are multiplied
+    together once, and window grams are differences of the cumulative sums
+    of these segment grams.
+    """
+    bounds = np.unique(np.concatenate([firsts, stops]))
+    ncols, _, k = design.shape
+    segments = np.zeros((len(bounds), ncols, k, k))
+    for i in range(1, len(bounds)):
+        rows = design[:, bounds[i - 1] : bounds[i]]
+        segments[i] = np.swapaxes(rows, 1, 2) @ rows
+    prefix = np.cumsum(segments, axis=0)
+    return (
+        prefix[np.searchsorted(bounds, stops)]
+        - prefix[np.searchsorted(bounds, firsts)]
+    )
+
+
+def _window_factors(gram):
+    """Factors stacked window grams, and flags those of degenerate windows.
+
+    Returns the factors of _cholesky_factor and a boolean mask of the grams
+    which are singular, as for windows which are constant or where the
+    regressors are otherwise collinear. These are factored as identities, so
+    the other windows are still tested.
+    """
+    singular = np.zeros(gram.shape[:-2], dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        try:
+            r = _cholesky_factor(gram)
+        except np.linalg.LinAlgError:
+            r = None
+        if r is not None and np.isfinite(r).all():
+            return r, singular
+        # factored one at a time to find the singular grams
+        for index in np.ndindex(*singular.shape):
+            try:
+                factor = _cholesky_factor(gram[index])
+            except np.linalg.LinAlgError:
+                factor = None
+            singular[index] = factor is None or not np.isfinite(factor).all()
+    gram = gram.copy()
+    gram[singular] = np.eye(gram.shape[-1])
+    return _cholesky_factor(gram), singular
+
+
+def _rolling_adf(x, starts, window):
+    """ADF tests of windows of the columns of x starting at starts."""
+    nlags = default_maxlag(window)
+    nrows = window - 1
+    index = np.arange(len(x) - 1)
+    design = np.ascontiguousarray(
+        np.swapaxes(_padded_design(x, index, index.astype(float), nlags), 0, 1)
+    )
+    k = design.shape[-1]
+    stops = starts + nrows
+    # lags are selected on the common sample of the maximal lag
+    r, singular = _window_factors(
+        _window_grams(design, starts + nlags, stops)
+    )
+    ssrs = _nested_ssrs(r)
+    nobs = nrows - nlags
+    tlast = _nested_last_tvalues(r, ssrs, nobs)
+    usedlag = _best_lags(
+        ssrs[..., NTREND + 1 :], tlast[..., NTREND:], nobs, NTREND, "aic"
+    )[0]
+    adfstat = np.empty(usedlag.shape)
+    for lag in np.unique(usedlag):
+        mask = usedlag == lag
+        terms = np.r_[np.arange(NTREND + 1 + lag), k - 1]
+        gram = _window_grams(
+            np.ascontiguousarray(design[:, :, terms]), starts + lag, stops
+        )
+        r, singular[mask] = _window_factors(gram[mask])
+        adfstat[mask] = _tvalues(r, NTREND, nrows - lag)
+    # the statistics of degenerate windows are undefined
+    adfstat[singular] = np.nan
+    return adfstat, mackinnonp(adfstat, regression="ct"), usedlag
+
+
+def _rolling_kpss(y, starts, window):
+    """KPSS tests of windows of the columns of y starting at starts.
+
+    Window sums are differences of cumulative sums; lagged products are
+    accumulated a batch of lags at a time. Windows selecting more lags than
+    the products were accumulated for are tested again directly.
+    """
+    nrows, ncols = y.shape
+    nlags = kpss_lag_bound(window)
+    steps = np.arange(nrows, dtype=float)[:, None]
+    partial = np.cumsum(y, axis=0)
+    prefix = _cumulative(
+        np.stack(
+            [
+                y,
+                steps * y,
+                partial,
+                partial ** 2,
+                steps * partial,
+                steps ** 2 * partial,
+            ],
+            axis=-1,
+        )
+    )
+    stops = starts + window
+    sums = np.moveaxis(prefix[stops] - prefix[starts], -1, 0)
+    # in window time u = s - a, with Y_s the window's partial sums
+    a = starts[:, None].astype(float)
+    base = np.concatenate([np.zeros((1, ncols)), partial])[starts]
+    sum_y = sums[0]
+    sum_sy = sums[1] - a * sum_y
+    partials = np.stack(
+        [
+            sums[3] - 2 * base * sums[2] + window * base ** 2,
+            sums[4]
+            - (a - 1) * sums[2]
+            - base * window * (window + 1) / 2,
+            sums[5]
+            - (2 * a - 1) * sums[4]
+            + a * (a - 1) * sums[2]
+            - base * (window - 1) * window * (window + 1) / 3,
+        ]
+    )
+    # sums of y_s and s*y_s over the first and last l window observations
+    lags = np.arange(nlags + 1)
+    before = prefix[starts][:, None, :, :2]
+    through = prefix[stops][:, None, :, :2]
+    heads = prefix[starts[:, None] + lags, :, :2] - before
+    tails = through - prefix[stops[:, None] - lags, :, :2]
+    heads[..., 1] -= a[:, None] * heads[..., 0]
+    tails[..., 1] -= a[:, None] * tails[..., 0]
+    # sums of y_s * y_{s-l} over window observations s >= a + l
+    padded = np.concatenate([np.zeros((nlags, ncols)), y])
+    windows = _row_windows(padded, nlags + 1)
+    lagprods = np.empty((nlags + 1, len(starts), ncols))
+    batch = max(1, MAX_BATCH_FLOATS // y.size)
+    columns = np.arange(ncols)[None, :, None]
+    for lo in range(0, nlags + 1, batch):
+        batch_lags = lags[lo : lo + batch]
+        prods = _cumulative(y[:, :, None] * windows[:, :, nlags - batch_lags])
+        firsts = (starts[:, None] + batch_lags)[:, None, :]
+        position = np.arange(len(batch_lags))[None, None, :]
+        lagprods[lo : lo + batch] = np.moveaxis(
+            prods[stops] - prods[firsts, columns, position], -1, 0
+        )
+
+    def flat(arr):
+        return arr.reshape(arr.shape[: -2] + (-1,))
+
+    stat, pvals, usedlag = _kpss_from_sums(
+        window,
+        flat(np.stack([sum_y, sum_sy])),
+        flat(partials),
+        flat(lagprods),
+        flat(np.moveaxis(heads, (-1, 1), (0, 1))),
+        flat(np.moveaxis(tails, (-1, 1), (0, 1))),
+    )
+    stat, pvals, usedlag = (
+        arr.reshape(len(starts), ncols) for arr in (stat, pvals, usedlag)
+    )
+    redo = np.nonzero(usedlag > nlags)
+    if len(redo[0]):
+        series = np.column_stack(
+            [
+                y[start : start + window, col]
+                for start, col in zip(starts[redo[0]], redo[1])
+            ]
+        )
+        stat[redo], pvals[redo], usedlag[redo] = kpss_batch(series)
+    return stat, pvals, usedlag
+
+
+def rolling_stationarity(X, window, stride=1, alpha=None, multitest=None):
+    """Tests the stationarity of sliding windows of each column of an array.
+
+    Each window of each column is tested with the ADF and KPSS tests of
+    simple_auto_stationarize, and concluded upon after correcting the
+    p-values of all columns of the window jointly, as simple_auto_stationarize
+    would for that window alone. Overlapping windows share their work: window
+    cross-products, sums and lagged products are differences of cumulative
+    sums, so the cost of a window depends on the stride and the number of
+    lags rather than on the window length.
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        A 2D array of shape (time, variables), or a single 1D series. A
+        ValueError is raised if any value is missing or infinite, or if the
+        regression of any window is degenerate, as for constant windows.
+    window : int
+        The number of rows of each window.
+    stride : int, default 1
+        The number of rows between the starts of consecutive windows.
+    alpha : float, optional
+        See simple_auto_stationarize.
+    multitest : str, optional
+        See simple_auto_stationarize.
+
+    Returns
+    -------
+    RollingResults
+        A named tuple holding the first row of each window, under starts,
+        and arrays of shape (windows, columns) of the statistics, p-values
+        and numbers of lags of the ADF and KPSS tests, and of conclusions,
+        as indices into stationarizer.core.CONCLUSIONS.
+    """
+    if alpha is None:
+        alpha = DEF_ALPHA
+    X = np.asarray(X, dtype=float)
+    if X.ndim == 1:
+        X = X[:, None]
+    if X.ndim != 2:
+        raise ValueError("X must be a 1D or a 2D array!")
+    # a single NaN would spread through the cumulative sums into every
+    # later window of its column
+    missing = _nonfinite_columns(X)
+    if len(missing) > 0:
+        raise ValueError(
+            f"Invalid input, columns {missing.tolist()} have missing or "
+            "infinite values"
+        )
+    nrows, ncols = X.shape
+    if not 0 < window <= nrows:
+        raise ValueError(
+            f"window ({window}) must be positive and at most the number of "
+            f"rows ({nrows})."
+        )
+    if stride < 1:
+        raise ValueError(f"stride ({stride}) must be positive.")
+    starts = np.arange(0, nrows - window + 1, stride)
+    k = default_maxlag(window) + NTREND + 2
+    # groups of windows span about two window lengths, within memory bounds
+    per_group = max(1, min(-(-window // stride), MAX_BATCH_FLOATS // k ** 2))
+    shape = (len(starts), ncols)
+    adf_stats, adf_pvals, kpss_stats, kpss_pvals = (
+        np.empty(shape) for _ in range(4)
+    )
+    adf_lags, kpss_lags = (np.empty(shape, dtype=int) for _ in range(2))
+    for lo in range(0, len(starts), per_group):
+        group = slice(lo, lo + per_group)
+        first, stop = starts[group][0], starts[group][-1] + window
+        span = stop - first
+        size = min(
+            MAX_BATCH_FLOATS // (span * k),
+            MAX_BATCH_FLOATS // (2 * len(starts[group]) * k ** 2),
+        )
+        for cols in column_groups(ncols, max(1, size)):
+            x = X[first:stop, cols]
+            # removing the span's trend leaves both tests unchanged, but
+            # keeps cumulative sums well scaled
+            slopes, intercepts = trend_coefficients(x)
+            x = x - (intercepts + np.arange(span)[:, None] * slopes)
+            local = starts[group] - first
+            (
+                adf_stats[group, cols],
+                adf_pvals[group, cols],
+                adf_lags[group, cols],
+            ) = _rolling_adf(x, local, window)
+            degenerate = np.isnan(adf_stats[group, cols])
+            if degenerate.any():
+                columns = np.arange(ncols)[cols][degenerate.any(axis=0)]
+                raise ValueError(
+                    f"Invalid input, columns {columns.tolist()} are constant "
+                    "or degenerate in the windows starting at rows "
+                    f"{starts[group][degenerate.any(axis=1)].tolist()}"
+                )
+            (
+                kpss_stats[group, cols],
+                kpss_pvals[group, cols],
+                kpss_lags[group, cols],
+            ) = _rolling_kpss(x, local, window)
+    conclusions = np.empty(shape, dtype=int)
+    for i in range(len(starts)):
+        _, _, adf_rejections, kpss_rejections = _correct_pvals(
+            adf_pvals[i], kpss_pvals[i], alpha, multitest
+        )
+        conclusions[i] = _conclusion_codes(adf_rejections, kpss_rejections)[0]
+    return RollingResults(
+        starts=starts,
+        adf_stats=adf_stats,
+        adf_pvals=adf_pvals,
+        adf_lags=adf_lags,
+        kpss_stats=kpss_stats,
+        kpss_pvals=kpss_pvals,
+        kpss_lags=kpss_lags,
+        conclusions=conclusions,
+    )
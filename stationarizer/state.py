@@ -0,0 +1,246 @@
+"""Persisted per-column test states, for re-testing appended rows."""
+
+import os
+import copy
+import time
+import hashlib
+from collections import namedtuple
+
+import numpy as np
+
+from .adf import default_maxlag, _nonfinite_columns
+from .cache import dump_pickle, load_pickle
+from .kpss import kpss_batch
+from .monitor import DEF_MAX_NOBS, MonitorStatistics, StationarityMonitor
+
+
+# new states fit histories this many times longer than the one they start at
+DEF_GROWTH = 4
+
+StateInfo = namedtuple("StateInfo", ["folds", "rebuilds", "currsize"])
+
+
+def label_key(label):
+    """Returns the key under which the state of a column label is stored.
+
+    Parameters
+    ----------
+    label : object
+        A column label.
+
+    Returns
+    -------
+    str
+        A hex digest of the label's type and representation.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((type(label).__name__, label)).encode())
+    return digest.hexdigest()
+
+
+def _history_hash(col):
+    """A hash of the float64 bytes of a column, extendable with new rows."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(col, dtype=float).data)
+    return digest
+
+
+def history_digest(col):
+    """Returns a digest identifying the history of a column.
+
+    Parameters
+    ----------
+    col : numpy.ndarray
+        A 1D array holding the series.
+
+    Returns
+    -------
+    str
+        A hex digest of the column's float64 bytes.
+    """
+    return _history_hash(col).hexdigest()
+
+
+class UnitRootStateStore(object):
+    """Per-column unit root test states, folding in appended rows.
+
+    The state of a column is a single-column StationarityMonitor - holding
+    the cross-products of its ADF regression and the sums and lagged
+    products of its KPSS test - stored under the column's label, together
+    with a digest of the history it summarizes. When a column whose first
+    rows match a stored history is tested, only the rows appended since are
+    folded into its state, so re-testing costs O(new rows * lags) rather
+    than O(all rows * lags); matching histories only costs hashing each row
+    once. Columns with no matching state are tested from scratch, and their
+    state stored. New rows are folded into a copy of a state, which only
+    replaces it once folded successfully.
+
+    States are kept in memory and, if a directory is given, also persisted
+    to it, and looked up there on in-memory misses, so they can be reused
+    across runs. Files are replaced atomically, and the states of
+    unreadable ones are rebuilt. Test results equal those of
+    simple_auto_stationarize up to rounding: a state is rebuilt once its
+    history outgrows its ADF lag capacity, and a column selecting as many
+    KPSS lags as its state holds is tested from scratch.
+
+    Parameters
+    ----------
+    state_dir : str, optional
+        A directory to persist states to. If not given, states are only kept
+        in memory.
+    """
+
+    def __init__(self, state_dir=None):
+        if state_dir is not None:
+            state_dir = os.path.expanduser(state_dir)
+            os.makedirs(state_dir, exist_ok=True)
+        self.state_dir = state_dir
+        self.folds = 0
+        self.rebuilds = 0
+        self._states = {}
+
+    def _fpath(self, key):
+        return os.path.join(self.state_dir, f"{key}.pkl")
+
+    def get(self, label):
+        """Returns the state stored for a column label, or None.
+
+        Parameters
+        ----------
+        label : object
+            A column label.
+
+        Returns
+        -------
+        tuple
+            The stored StationarityMonitor and history digest, or None if no
+            readable state is stored for label.
+        """
+        key = label_key(label)
+        try:
+            return self._states[key]
+        except KeyError:
+            pass
+        if self.state_dir is not None:
+            state = load_pickle(self._fpath(key))
+            if state is not None:
+                self._states[key] = state
+                return state
+        return None
+
+    def set(self, label, monitor, digest):
+        """Stores the state of a column label.
+
+        Parameters
+        ----------
+        label : object
+            A column label.
+        monitor : stationarizer.monitor.StationarityMonitor
+            A single-column monitor.
+        digest : str
+            The digest of the history folded into monitor, as returned by
+            history_digest.
+        """
+        key = label_key(label)
+        self._states[key] = (monitor, digest)
+        if self.state_dir is not None:
+            dump_pickle(self._states[key], self._fpath(key))
+
+    def _extended(self, label, col):
+        """Returns the state of a column, with its new rows folded in.
+
+        The stored monitor is left untouched; new rows are folded into a copy
+        of it. Returns that monitor and the digest of the whole column, which
+        is hashed in a single pass: the hash of the stored history is
+        extended with the new rows.
+        """
+        state = self.get(label)
+        if state is not None:
+            monitor, digest = state
+            nobs = monitor.n_obs
+            fits = default_maxlag(len(col)) <= monitor.adf_max_lags
+            if nobs <= len(col) and fits:
+                history = _history_hash(col[:nobs])
+                if history.hexdigest() == digest:
+                    history.update(
+                        np.ascontiguousarray(col[nobs:], dtype=float).data
+                    )
+                    monitor = copy.deepcopy(monitor).update(col[nobs:, None])
+                    self.folds += 1
+                    return monitor, history.hexdigest()
+        max_nobs = max(DEF_MAX_NOBS, DEF_GROWTH * len(col))
+        monitor = StationarityMonitor(1, max_nobs=max_nobs)
+        monitor.update(col[:, None])
+        self.rebuilds += 1
+        return monitor, history_digest(col)
+
+    def test(self, X, labels):
+        """Runs the ADF and KPSS tests on all columns, using stored states.
+
+        Parameters
+        ----------
+        X : numpy.ndarray
+            A 2D array of shape (time, variables).
+        labels : sequence
+            The labels of the columns of X, under which states are stored.
+
+        Returns
+        -------
+        statistics : stationarizer.monitor.MonitorStatistics
+            Per-column arrays of the statistics, p-values and lags of both
+            tests.
+        durations : numpy.ndarray
+            The time spent updating and testing each column, in seconds.
+
+        Raises
+        ------
+        ValueError
+            If any value of X is missing or infinite; no state is changed.
+        """
+        missing = _nonfinite_columns(X)
+        if len(missing) > 0:
+            raise ValueError(
+                f"Invalid input, columns {[labels[i] for i in missing]} have "
+                "missing or infinite values"
+            )
+        columns = []
+        durations = np.empty(X.shape[1])
+        for i, label in enumerate(labels):
+            start = time.perf_counter()
+            col = X[:, i]
+            monitor, digest = self._extended(label, col)
+            self.set(label, monitor, digest)
+            stats = monitor.statistics()
+            if stats.kpss_lags[0] >= monitor.kpss_max_lags:
+                # lags may have been capped
+                kpss_stats, kpss_pvals, kpss_lags = kpss_batch(col)
+                stats = stats._replace(
+                    kpss_stats=kpss_stats,
+                    kpss_pvals=kpss_pvals,
+                    kpss_lags=kpss_lags,
+                )
+            columns.append(stats)
+            durations[i] = time.perf_counter() - start
+        statistics = MonitorStatistics(
+            *(
+                np.concatenate([getattr(stats, field) for stats in columns])
+                for field in MonitorStatistics._fields
+            )
+        )
+        return statistics, durations
+
+    def clear(self):
+        """Clears all in-memory states and resets the fold/rebuild counters.
+
+        States persisted to disk are kept.
+        """
+        self._states.clear()
+        self.folds = 0
+        self.rebuilds = 0
+
+    def state_info(self):
+        """Returns fold and rebuild counts, and the number of states held."""
+        return StateInfo(self.folds, self.rebuilds, len(self))
+
+    def __len__(self):
+        return len(self._states)
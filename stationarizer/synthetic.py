@@ -0,0 +1,272 @@
+"""Batched, seedable generators of synthetic stochastic process panels.
+
+Every generator returns a whole (steps, columns) column-major array in a
+single vectorized call, with each column an independent realization of the
+process, and draws from an explicit numpy.random.Generator.
+"""
+
+import numpy as np
+
+
+class Process(object):
+    WHITE_NOISE = "white_noise"
+    TREND_STATIONARY = "trend_stationary"
+    UNIT_ROOT = "unit_root"
+    TREND_UNIT_ROOT = "trend_unit_root"
+
+
+PROCESSES = [
+    Process.WHITE_NOISE,
+    Process.TREND_STATIONARY,
+    Process.UNIT_ROOT,
+    Process.TREND_UNIT_ROOT,
+]
+TRENDED_PROCESSES = [Process.TREND_STATIONARY, Process.TREND_UNIT_ROOT]
+DEF_SLOPE = 3
+DEF_STD = 1
+
+
+def get_generator(random_state=None):
+    """Returns a NumPy random generator for the given random state.
+
+    Parameters
+    ----------
+    random_state : int, SeedSequence or Generator, optional
+        A seed, a numpy.random.SeedSequence, or a numpy.random.Generator,
+        which is returned as is. If not given, a generator seeded with fresh
+        OS entropy is returned.
+
+    Returns
+    -------
+    numpy.random.Generator
+        A random generator.
+    """
+    if isinstance(random_state, np.random.Generator):
+        return random_state
+    return np.random.default_rng(random_state)
+
+
+def spawn_generators(n, random_state=None):
+    """Returns n independent random generators, for parallel streams.
+
+    Parameters
+    ----------
+    n : int
+        The number of generators to return.
+    random_state : int or numpy.random.SeedSequence, optional
+        The root seed. If not given, fresh OS entropy is used.
+
+    Returns
+    -------
+    list of numpy.random.Generator
+        Generators with statistically independent streams, each seeded by a
+        child of the root seed sequence, so results are reproducible however
+        the streams are distributed among processes.
+    """
+    if not isinstance(random_state, np.random.SeedSequence):
+        random_state = np.random.SeedSequence(random_state)
+    return [np.random.default_rng(seq) for seq in random_state.spawn(n)]
+
+
+def _noise(steps, columns, std, random_state, out):
+    rng = get_generator(random_state)
+    if std is None:
+        std = DEF_STD
+    if out is None:
+        out = np.empty((steps, columns), order="F")
+    # the transpose of a column-major array is row-major, so drawing into it
+    # fills one series after another, in place
+    rng.standard_normal(out=out.T)
+    out *= std
+    return out
+
+
+def _add_trend(X, slope):
+    if slope is None:
+        slope = DEF_SLOPE
+    slope = np.asarray(slope, dtype=float)
+    X += np.arange(X.shape[0], dtype=float)[:, None] * slope
+    return X
+
+
+def white_noise(steps, columns=1, std=None, random_state=None, out=None):
+    """Generates series from a white noise gaussian process.
+
+    Parameters
+    ----------
+    steps : int
+        The number of time steps to generate.
+    columns : int, default 1
+        The number of independent series to generate.
+    std : float or numpy.ndarray, optional
+        The standard deviation of the process, or of each series. Defaults to
+        1.
+    random_state : int, SeedSequence or Generator, optional
+        See get_generator.
+    out : numpy.ndarray, optional
+        A column-major array of shape (steps, columns) to write the series
+        into, like a column block of a larger panel or a memory-mapped array.
+        Allocated if not given.
+
+    Returns
+    -------
+    numpy.ndarray
+        A column-major array of shape (steps, columns); out, if given.
+    """
+    return _noise(steps, columns, std, random_state, out)
+
+
+def trend_stationary(
+    steps, columns=1, slope=None, std=None, random_state=None, out=None
+):
+    """Generates series from a trend stationary process.
+
+    The process is of the form y(t) = a*t + epsilon(t), where a is the slope.
+
+    Parameters
+    ----------
+    steps : int
+        The number of time steps to generate.
+    columns : int, default 1
+        The number of independent series to generate.
+    slope : float or numpy.ndarray, optional
+        The slope of the linear trend, or of each series. Defaults to 3.
+    std : float or numpy.ndarray, optional
+        The standard deviation of the noise, or of each series. Defaults to 1.
+    random_state : int, SeedSequence or Generator, optional
+        See get_generator.
+    out : numpy.ndarray, optional
+        A column-major array of shape (steps, columns) to write the series
+        into, like a column block of a larger panel or a memory-mapped array.
+        Allocated if not given.
+
+    Returns
+    -------
+    numpy.ndarray
+        A column-major array of shape (steps, columns); out, if given.
+    """
+    X = _noise(steps, columns, std, random_state, out)
+    return _add_trend(X, slope)
+
+
+def unit_root(steps, columns=1, std=None, random_state=None, out=None):
+    """Generates series from a simple unit root process.
+
+    The process is of the form y(t) = y(t-1) + epsilon(t).
+
+    Parameters
+    ----------
+    steps : int
+        The number of time steps to generate.
+    columns : int, default 1
+        The number of independent series to generate.
+    std : float or numpy.ndarray, optional
+        The standard deviation of the noise, or of each series. Defaults to 1.
+    random_state : int, SeedSequence or Generator, optional
+        See get_generator.
+    out : numpy.ndarray, optional
+        A column-major array of shape (steps, columns) to write the series
+        into, like a column block of a larger panel or a memory-mapped array.
+        Allocated if not given.
+
+    Returns
+    -------
+    numpy.ndarray
+        A column-major array of shape (steps, columns); out, if given.
+    """
+    X = _noise(steps, columns, std, random_state, out)
+    return np.cumsum(X, axis=0, out=X)
+
+
+def trend_unit_root(
+    steps, columns=1, slope=None, std=None, random_state=None, out=None
+):
+    """Generates series from a trend stationary process with a unit root.
+
+    The process is of the form y(t) = y(t-1) + a*t + epsilon(t), where a is
+    the slope.
+
+    Parameters
+    ----------
+    steps : int
+        The number of time steps to generate.
+    columns : int, default 1
+        The number of independent series to generate.
+    slope : float or numpy.ndarray, optional
+        The slope of the linear trend, or of each series. Defaults to 3.
+    std : float or numpy.ndarray, optional
+        The standard deviation of the noise, or of each series. Defaults to 1.
+    random_state : int, SeedSequence or Generator, optional
+        See get_generator.
+    out : numpy.ndarray, optional
+        A column-major array of shape (steps, columns) to write the series
+        into, like a column block of a larger panel or a memory-mapped array.
+        Allocated if not given.
+
+    Returns
+    -------
+    numpy.ndarray
+        A column-major array of shape (steps, columns); out, if given.
+    """
+    X = trend_stationary(steps, columns, slope, std, random_state, out)
+    return np.cumsum(X, axis=0, out=X)
+
+
+GENERATORS = {
+    Process.WHITE_NOISE: white_noise,
+    Process.TREND_STATIONARY: trend_stationary,
+    Process.UNIT_ROOT: unit_root,
+    Process.TREND_UNIT_ROOT: trend_unit_root,
+}
+
+
+def process_panel(steps, columns_per_process, random_state=None, **kwargs):
+    """Generates a panel mixing series of several process types.
+
+    Parameters
+    ----------
+    steps : int
+        The number of time steps to generate.
+    columns_per_process : dict or int
+        Maps process types - values of Process - to the number of series of
+        each to generate. An int generates that many series of every type.
+    random_state : int, SeedSequence or Generator, optional
+        See get_generator.
+    **kwargs
+        Parameters passed to the generators, like std and out. slope is only
+        passed to the generators of trended processes.
+
+    Returns
+    -------
+    X : numpy.ndarray
+        A column-major array of shape (steps, total columns), holding the
+        series of each process type in contiguous column blocks, in the order
+        of columns_per_process.
+    processes : numpy.ndarray
+        The process type of each column.
+    """
+    if not isinstance(columns_per_process, dict):
+        columns_per_process = {
+            process: columns_per_process for process in PROCESSES
+        }
+    rng = get_generator(random_state)
+    slope = kwargs.pop("slope", None)
+    ncols = sum(columns_per_process.values())
+    X = kwargs.pop("out", None)
+    if X is None:
+        X = np.empty((steps, ncols), order="F")
+    processes = []
+    for process, columns in columns_per_process.items():
+        params = dict(kwargs)
+        if process in TRENDED_PROCESSES:
+            params["slope"] = slope
+        start = len(processes)
+        GENERATORS[process](
+            steps,
+            columns,
+            random_state=rng,
+            out=X[:, start : start + columns],
+            **params,
+        )
+        processes += [process] * columns
+    return X, np.array(processes)
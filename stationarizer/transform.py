@@ -0,0 +1,139 @@
+"""Vectorized detrend and diff transformations of 2D arrays."""
+
+import numpy as np
+
+
+def trend_coefficients(X):
+    """Fits a linear trend to each column of X, as statsmodels' detrend does.
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        A 2D array of shape (time, variables).
+
+    Returns
+    -------
+    slopes : numpy.ndarray
+        The trend slope of each column, per time step.
+    intercepts : numpy.ndarray
+        The trend value of each column at the first time step.
+    """
+    trends = np.vander(np.arange(float(X.shape[0])), N=2)
+    # unlike a matrix product, einsum sums each column in the same order
+    # however many columns there are, so results do not depend on chunking
+    slopes, intercepts = np.einsum("ij,jk->ik", np.linalg.pinv(trends), X)
+    return slopes, intercepts
+
+
+def apply_transformations(
+    X, detrend_mask, diff_mask, slopes, intercepts, start=0, out=None
+):
+    """Applies detrend and diff transformations to the columns of X.
+
+    All columns are handled at once: differentiated columns with a single
+    np.diff over their block, as the difference of a linear trend is its
+    slope, and the other columns with a single broadcast trend subtraction.
+    Columns are trimmed to a common length exactly as done by
+    simple_auto_stationarize: if any column is differentiated, all columns
+    are trimmed to the length of the differentiated ones.
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        A 2D array of shape (time, variables).
+    detrend_mask : numpy.ndarray
+        A boolean array marking the columns to detrend.
+    diff_mask : numpy.ndarray
+        A boolean array marking the columns to differentiate. Detrending, if
+        any, is applied first.
+    slopes : numpy.ndarray
+        The trend slope of each column; ignored for columns not detrended.
+    intercepts : numpy.ndarray
+        The trend value of each column at time step 0; ignored for columns
+        not detrended.
+    start : int, default 0
+        The time step of the first row of X.
+    out : numpy.ndarray, optional
+        An array of the same shape as X to write the transformed array into.
+        If not given, a new column-major array is allocated.
+
+    Returns
+    -------
+    numpy.ndarray
+        The transformed array; a view of the top rows of out, if given.
+    """
+    X = np.asarray(X, dtype=float)
+    nrows = X.shape[0] - 1 if diff_mask.any() else X.shape[0]
+    if out is None:
+        out = np.empty((nrows, X.shape[1]), order="F")
+    else:
+        out = out[:nrows]
+    slopes = np.where(detrend_mask, slopes, 0.0)
+    intercepts = np.where(detrend_mask, intercepts, 0.0)
+    if diff_mask.any():
+        diffs = np.diff(X[:, diff_mask], axis=0)
+        out[:, diff_mask] = diffs - slopes[diff_mask]
+    keep = ~diff_mask
+    steps = np.arange(start, start + nrows, dtype=float)[:, None]
+    out[:, keep] = X[:nrows, keep] - (steps * slopes[keep] + intercepts[keep])
+    return out
+
+
+def invert_transformations(
+    Y, detrend_mask, diff_mask, slopes, intercepts, start, last_obs=None
+):
+    """Maps data from the stationarized space back to the original scale.
+
+    Differentiated columns are integrated with a single cumulative sum over
+    their values, anchored at the detrended last observation, and stored
+    trends are then added back with one broadcast operation.
+
+    Parameters
+    ----------
+    Y : numpy.ndarray
+        An array of shape (time, variables) or (time, variables, samples),
+        holding, for example, point or sampled forecasts.
+    detrend_mask : numpy.ndarray
+        A boolean array marking the detrended columns.
+    diff_mask : numpy.ndarray
+        A boolean array marking the differentiated columns.
+    slopes : numpy.ndarray
+        The trend slope of each column; 0 for columns not detrended.
+    intercepts : numpy.ndarray
+        The trend value of each column at time step 0; 0 for columns not
+        detrended.
+    start : int
+        The time step of the first row of Y.
+    last_obs : numpy.ndarray, optional
+        The original-scale observation at time step start - 1. Required if
+        any column is differentiated.
+
+    Returns
+    -------
+    numpy.ndarray
+        An array of the same shape as Y, on the original scale.
+    """
+    Y = np.asarray(Y, dtype=float)
+    if Y.ndim not in (2, 3) or Y.shape[1] != len(diff_mask):
+        raise ValueError(
+            f"Expected a 2D or 3D array with {len(diff_mask)} columns!"
+        )
+    # trailing axes, like samples, broadcast against per-column quantities
+    expand = (slice(None),) + (None,) * (Y.ndim - 2)
+    out = Y.copy()
+    if diff_mask.any():
+        if last_obs is None:
+            raise ValueError(
+                "last_obs is required to integrate differentiated columns!"
+            )
+        anchor = np.asarray(last_obs, dtype=float) - detrend_mask * (
+            slopes * (start - 1) + intercepts
+        )
+        anchored = np.empty((len(Y) + 1,) + Y[:, diff_mask].shape[1:])
+        anchored[0] = anchor[diff_mask][expand]
+        anchored[1:] = Y[:, diff_mask]
+        out[:, diff_mask] = np.cumsum(anchored, axis=0)[1:]
+    steps = np.arange(start, start + len(Y), dtype=float)[:, None]
+    trends = steps * slopes + intercepts
+    out += trends[(Ellipsis,) + (None,) * (Y.ndim - 2)]
+    return out
@@ -3,16 +3,29 @@
 import os
 import logging
 
-try:
-    import logzero
-
-    LOG_FPATH = os.path.expanduser("~/.stationarizer/test.log")
-    os.makedirs(os.path.expanduser("~/.stationarizer"), exist_ok=True)
-    LOGGER = logzero.setup_logger("stationarizer")
-    LOGGER.info("logzero-based logger setup")
-except ImportError:
-    LOGGER = logging.getLogger("stationarizer")
+LOG_FPATH = os.path.expanduser("~/.stationarizer/test.log")
+
+# getting the logger is cheap; its handlers are set up on first use rather
+# than at import, which should stay cheap and free of filesystem side effects
+LOGGER = logging.getLogger("stationarizer")
 LOGGER.setLevel(logging.WARNING)
+_HANDLERS_SET_UP = False
+
+
+def _setup_handlers():
+    global _HANDLERS_SET_UP
+    _HANDLERS_SET_UP = True
+    try:
+        import logzero
+    except ImportError:
+        return
+    logger = logging.getLogger("stationarizer")
+    level = logger.level
+    os.makedirs(os.path.dirname(LOG_FPATH), exist_ok=True)
+    # sets up handlers on the same logger object, and its level to DEBUG
+    logzero.setup_logger("stationarizer")
+    logger.info("logzero-based logger setup")
+    logger.setLevel(level)
 
 
 def set_verbosity_level(verbosity_level):
@@ -27,8 +40,9 @@ def set_verbosity_level(verbosity_level):
     """
     global LOGGER
     if isinstance(verbosity_level, int):
-        prev = LOGGER.getEffectiveLevel()
-        LOGGER.setLevel(verbosity_level)
+        logger = get_logger()
+        prev = logger.getEffectiveLevel()
+        logger.setLevel(verbosity_level)
         return prev
     elif isinstance(verbosity_level, logging.Logger):
         LOGGER = verbosity_level
@@ -40,4 +54,6 @@ def set_verbosity_level(verbosity_level):
 
 
 def get_logger():
+    if not _HANDLERS_SET_UP and LOGGER is logging.getLogger("stationarizer"):
+        _setup_handlers()
     return LOGGER
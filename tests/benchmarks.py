@@ -0,0 +1,365 @@
+"""Benchmarks of simple_auto_stationarize over data sizes and code paths.
+
+Run with ``python -m tests.benchmarks`` from the repository root; see
+``--help`` for options. Every configuration runs in a fresh interpreter, so
+that its peak resident set size is measured in isolation, and results are
+written as JSON, to be compared across releases.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import subprocess
+
+import numpy as np
+
+from stationarizer.synthetic import PROCESSES, process_panel
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # not available on Windows; peak memory is then not reported
+    resource = None
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEF_ROWS = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+DEF_COLS = [1, 10, 100, 10 ** 3, 10 ** 4, 10 ** 5]
+# configurations with more cells than this are skipped by default; 1e8
+# float cells take 800MB, before any intermediate results
+DEF_MAX_CELLS = 10 ** 8
+
+# the code paths compared, as keyword arguments of simple_auto_stationarize
+PATHS = {
+    "serial": {"backend": "incremental", "n_jobs": None},
+    "parallel": {"backend": "incremental", "n_jobs": -1},
+    "vectorized": {"backend": "vectorized", "n_jobs": None},
+    "statsmodels": {"backend": "statsmodels", "n_jobs": None},
+}
+DEF_PATHS = ["serial", "parallel", "vectorized"]
+
+
+def synthetic_frame(rows, cols, seed=0):
+    """Returns a dataframe with about as many series of each process type.
+
+    Parameters
+    ----------
+    rows : int
+        The number of time steps.
+    cols : int
+        The number of series.
+    seed : int, default 0
+        The seed of the random generator.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A dataframe of shape (rows, cols).
+    """
+    import pandas as pd
+
+    columns_per_process = {
+        process: cols // len(PROCESSES) + (i < cols % len(PROCESSES))
+        for i, process in enumerate(PROCESSES)
+    }
+    X, _ = process_panel(rows, columns_per_process, random_state=seed)
+    return pd.DataFrame(X, columns=[f"series_{i}" for i in range(cols)])
+
+
+def _peak_rss_bytes(children=False):
+    if resource is None:  # pragma: no cover
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # reported in kilobytes on Linux, but in bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _cpu_time():
+    times = os.times()
+    return sum(times[:4])
+
+
+def run_one(rows, cols, path, seed=0):
+    """Times a single run of simple_auto_stationarize in this process.
+
+    Parameters
+    ----------
+    rows : int
+        The number of time steps.
+    cols : int
+        The number of series.
+    path : str
+        The code path to run; one of the keys of PATHS.
+    seed : int, default 0
+        The seed used to generate the data.
+
+    Returns
+    -------
+    dict
+        The wall and CPU times of the run, in seconds, and the peak resident
+        set sizes, in bytes, of this process before and after the run, and
+        of its largest child process, like parallel workers.
+    """
+    from stationarizer import simple_auto_stationarize
+
+    # a warm-up run on tiny data takes lazy imports out of the timed run
+    simple_auto_stationarize(synthetic_frame(100, 1), **PATHS[path])
+    df = synthetic_frame(rows, cols, seed=seed)
+    data_peak_rss = _peak_rss_bytes()
+    wall_start = time.perf_counter()
+    cpu_start = _cpu_time()
+    simple_auto_stationarize(df, **PATHS[path])
+    return {
+        "wall_seconds": time.perf_counter() - wall_start,
+        "cpu_seconds": _cpu_time() - cpu_start,
+        "data_peak_rss_bytes": data_peak_rss,
+        "peak_rss_bytes": _peak_rss_bytes(),
+        "children_peak_rss_bytes": _peak_rss_bytes(children=True),
+    }
+
+
+def logging_overhead(rows=600, cols=300, seed=0, repeats=5):
+    """Times simple_auto_stationarize with logging disabled and enabled.
+
+    Parameters
+    ----------
+    rows : int, default 600
+        The number of time steps.
+    cols : int, default 300
+        The number of series.
+    seed : int, default 0
+        The seed used to generate the data.
+    repeats : int, default 5
+        The number of runs at each logging level; the fastest is reported.
+
+    Returns
+    -------
+    dict
+        The best wall times, in seconds, of vectorized runs at the WARNING
+        and DEBUG logging levels, and their difference.
+    """
+    from stationarizer import simple_auto_stationarize
+
+    df = synthetic_frame(rows, cols, seed=seed)
+    best = {}
+    levels = {"warning": logging.WARNING, "debug": logging.DEBUG}
+    for name, level in levels.items():
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            simple_auto_stationarize(
+                df, verbosity=level, backend="vectorized"
+            )
+            times.append(time.perf_counter() - start)
+        best[f"{name}_seconds"] = min(times)
+    best["debug_overhead_seconds"] = (
+        best["debug_seconds"] - best["warning_seconds"]
+    )
+    return best
+
+
+IMPORT_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import numpy
+numpy_time = time.perf_counter() - start
+start = time.perf_counter()
+import stationarizer
+print(json.dumps([numpy_time, time.perf_counter() - start]))
+"""
+
+
+def import_time(repeats=5):
+    """Times importing stationarizer, and numpy before it, in new interpreters.
+
+    Parameters
+    ----------
+    repeats : int, default 5
+        The number of fresh interpreters timed; the fastest imports are
+        reported.
+
+    Returns
+    -------
+    dict
+        The best wall times, in seconds, of importing numpy and then
+        stationarizer, and their ratio, which depends less on the host.
+    """
+    timings = []
+    for _ in range(repeats):
+        output = subprocess.check_output(
+            [sys.executable, "-c", IMPORT_SCRIPT], cwd=REPO_DIR
+        )
+        timings.append(json.loads(output.decode().strip().splitlines()[-1]))
+    numpy_seconds, stationarizer_seconds = map(float, np.min(timings, axis=0))
+    return {
+        "numpy_seconds": numpy_seconds,
+        "stationarizer_seconds": stationarizer_seconds,
+        "relative_to_numpy": stationarizer_seconds / numpy_seconds,
+    }
+
+
+def environment():
+    """Returns a description of the benchmarking environment."""
+    import stationarizer
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "stationarizer": stationarizer.__version__,
+    }
+
+
+def run_benchmarks(
+    rows=None, cols=None, paths=None, max_cells=None, repeats=1, seed=0
+):
+    """Runs each benchmark configuration in a fresh interpreter.
+
+    Parameters
+    ----------
+    rows : list of int, optional
+        Series lengths to benchmark. Defaults to 1e3 to 1e7.
+    cols : list of int, optional
+        Column counts to benchmark. Defaults to 1 to 1e5.
+    paths : list of str, optional
+        Code paths to benchmark; keys of PATHS. Defaults to serial, parallel
+        and vectorized.
+    max_cells : int, optional
+        Configurations with more than this many cells are skipped. Defaults
+        to 1e8.
+    repeats : int, default 1
+        The number of times each configuration is run.
+    seed : int, default 0
+        The seed used to generate the data.
+
+    Returns
+    -------
+    dict
+        A JSON-serializable dict mapping `environment` to a description of
+        the environment and `results` to a list of dicts, one per run, with
+        the configuration and either its measurements or, for failed
+        runs, the return code of the run and an error message.
+    """
+    rows = DEF_ROWS if rows is None else rows
+    cols = DEF_COLS if cols is None else cols
+    paths = DEF_PATHS if paths is None else paths
+    max_cells = DEF_MAX_CELLS if max_cells is None else max_cells
+    results = []
+    for nrows in rows:
+        for ncols in cols:
+            if nrows * ncols > max_cells:
+                continue
+            for path in paths:
+                for repeat in range(repeats):
+                    config = {
+                        "rows": nrows,
+                        "cols": ncols,
+                        "path": path,
+                        "repeat": repeat,
+                    }
+                    config.update(PATHS[path])
+                    results.append(_run_in_subprocess(config, seed))
+    return {"environment": environment(), "results": results}
+
+
+def _run_in_subprocess(config, seed):
+    args = json.dumps({key: config[key] for key in ["rows", "cols", "path"]})
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "tests.benchmarks",
+            "--single",
+            args,
+            "--seed",
+            str(seed),
+        ],
+        cwd=REPO_DIR,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    result = dict(config)
+    if proc.returncode != 0:
+        # a child killed by a signal, e.g. by the OOM killer, may print
+        # nothing; a negative return code is the number of that signal
+        result["returncode"] = proc.returncode
+        lines = proc.stderr.decode().strip().splitlines()
+        if lines:
+            result["error"] = lines[-1]
+        else:
+            result["error"] = f"exited with {proc.returncode}"
+        return result
+    result.update(json.loads(proc.stdout.decode().strip().splitlines()[-1]))
+    return result
+
+
+def _int_list(value):
+    return [int(float(x)) for x in value.split(",")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark simple_auto_stationarize."
+    )
+    parser.add_argument(
+        "--rows", type=_int_list, help="Comma-separated series lengths."
+    )
+    parser.add_argument(
+        "--cols", type=_int_list, help="Comma-separated column counts."
+    )
+    parser.add_argument(
+        "--paths",
+        type=lambda value: value.split(","),
+        help=f"Comma-separated code paths, out of {', '.join(PATHS)}.",
+    )
+    parser.add_argument(
+        "--max-cells", type=lambda value: int(float(value)), default=None
+    )
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output", help="A file to write results to, instead of stdout."
+    )
+    parser.add_argument(
+        "--logging",
+        action="store_true",
+        help="Also time the overhead of DEBUG logging.",
+    )
+    parser.add_argument(
+        "--import-time",
+        action="store_true",
+        help="Also time importing stationarizer in fresh interpreters.",
+    )
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.single is not None:
+        print(json.dumps(run_one(seed=args.seed, **json.loads(args.single))))
+        return
+    report = run_benchmarks(
+        rows=args.rows,
+        cols=args.cols,
+        paths=args.paths,
+        max_cells=args.max_cells,
+        repeats=args.repeats,
+        seed=args.seed,
+    )
+    if args.logging:
+        report["logging"] = logging_overhead(seed=args.seed)
+    if args.import_time:
+        report["import"] = import_time()
+    if args.output is None:
+        print(json.dumps(report, indent=2))
+        return
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
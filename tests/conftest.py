@@ -0,0 +1,106 @@
+"""Fixtures shared by stationarizer tests."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stationarizer.synthetic import process_panel
+
+from .stochastic_process_generators import (
+    unit_root_process,
+    trend_stationary_unit_root_process,
+    trend_stationary,
+    white_noise_gaussian_process,
+)
+
+# generators of a series of each process type, by column name
+PROCESS_SERIES = {
+    "gauss": white_noise_gaussian_process,
+    "trend": lambda steps: trend_stationary(steps, 2),
+    "uroot": unit_root_process,
+    "trend_uroot": trend_stationary_unit_root_process,
+}
+
+# the default columns of synthetic panels; two of each process type
+PANEL_COUNTS = {
+    "white_noise": 2,
+    "trend_stationary": 2,
+    "unit_root": 2,
+    "trend_unit_root": 2,
+}
+
+
+def _processes_df(steps, seed=None, names=None, copies=1):
+    """A dataframe with a series of each named process type, in order.
+
+    With copies > 1, all named series are drawn again for each copy, and
+    column names are suffixed with the index of the copy. Series are drawn
+    from numpy's global random state, seeded with seed if given.
+    """
+    if seed is not None:
+        np.random.seed(seed)
+    if names is None:
+        names = list(PROCESS_SERIES)
+    cols = {}
+    for i in range(copies):
+        suffix = "" if copies == 1 else str(i)
+        for name in names:
+            cols[name + suffix] = PROCESS_SERIES[name](steps)
+    return pd.DataFrame.from_dict(cols)
+
+
+@pytest.fixture
+def processes_df():
+    """Makes dataframes with a series of each process type.
+
+    The fixture is called with the number of steps and, optionally, a seed,
+    the names of the processes to include and a number of copies.
+    """
+    return _processes_df
+
+
+@pytest.fixture
+def processes_matrix():
+    """Makes row-major arrays with a column of each process type.
+
+    The fixture is called with the number of steps and, optionally, a seed.
+    """
+
+    def make(steps, seed=None):
+        return np.ascontiguousarray(_processes_df(steps, seed).values)
+
+    return make
+
+
+@pytest.fixture
+def panel():
+    """Makes synthetic panels of stationarizer.synthetic processes.
+
+    The fixture is called with the number of steps, a seed and, optionally,
+    the columns per process, as taken by process_panel; two of each process
+    type by default.
+    """
+
+    def make(steps, seed, columns_per_process=None):
+        if columns_per_process is None:
+            columns_per_process = PANEL_COUNTS
+        return process_panel(steps, columns_per_process, random_state=seed)[0]
+
+    return make
+
+
+@pytest.fixture
+def assert_same_results():
+    """Asserts two ArrayResults tuples are equal, up to rounding."""
+
+    def check(results, expected):
+        for field in expected._fields:
+            np.testing.assert_allclose(
+                getattr(results, field),
+                getattr(expected, field),
+                rtol=1e-6,
+                atol=1e-8,
+                err_msg=field,
+            )
+
+    return check
@@ -49,7 +49,7 @@ def trend_stationary(steps, slope=None, std=None):
     """
     if slope is None:
         slope = 3
-    linear_trend = np.dot(slope, list(range(steps)))
+    linear_trend = slope * np.arange(steps)
     noise_srs = white_noise_gaussian_process(steps, std=std)
     return linear_trend + noise_srs
 
@@ -0,0 +1,129 @@
+"""Testing the Augmented Dickey-Fuller engines."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.stattools import adfuller
+
+from stationarizer import simple_auto_stationarize, stationarize_array
+from stationarizer.adf import (
+    adfuller_batch,
+    adfuller_incremental,
+    _lag_windows,
+    _precondition,
+    _series_design,
+    _series_gram,
+)
+from stationarizer.core import BACKENDS
+
+STEPS = 300
+SEED = 1
+
+
+@pytest.mark.parametrize("regression", ["n", "c", "ct"])
+@pytest.mark.parametrize("autolag", ["AIC", "BIC", "t-stat", None])
+def test_adfuller_batch_matches_statsmodels(
+    regression, autolag, processes_matrix
+):
+    X = processes_matrix(STEPS, SEED)
+    adfstat, pvalue, usedlag, nobs = adfuller_batch(
+        X, regression=regression, autolag=autolag
+    )
+    for i in range(X.shape[1]):
+        expected = adfuller(X[:, i], regression=regression, autolag=autolag)
+        assert usedlag[i] == expected[2]
+        assert nobs[i] == expected[3]
+        assert adfstat[i] == pytest.approx(expected[0], rel=1e-6)
+        assert pvalue[i] == pytest.approx(expected[1], rel=1e-6, abs=1e-12)
+
+
+def test_adfuller_batch_bad_input(processes_matrix):
+    X = processes_matrix(STEPS, SEED)
+    X[:, 1] = 3
+    with pytest.raises(ValueError):
+        adfuller_batch(X)
+    with pytest.raises(ValueError):
+        adfuller_batch(processes_matrix(STEPS, SEED), regression="ctt")
+    with pytest.raises(ValueError):
+        adfuller_batch(processes_matrix(STEPS, SEED), autolag="hqic")
+    with pytest.raises(ValueError):
+        adfuller_batch(processes_matrix(STEPS, SEED), maxlag=STEPS)
+    X = processes_matrix(STEPS, SEED)
+    X[7, 2] = np.nan
+    with pytest.raises(ValueError, match=r"columns \[2\]"):
+        adfuller_batch(X)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_missing_values_raise(backend, processes_matrix):
+    X = processes_matrix(STEPS, SEED)
+    X[STEPS // 2, 1] = np.nan
+    X[0, 3] = np.inf
+    with pytest.raises(ValueError, match=r"columns \[1, 3\]"):
+        stationarize_array(X, backend=backend)
+    df = pd.DataFrame(X, columns=["a", "b", "c", "d"])
+    with pytest.raises(ValueError, match=r"columns \['b', 'd'\]"):
+        simple_auto_stationarize(df, backend=backend)
+
+
+@pytest.mark.parametrize("backend", ["incremental", "vectorized"])
+def test_backends(backend, processes_matrix):
+    df = pd.DataFrame(processes_matrix(STEPS, SEED))
+    expected = simple_auto_stationarize(
+        df, get_conclusions=True, backend="statsmodels"
+    )
+    results = simple_auto_stationarize(
+        df, get_conclusions=True, backend=backend
+    )
+    assert results["conclusions"] == expected["conclusions"]
+    assert np.allclose(results["postdf"].values, expected["postdf"].values)
+    with pytest.raises(ValueError):
+        simple_auto_stationarize(df, backend="gpu")
+
+
+@pytest.mark.parametrize("regression", ["n", "c", "ct"])
+@pytest.mark.parametrize("autolag", ["AIC", "BIC", "t-stat", None])
+def test_adfuller_incremental_matches_statsmodels(
+    regression, autolag, processes_matrix
+):
+    X = processes_matrix(STEPS, SEED)
+    for i in range(X.shape[1]):
+        result = adfuller_incremental(
+            X[:, i], regression=regression, autolag=autolag
+        )
+        expected = adfuller(X[:, i], regression=regression, autolag=autolag)
+        assert len(result) == len(expected)
+        assert result[0] == pytest.approx(expected[0], rel=1e-6)
+        assert result[1] == pytest.approx(expected[1], rel=1e-6, abs=1e-12)
+        assert result[2:5] == expected[2:5]
+        if autolag is not None:
+            assert result[5] == pytest.approx(expected[5], rel=1e-6)
+
+
+def test_adfuller_incremental_bad_input(processes_matrix):
+    x = processes_matrix(STEPS, SEED)[:, 0]
+    with pytest.raises(ValueError):
+        adfuller_incremental(np.ones(STEPS))
+    with pytest.raises(ValueError):
+        adfuller_incremental(x[:, None])
+    with pytest.raises(ValueError):
+        adfuller_incremental(x, autolag="hqic")
+    with pytest.raises(ValueError):
+        adfuller_incremental(x, maxlag=STEPS)
+    x[5] = np.nan
+    with pytest.raises(ValueError, match="missing"):
+        adfuller_incremental(x)
+
+
+@pytest.mark.parametrize("regression", ["n", "c", "ct"])
+def test_series_gram_from_strided_views(regression, processes_matrix):
+    x = processes_matrix(STEPS, SEED)[:, 3]
+    x, dx = _precondition(x, np.diff(x), regression)
+    nlags = 9
+    windows = _lag_windows(dx, nlags, nlags, len(dx))
+    assert np.shares_memory(windows, dx)
+    assert np.array_equal(windows[:, 0], dx[nlags:])
+    assert np.array_equal(windows[:, nlags], dx[: len(dx) - nlags])
+    gram = _series_gram(x, dx, nlags, nlags, len(dx), regression)
+    design = _series_design(x, dx, nlags, nlags, len(dx), regression)
+    assert np.allclose(gram, design.T @ design, rtol=1e-10, atol=1e-8)
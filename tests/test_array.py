@@ -0,0 +1,179 @@
+"""Testing the array entry point."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stationarizer import simple_auto_stationarize, stationarize_array
+from stationarizer.core import (
+    CONCLUSIONS,
+    CONCLUSION_TO_TRANSFORMATIONS,
+    multitest_conclusions,
+)
+
+STEPS = 400
+SEED = 11
+# the fields of ArrayResults which reconclude leaves unchanged
+TEST_FIELDS = ("adf_stats", "adf_pvals", "kpss_stats", "kpss_pvals")
+
+
+def test_stationarize_array_matches_dataframe(processes_matrix):
+    X = processes_matrix(STEPS, SEED)
+    df = pd.DataFrame(X, columns=["a", "b", "c", "d"])
+    expected = simple_auto_stationarize(
+        df, get_conclusions=True, get_actions=True
+    )
+    post, results = stationarize_array(np.asfortranarray(X))
+    assert isinstance(post, np.ndarray)
+    assert np.allclose(post, expected["postdf"].values)
+    conclusions = [CONCLUSIONS[code] for code in results.conclusions]
+    assert conclusions == list(expected["conclusions"].values())
+    for i, conclusion in enumerate(conclusions):
+        actions = CONCLUSION_TO_TRANSFORMATIONS[conclusion]
+        assert results.detrend_mask[i] == ("Detrend" in actions)
+        assert results.diff_mask[i] == ("Diffrentiate" in actions)
+    for name in results._fields:
+        assert len(getattr(results, name)) == X.shape[1]
+    assert np.all(results.adf_corrected_pvals >= results.adf_pvals)
+    # row-major input gives the same results
+    c_post, c_results = stationarize_array(np.ascontiguousarray(X))
+    assert np.array_equal(c_post, post)
+    assert np.array_equal(c_results.conclusions, results.conclusions)
+
+
+def test_stationarize_array_bad_input(processes_matrix):
+    with pytest.raises(ValueError):
+        stationarize_array(np.ones(STEPS))
+    with pytest.raises(ValueError):
+        stationarize_array(processes_matrix(STEPS, SEED), backend="gpu")
+
+
+@pytest.mark.parametrize("backend", ["incremental", "vectorized"])
+def test_stationarize_array_max_memory(backend, processes_matrix):
+    from stationarizer.memory import (
+        estimate_test_bytes,
+        transform_columns_within,
+    )
+
+    X = np.tile(processes_matrix(STEPS, SEED), 5)
+    post, results = stationarize_array(X, backend=backend)
+    # enough memory for a single column at a time, of either stage
+    budget = estimate_test_bytes(STEPS, 1, backend)
+    assert transform_columns_within(budget, STEPS) < X.shape[1]
+    for layout in [np.asfortranarray, np.ascontiguousarray]:
+        budget_post, budget_results = stationarize_array(
+            layout(X), backend=backend, max_memory=budget
+        )
+        # stacked regressions may round differently over fewer columns
+        assert np.allclose(budget_post, post)
+        for name in results._fields:
+            assert np.allclose(
+                getattr(budget_results, name), getattr(results, name)
+            )
+        assert np.array_equal(budget_results.conclusions, results.conclusions)
+    df = pd.DataFrame(X)
+    assert np.allclose(
+        simple_auto_stationarize(df, backend=backend, max_memory=budget),
+        simple_auto_stationarize(df, backend=backend),
+    )
+    with pytest.raises(ValueError):
+        stationarize_array(X, backend=backend, max_memory=budget // 2)
+
+
+def test_multitest_is_honoured(processes_matrix):
+    X = processes_matrix(STEPS, SEED)
+    pvals = {}
+    for multitest in ["fdr_by", "fdr_bh", "bonferroni"]:
+        results = stationarize_array(X, multitest=multitest)[1]
+        pvals[multitest] = results.adf_corrected_pvals
+        assert np.array_equal(
+            results.adf_rejections, results.adf_corrected_pvals <= 0.05
+        )
+    assert np.all(pvals["fdr_bh"] <= pvals["fdr_by"])
+    assert not np.allclose(pvals["fdr_bh"], pvals["fdr_by"])
+    assert np.allclose(
+        pvals["bonferroni"],
+        np.minimum(2 * X.shape[1] * results.adf_pvals, 1),
+    )
+
+
+@pytest.mark.parametrize("multitest", ["fdr_bh", "holm", "fdr_tsbh"])
+def test_reconclude_matches_new_runs(multitest, processes_matrix):
+    X = processes_matrix(STEPS, SEED)
+    results = stationarize_array(X)[1]
+    alphas = [0.001, 0.01, 0.05, 0.2, 0.5]
+    sweep = results.reconclude(alphas, multitest)
+    assert np.array_equal(sweep.adf_pvals, results.adf_pvals)
+    for i, alpha in enumerate(alphas):
+        expected = stationarize_array(X, alpha=alpha, multitest=multitest)[1]
+        single = results.reconclude(alpha, multitest)
+        for name in results._fields:
+            assert np.allclose(getattr(single, name), getattr(expected, name))
+            swept = getattr(sweep, name)
+            if name not in TEST_FIELDS:
+                swept = swept[i]
+            assert np.allclose(swept, getattr(expected, name))
+    # default settings give back the original results
+    same = results.reconclude()
+    for name in results._fields:
+        assert np.array_equal(getattr(same, name), getattr(results, name))
+
+
+@pytest.mark.parametrize("multitest", ["fdr_tsbh", "FDR_TSBH", "Holm"])
+def test_reconclude_sweep_matches_multipletests(multitest, processes_matrix):
+    from statsmodels.stats.multitest import multipletests
+
+    rng = np.random.RandomState(0)
+    n = 20
+    pvals = np.concatenate([rng.uniform(0, 0.02, n), rng.uniform(size=n)])
+    results = stationarize_array(processes_matrix(STEPS, SEED))[1]._replace(
+        adf_stats=np.zeros(n),
+        kpss_stats=np.zeros(n),
+        adf_pvals=pvals[:n],
+        kpss_pvals=pvals[n:],
+    )
+    alphas = [0.01, 0.05, 0.2, 0.4]
+    sweep = results.reconclude(alphas, multitest)
+    for i, alpha in enumerate(alphas):
+        reject, corrected = multipletests(
+            pvals, alpha=alpha, method=multitest.lower()
+        )[:2]
+        assert np.allclose(sweep.adf_corrected_pvals[i], corrected[:n])
+        assert np.array_equal(sweep.kpss_rejections[i], reject[n:])
+
+
+@pytest.mark.parametrize("alpha", [0.01, 0.05])
+def test_multitest_conclusions_at_the_boundary(alpha):
+    from statsmodels.stats.multitest import multipletests
+
+    # three p-values right at the threshold of fdr_bh, which compares raw
+    # p-values with alpha * 3 / 4, while their corrected p-values round to
+    # either side of alpha
+    p = alpha * 3 / 4
+    adf_pvals, kpss_pvals = np.array([p, p]), np.array([p, 0.9])
+    reject = multipletests(
+        np.concatenate([adf_pvals, kpss_pvals]), alpha=alpha, method="fdr_bh"
+    )[0]
+    single = multitest_conclusions(adf_pvals, kpss_pvals, alpha, "fdr_bh")
+    sweep = multitest_conclusions(
+        adf_pvals, kpss_pvals, [0.001, alpha], "fdr_bh"
+    )
+    for results in [single, {k: v[1] for k, v in sweep.items()}]:
+        assert np.array_equal(results["adf_rejections"], reject[:2])
+        assert np.array_equal(results["kpss_rejections"], reject[2:])
+
+
+def test_get_results(processes_matrix):
+    df = pd.DataFrame(
+        processes_matrix(STEPS, SEED), columns=["a", "b", "c", "d"]
+    )
+    res = simple_auto_stationarize(df, get_conclusions=True, get_results=True)
+    assert np.array_equal(
+        [CONCLUSIONS[code] for code in res["results"].conclusions],
+        list(res["conclusions"].values()),
+    )
+    strict = simple_auto_stationarize(df, alpha=0.001, get_conclusions=True)
+    codes = res["results"].reconclude(0.001).conclusions
+    assert [CONCLUSIONS[code] for code in codes] == list(
+        strict["conclusions"].values()
+    )
@@ -0,0 +1,76 @@
+"""Testing the benchmark suite on a tiny grid."""
+
+import json
+import subprocess
+
+from . import benchmarks
+from .benchmarks import logging_overhead, run_benchmarks, main
+
+MEASUREMENTS = [
+    "wall_seconds",
+    "cpu_seconds",
+    "data_peak_rss_bytes",
+    "peak_rss_bytes",
+    "children_peak_rss_bytes",
+]
+
+
+def test_run_benchmarks():
+    report = run_benchmarks(
+        rows=[200, 400],
+        cols=[1, 3],
+        paths=["serial", "vectorized"],
+        max_cells=800,
+    )
+    assert report["environment"]["cpu_count"] > 0
+    results = report["results"]
+    # the 400 x 3 configuration exceeds max_cells
+    assert len(results) == 6
+    for result in results:
+        assert "error" not in result
+        assert result["rows"] * result["cols"] <= 800
+        for measurement in MEASUREMENTS:
+            assert result[measurement] >= 0
+        assert result["peak_rss_bytes"] >= result["data_peak_rss_bytes"]
+    json.dumps(report)
+
+
+def test_main_writes_json(tmp_path):
+    fpath = tmp_path / "results.json"
+    main(
+        [
+            "--rows",
+            "1e2",
+            "--cols",
+            "2",
+            "--paths",
+            "parallel",
+            "--output",
+            str(fpath),
+        ]
+    )
+    with open(str(fpath)) as f:
+        report = json.load(f)
+    assert [r["path"] for r in report["results"]] == ["parallel"]
+    assert report["results"][0]["n_jobs"] == -1
+
+
+def test_logging_overhead():
+    timings = logging_overhead(rows=200, cols=6, repeats=1)
+    assert timings["warning_seconds"] > 0
+    assert timings["debug_seconds"] > 0
+    assert timings["debug_overhead_seconds"] == (
+        timings["debug_seconds"] - timings["warning_seconds"]
+    )
+
+
+def test_killed_runs_are_recorded(monkeypatch):
+    def killed(args, **kwargs):
+        # as when the OOM killer takes the child out: SIGKILL, no stderr
+        return subprocess.CompletedProcess(args, -9, b"", b"")
+
+    monkeypatch.setattr(benchmarks.subprocess, "run", killed)
+    report = run_benchmarks(rows=[200], cols=[1], paths=["serial"])
+    result = report["results"][0]
+    assert result["returncode"] == -9
+    assert result["error"] == "exited with -9"
@@ -0,0 +1,115 @@
+"""Testing caching of unit root test results."""
+
+import numpy as np
+import pytest
+
+from stationarizer import simple_auto_stationarize, UnitRootCache
+from stationarizer.cache import column_key
+
+from .stochastic_process_generators import unit_root_process
+
+STEPS = 300
+SEED = 4
+NAMES = ["gauss", "trend", "uroot"]
+
+
+def test_column_key():
+    col = np.arange(10, dtype=float)
+    key = column_key(col, "adf", regression="ct")
+    assert key == column_key(col.copy(), "adf", regression="ct")
+    assert key != column_key(col, "kpss", regression="ct")
+    assert key != column_key(col, "adf", regression="c")
+    changed = col.copy()
+    changed[3] += 1e-9
+    assert key != column_key(changed, "adf", regression="ct")
+
+
+def test_lru_eviction():
+    cache = UnitRootCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.maxsize, info.currsize) == (
+        3,
+        1,
+        2,
+        2,
+    )
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.cache_info().hits == 0
+
+
+def test_cached_stationarization(tmpdir, processes_df):
+    df = processes_df(STEPS, SEED, NAMES)
+    expected = simple_auto_stationarize(df, get_conclusions=True)
+    cache = UnitRootCache(cache_dir=str(tmpdir))
+    first = simple_auto_stationarize(df, get_conclusions=True, cache=cache)
+    assert cache.cache_info().misses == 2 * len(df.columns)
+    assert cache.cache_info().hits == 0
+    # only the changed column is tested again
+    df["uroot"] = unit_root_process(STEPS)
+    simple_auto_stationarize(df, get_conclusions=True, cache=cache)
+    assert cache.cache_info().misses == 2 * len(df.columns) + 2
+    assert cache.cache_info().hits == 2 * len(df.columns) - 2
+    assert first["conclusions"] == expected["conclusions"]
+    # results persisted to disk are found by a new cache
+    disk_cache = UnitRootCache(cache_dir=str(tmpdir))
+    df = processes_df(STEPS, SEED, NAMES)
+    second = simple_auto_stationarize(
+        df, get_conclusions=True, cache=disk_cache
+    )
+    assert disk_cache.cache_info().misses == 0
+    assert second["conclusions"] == expected["conclusions"]
+    assert np.array_equal(second["postdf"].values, first["postdf"].values)
+
+
+def test_unreadable_cache_files_are_misses(tmpdir):
+    cache = UnitRootCache(cache_dir=str(tmpdir))
+    cache.set("full", (1.0, 0.5))
+    assert [f.basename for f in tmpdir.listdir()] == ["full.pkl"]
+    # a truncated file, as seen while another process writes it
+    tmpdir.join("partial.pkl").write_binary(
+        tmpdir.join("full.pkl").read_binary()[:5]
+    )
+    tmpdir.join("garbage.pkl").write_binary(b"not a pickle")
+    disk_cache = UnitRootCache(cache_dir=str(tmpdir))
+    assert disk_cache.get("partial") is None
+    assert disk_cache.get("garbage") is None
+    assert disk_cache.get("full") == (1.0, 0.5)
+    assert disk_cache.cache_info().misses == 2
+
+
+@pytest.mark.parametrize(
+    "garbage",
+    [
+        # an unsupported protocol and a bad literal raise ValueError
+        b"\x80\x09.",
+        b"I12x\n.",
+        # globals of missing modules and attributes
+        b"cno_such_module\nfoo\n.",
+        b"cbuiltins\nno_such_attr\n.",
+    ],
+)
+def test_foreign_cache_files_are_rebuilt(tmpdir, garbage):
+    tmpdir.join("key.pkl").write_binary(garbage)
+    cache = UnitRootCache(cache_dir=str(tmpdir))
+    assert cache.get("key") is None
+    assert cache.cache_info().misses == 1
+    # the recomputed result replaces the unreadable file
+    cache.set("key", (2.0, 0.1))
+    assert UnitRootCache(cache_dir=str(tmpdir)).get("key") == (2.0, 0.1)
+
+
+def test_backends_are_cached_apart(processes_df):
+    df = processes_df(STEPS, SEED, NAMES)
+    cache = UnitRootCache()
+    simple_auto_stationarize(df, cache=cache, backend="vectorized")
+    simple_auto_stationarize(df, cache=cache, backend="statsmodels")
+    assert cache.cache_info().hits == 0
+    assert len(cache) == 4 * len(df.columns)
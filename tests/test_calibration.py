@@ -0,0 +1,88 @@
+"""Testing the Monte Carlo calibration harness."""
+
+import json
+
+import numpy as np
+
+from stationarizer.core import CONCLUSIONS
+from stationarizer.synthetic import Process, PROCESSES
+from stationarizer.calibration import (
+    ADF_H0_PROCESSES,
+    KPSS_H0_PROCESSES,
+    calibrate,
+)
+
+STEPS = 200
+REPLICATES = 60
+ALPHAS = [0.01, 0.05]
+MULTITESTS = ["fdr_by", "bonferroni"]
+
+
+def _calibrate(**kwargs):
+    return calibrate(
+        STEPS,
+        REPLICATES,
+        alphas=ALPHAS,
+        multitests=MULTITESTS,
+        random_state=11,
+        batch_size=25,
+        **kwargs,
+    )
+
+
+def test_calibrate_rates():
+    results = _calibrate()
+    shape = (len(ALPHAS), len(MULTITESTS), len(PROCESSES))
+    assert results.rejection_rates.shape == shape + (2,)
+    assert results.raw_rejection_rates.shape == shape[::2] + (2,)
+    assert results.confusion.shape == shape + (len(CONCLUSIONS),)
+    assert np.array_equal(results.series_counts, [REPLICATES] * 4)
+    assert np.allclose(results.confusion.sum(axis=-1), 1)
+    # corrections only make rejections rarer
+    assert np.all(
+        results.rejection_rates <= results.raw_rejection_rates[:, None]
+    )
+    # a larger alpha only makes rejections more frequent
+    assert np.all(
+        results.raw_rejection_rates[0] <= results.raw_rejection_rates[1]
+    )
+    raw = results.raw_rejection_rates[1]
+    for process in PROCESSES:
+        adf, kpss = raw[PROCESSES.index(process)]
+        # sizes are small, and powers large, apart from KPSS on a pure unit
+        # root, whose power is only moderate at this length
+        assert adf < 0.2 if process in ADF_H0_PROCESSES else adf > 0.9
+        if process in KPSS_H0_PROCESSES:
+            assert kpss < 0.2
+        elif process == Process.TREND_UNIT_ROOT:
+            assert kpss > 0.9
+    accuracy = results.accuracy(0.05, "fdr_by")
+    assert accuracy[PROCESSES.index(Process.WHITE_NOISE)] > 0.9
+    assert accuracy[PROCESSES.index(Process.TREND_STATIONARY)] > 0.9
+
+
+def test_calibrate_reproducible_across_jobs():
+    serial = _calibrate()
+    parallel = _calibrate(n_jobs=2)
+    assert np.array_equal(serial.confusion, parallel.confusion)
+    assert np.array_equal(serial.rejection_rates, parallel.rejection_rates)
+
+
+def test_calibrate_records():
+    results = calibrate(
+        STEPS,
+        10,
+        columns_per_process={Process.UNIT_ROOT: 2, Process.WHITE_NOISE: 1},
+        random_state=0,
+    )
+    records = json.loads(json.dumps(results.records()))
+    # one record per calibrated process type
+    assert [r["process"] for r in records] == [
+        Process.WHITE_NOISE,
+        Process.UNIT_ROOT,
+    ]
+    assert [r["series"] for r in records] == [10, 20]
+    assert all(r["alpha"] == 0.05 for r in records)
+    assert all(r["multitest"] == "fdr_by" for r in records)
+    assert records[1]["adf_h0_true"] and not records[1]["kpss_h0_true"]
+    assert abs(sum(records[0]["conclusions"].values()) - 1) < 1e-9
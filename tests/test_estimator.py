@@ -0,0 +1,127 @@
+"""Testing the fit/transform stationarizer."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stationarizer import simple_auto_stationarize, Stationarizer
+
+STEPS = 400
+
+
+def test_fit_transform_matches_simple_auto_stationarize(processes_df):
+    df = processes_df(STEPS, 5)
+    expected = simple_auto_stationarize(
+        df, get_conclusions=True, get_actions=True
+    )
+    stationarizer = Stationarizer()
+    postdf = stationarizer.fit_transform(df)
+    assert stationarizer.conclusions_ == expected["conclusions"]
+    assert stationarizer.actions_ == expected["actions"]
+    assert np.allclose(postdf.values, expected["postdf"].values)
+    transformed = stationarizer.transform(df, start=0)
+    assert list(transformed.columns) == list(df.columns)
+    assert transformed.index.equals(expected["postdf"].index)
+    assert np.allclose(transformed.values, expected["postdf"].values)
+    assert np.allclose(
+        stationarizer.transform(df.values, start=0), postdf.values
+    )
+
+
+def test_fit_then_transform_differs_from_fit_transform(processes_df):
+    df = processes_df(STEPS, 8)
+    postdf = Stationarizer().fit_transform(df)
+    stationarizer = Stationarizer().fit(df)
+    assert stationarizer.detrend_mask_.any()
+    # transform defaults to data following the training data
+    transformed = stationarizer.transform(df)
+    assert transformed.shape == postdf.shape
+    detrended = stationarizer.detrend_mask_ & ~stationarizer.diff_mask_
+    assert not np.allclose(
+        transformed.values[:, detrended], postdf.values[:, detrended]
+    )
+    assert np.allclose(
+        transformed.values[:, ~detrended], postdf.values[:, ~detrended]
+    )
+    assert np.allclose(
+        stationarizer.transform(df, start=0).values, postdf.values
+    )
+
+
+def test_transform_new_data(processes_df):
+    full = processes_df(2 * STEPS, 6)
+    train, test = full.iloc[:STEPS], full.iloc[STEPS:]
+    stationarizer = Stationarizer().fit(train)
+    # by default, new data directly follows the training data
+    transformed = stationarizer.transform(test)
+    # continuing trends are removed using the training coefficients
+    slopes, intercepts = stationarizer.slopes_, stationarizer.intercepts_
+    steps = np.arange(STEPS, 2 * STEPS)[:, None]
+    detrended = test.values - stationarizer.detrend_mask_ * (
+        steps * slopes + intercepts
+    )
+    for i, colname in enumerate(full.columns):
+        if stationarizer.diff_mask_[i]:
+            expected = np.diff(detrended[:, i])
+        else:
+            expected = detrended[: len(transformed), i]
+        assert np.allclose(transformed[colname].values, expected)
+    assert np.allclose(
+        stationarizer.transform(test, start=STEPS).values, transformed.values
+    )
+    # column order of new data does not matter
+    shuffled = test[list(reversed(full.columns))]
+    assert np.allclose(
+        stationarizer.transform(shuffled).values, transformed.values
+    )
+
+
+def test_transform_errors(processes_df):
+    df = processes_df(STEPS, 7)
+    with pytest.raises(ValueError):
+        Stationarizer().transform(df)
+    stationarizer = Stationarizer().fit(df)
+    with pytest.raises(ValueError):
+        stationarizer.transform(df.values[:, :2])
+
+
+def test_inverse_transform(processes_df):
+    full = processes_df(STEPS + 30, 10)
+    train, test = full.iloc[:STEPS], full.iloc[STEPS:]
+    stationarizer = Stationarizer().fit(train)
+    # stationarized rows following the training data, as forecasts would be
+    detrended = test.values - (
+        np.arange(STEPS, STEPS + 30)[:, None] * stationarizer.slopes_
+        + stationarizer.intercepts_
+    )
+    diff_mask = stationarizer.diff_mask_
+    forecasts = detrended.copy()
+    forecasts[:, diff_mask] = np.diff(
+        np.vstack([stationarizer.last_obs_, test.values])
+        - (
+            np.arange(STEPS - 1, STEPS + 30)[:, None] * stationarizer.slopes_
+            + stationarizer.intercepts_
+        ),
+        axis=0,
+    )[:, diff_mask]
+    restored = stationarizer.inverse_transform(forecasts)
+    assert np.allclose(restored, test.values)
+    restored = stationarizer.inverse_transform(
+        pd.DataFrame(forecasts, columns=full.columns, index=test.index)
+    )
+    assert restored.index.equals(test.index)
+    assert np.allclose(restored.values, test.values)
+    # samples of probabilistic forecasts are restored independently
+    samples = np.stack([forecasts, 2 * forecasts], axis=-1)
+    restored = stationarizer.inverse_transform(samples)
+    assert restored.shape == samples.shape
+    assert np.allclose(restored[:, :, 0], test.values)
+    expected = stationarizer.inverse_transform(2 * forecasts)
+    assert np.allclose(restored[:, :, 1], expected)
+    # any time step can be anchored explicitly
+    restored = stationarizer.inverse_transform(
+        forecasts[10:], start=STEPS + 10, last_obs=test.values[9]
+    )
+    assert np.allclose(restored, test.values[10:])
+    with pytest.raises(ValueError):
+        stationarizer.inverse_transform(forecasts[:, :2])
@@ -0,0 +1,64 @@
+"""Testing that importing stationarizer stays cheap."""
+
+import os
+import sys
+import json
+import subprocess
+
+from .benchmarks import import_time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["pandas", "scipy", "statsmodels", "logzero"]
+
+IMPORT_SCRIPT = """
+import os, sys, json, logging
+import stationarizer
+from stationarizer import util
+report = {
+    "loaded": [m for m in %r if m in sys.modules],
+    "logger_set_up": util._HANDLERS_SET_UP,
+    "logger": isinstance(util.LOGGER, logging.Logger),
+    "handlers": len(logging.getLogger("stationarizer").handlers),
+    "home_written": os.path.exists(
+        os.path.expanduser("~/.stationarizer")
+    ),
+}
+util.get_logger()
+report["handlers_after_use"] = len(logging.getLogger("stationarizer").handlers)
+report["logzero"] = "logzero" in sys.modules
+print(json.dumps(report))
+"""
+
+
+def _import_in_subprocess(home):
+    env = dict(os.environ, HOME=str(home))
+    output = subprocess.check_output(
+        [sys.executable, "-c", IMPORT_SCRIPT % (HEAVY_MODULES,)],
+        cwd=REPO_DIR,
+        env=env,
+    )
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def test_import_is_lazy_and_side_effect_free(tmp_path):
+    report = _import_in_subprocess(tmp_path)
+    # heavy dependencies are only imported on first use
+    assert report["loaded"] == []
+    # the logger's handlers are set up on first use, not at import, but
+    # util.LOGGER can be imported and logged with as before
+    assert report["logger"]
+    assert not report["logger_set_up"]
+    assert report["handlers"] == 0
+    if report["logzero"]:
+        assert report["handlers_after_use"] > 0
+    # nothing is written to the home directory on import
+    assert not report["home_written"]
+
+
+def test_import_time(record_property):
+    timings = import_time(repeats=3)
+    for name, value in timings.items():
+        record_property(name, value)
+    # relative to numpy, so the bound holds on slow hosts; loading pandas
+    # and statsmodels eagerly costs over 10 times the import of numpy
+    assert timings["relative_to_numpy"] <= 3
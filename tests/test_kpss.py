@@ -0,0 +1,47 @@
+"""Testing the batched KPSS engine."""
+
+import warnings
+
+import numpy as np
+import pytest
+from statsmodels.tsa.stattools import kpss
+
+from stationarizer import kpss as kpss_module
+from stationarizer.kpss import kpss_batch
+
+STEPS = 400
+SEED = 2
+
+
+@pytest.mark.parametrize("regression", ["c", "ct"])
+@pytest.mark.parametrize("nlags", ["auto", "legacy", 7])
+@pytest.mark.parametrize("max_direct_lags", [0, 64])
+def test_kpss_batch_matches_statsmodels(
+    regression, nlags, max_direct_lags, monkeypatch, processes_matrix
+):
+    monkeypatch.setattr(kpss_module, "MAX_DIRECT_LAGS", max_direct_lags)
+    X = processes_matrix(STEPS, SEED)
+    kpss_stat, p_value, lags = kpss_batch(
+        X, regression=regression, nlags=nlags
+    )
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for i in range(X.shape[1]):
+            expected = kpss(X[:, i], regression=regression, nlags=nlags)
+            assert lags[i] == expected[2]
+            assert kpss_stat[i] == pytest.approx(expected[0], rel=1e-8)
+            assert p_value[i] == pytest.approx(expected[1])
+
+
+def test_kpss_batch_bad_input(processes_matrix):
+    X = processes_matrix(STEPS, SEED)
+    with pytest.raises(ValueError):
+        kpss_batch(X, regression="n")
+    with pytest.raises(ValueError):
+        kpss_batch(X, nlags="best")
+    with pytest.raises(ValueError):
+        kpss_batch(X, nlags=STEPS)
+    X[3, 0] = np.nan
+    X[-1, 2] = -np.inf
+    with pytest.raises(ValueError, match=r"columns \[0, 2\]"):
+        kpss_batch(X)
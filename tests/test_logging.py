@@ -0,0 +1,89 @@
+"""Testing that disabled logging costs nothing."""
+
+import logging
+
+from stationarizer import simple_auto_stationarize, stationarize_array
+from stationarizer import util
+
+STEPS = 600
+SEED = 13
+NAMES = ["gauss", "trend", "uroot"]
+
+
+class CountingLabel(object):
+    """A column label counting how many times it is formatted."""
+
+    formats = 0
+
+    def __init__(self, name):
+        self.name = name
+
+    def __format__(self, spec):
+        CountingLabel.formats += 1
+        return format(self.name, spec)
+
+    def __str__(self):
+        CountingLabel.formats += 1
+        return self.name
+
+    __repr__ = __str__
+
+
+class CountingLogger(logging.Logger):
+    """A logger counting the records it creates and its handlers handle."""
+
+    def __init__(self, name, level):
+        super().__init__(name, level)
+        self.records = 0
+        self.handled = 0
+        self.addHandler(logging.NullHandler())
+        self.handlers[0].handle = self._count_handled
+
+    def _count_handled(self, record):
+        self.handled += 1
+
+    def _log(self, *args, **kwargs):
+        self.records += 1
+        super()._log(*args, **kwargs)
+
+
+def _wide_df(processes_df, width):
+    """A dataframe of width columns, cycling through the process types."""
+    return processes_df(STEPS, SEED, NAMES, copies=width // len(NAMES))
+
+
+def test_no_formatting_when_disabled(processes_df):
+    X = _wide_df(processes_df, 12).values
+    labels = [CountingLabel(f"col{i}") for i in range(X.shape[1])]
+    CountingLabel.formats = 0
+    stationarize_array(X, verbosity=logging.WARNING, labels=labels)
+    assert CountingLabel.formats == 0
+    stationarize_array(X, verbosity=logging.DEBUG, labels=labels)
+    assert CountingLabel.formats > 0
+
+
+def test_disabled_logging_does_no_logger_work(monkeypatch, processes_df):
+    df = _wide_df(processes_df, 30)
+    logger = CountingLogger("counting", logging.WARNING)
+    monkeypatch.setattr(util, "LOGGER", logger)
+    simple_auto_stationarize(df, backend="vectorized")
+    assert (logger.records, logger.handled) == (0, 0)
+    logger = CountingLogger("counting", logging.DEBUG)
+    monkeypatch.setattr(util, "LOGGER", logger)
+    simple_auto_stationarize(df, backend="vectorized")
+    assert logger.records == logger.handled > df.shape[1]
+
+
+def test_no_formatting_by_simple_auto_stationarize(processes_df):
+    df = _wide_df(processes_df, 12)
+    df.columns = [CountingLabel(name) for name in df.columns]
+    CountingLabel.formats = 0
+    simple_auto_stationarize(
+        df,
+        verbosity=logging.WARNING,
+        get_conclusions=True,
+        get_actions=True,
+    )
+    assert CountingLabel.formats == 0
+    simple_auto_stationarize(df, verbosity=logging.DEBUG)
+    assert CountingLabel.formats > 0
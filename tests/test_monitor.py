@@ -0,0 +1,88 @@
+"""Testing the online stationarity monitor."""
+
+import numpy as np
+import pytest
+
+from stationarizer import StationarityMonitor, stationarize_array
+from stationarizer.adf import adfuller_incremental
+from stationarizer.core import CONCLUSIONS
+from stationarizer.kpss import kpss_batch
+
+
+def _assert_matches_batch(stats, X):
+    kpss_stat, _, kpss_lags = kpss_batch(X)
+    adf = np.array([adfuller_incremental(x)[:3] for x in X.T])
+    np.testing.assert_allclose(stats.adf_stats, adf[:, 0], rtol=1e-6)
+    np.testing.assert_allclose(stats.adf_pvals, adf[:, 1], rtol=1e-5)
+    np.testing.assert_array_equal(stats.adf_lags, adf[:, 2])
+    np.testing.assert_allclose(stats.kpss_stats, kpss_stat, rtol=1e-6)
+    np.testing.assert_array_equal(stats.kpss_lags, kpss_lags)
+
+
+@pytest.mark.parametrize("first", [1, 300, 2500])
+def test_monitor_matches_batch_tests(first, panel):
+    X = panel(4000, 3)
+    monitor = StationarityMonitor(X.shape[1], max_nobs=5000)
+    monitor.update(X[:first])
+    for row in X[first : first + 100]:
+        monitor.update(row)
+    monitor.update(X[first + 100 : 3000])
+    _assert_matches_batch(monitor.statistics(), X[:3000])
+    # statistics are refreshed as rows keep arriving
+    monitor.update(X[3000:])
+    assert monitor.n_obs == len(X)
+    _assert_matches_batch(monitor.statistics(), X)
+
+
+def test_monitor_short_history(panel):
+    X = panel(80, 4)
+    monitor = StationarityMonitor(X.shape[1]).update(X)
+    _assert_matches_batch(monitor.statistics(), X)
+
+
+def test_monitor_conclusions(panel):
+    X = panel(2000, 5)
+    monitor = StationarityMonitor(X.shape[1], max_nobs=2000).update(X)
+    results = stationarize_array(np.asfortranarray(X))[1]
+    expected = [CONCLUSIONS[code] for code in results.conclusions]
+    assert monitor.conclusions() == expected
+
+
+def test_monitor_caps_lags(panel):
+    X = panel(3000, 6)
+    monitor = StationarityMonitor(X.shape[1], adf_max_lags=4, kpss_max_lags=5)
+    stats = monitor.update(X).statistics()
+    assert stats.adf_lags.max() <= 4
+    assert stats.kpss_lags.max() <= 5
+    assert np.isfinite(stats.adf_stats).all()
+    assert np.isfinite(stats.kpss_stats).all()
+
+
+def test_monitor_bad_rows():
+    monitor = StationarityMonitor(3)
+    with pytest.raises(ValueError):
+        monitor.update(np.zeros((5, 2)))
+    with pytest.raises(ValueError):
+        monitor.statistics()
+
+
+@pytest.mark.parametrize("nobs", [500, 2000])
+def test_monitor_rejects_nonfinite_rows(nobs, panel):
+    X = panel(nobs, 4)
+    monitor = StationarityMonitor(X.shape[1], max_nobs=2000).update(X)
+    before = monitor.statistics()
+    conclusions = monitor.conclusions()
+    row = X[-1].copy()
+    row[2] = np.nan
+    with pytest.raises(ValueError, match=r"columns \[2\]"):
+        monitor.update(row)
+    row[2] = np.inf
+    with pytest.raises(ValueError, match=r"columns \[2\]"):
+        monitor.update(row[None, :])
+    assert monitor.n_obs == nobs
+    after = monitor.statistics()
+    for field in before._fields:
+        np.testing.assert_array_equal(
+            getattr(after, field), getattr(before, field)
+        )
+    assert monitor.conclusions() == conclusions
@@ -0,0 +1,75 @@
+"""Testing the online stationarizer."""
+
+import numpy as np
+
+from stationarizer import Stationarizer, OnlineStationarizer
+
+STEPS = 400
+
+
+def _fitted(processes_df, seed):
+    full = processes_df(2 * STEPS, seed)
+    stationarizer = Stationarizer().fit(full.iloc[:STEPS])
+    return stationarizer, full.values
+
+
+def test_rows_match_batch_transform(processes_df):
+    stationarizer, X = _fitted(processes_df, 8)
+    online = OnlineStationarizer.from_stationarizer(stationarizer)
+    rows = np.array([online.transform(row) for row in X[STEPS:]])
+    diff_mask = stationarizer.diff_mask_
+    # differentiated columns need the last training row as well
+    expected = stationarizer.transform(X[STEPS - 1 :], start=STEPS - 1)
+    assert np.allclose(rows[:, diff_mask], expected[-STEPS:, diff_mask])
+    expected = stationarizer.transform(X[STEPS:], start=STEPS)
+    if diff_mask.any():
+        rows = rows[:-1]
+    assert np.allclose(rows[:, ~diff_mask], expected[:, ~diff_mask])
+    assert online.t == 2 * STEPS
+
+
+def test_micro_batches_match_rows(processes_df):
+    stationarizer, X = _fitted(processes_df, 9)
+    by_row = OnlineStationarizer.from_stationarizer(stationarizer)
+    by_batch = OnlineStationarizer.from_stationarizer(stationarizer)
+    rows = np.array([by_row.transform(row) for row in X[STEPS:]])
+    batches = np.vstack(
+        [
+            by_batch.transform(X[i : i + 7])
+            for i in range(STEPS, 2 * STEPS, 7)
+        ]
+    )
+    assert np.allclose(batches, rows)
+
+
+def test_no_history():
+    X = np.arange(12, dtype=float).reshape(4, 3) ** 2
+    online = OnlineStationarizer(
+        detrend_mask=[False, True, False],
+        diff_mask=[True, False, False],
+        slopes=[5.0, 2.0, 7.0],
+        intercepts=[1.0, 1.0, 1.0],
+    )
+    out = online.transform(X)
+    assert np.isnan(out[0, 0])
+    assert np.allclose(out[1:, 0], np.diff(X[:, 0]))
+    assert np.allclose(out[:, 1], X[:, 1] - 2.0 * np.arange(4) - 1.0)
+    assert np.array_equal(out[:, 2], X[:, 2])
+
+
+def test_nonfinite_values_stay_in_their_row():
+    rows = np.array([[np.nan, 5.0], [3.0, 6.0], [4.0, np.inf], [6.0, 8.0]])
+    kwargs = dict(detrend_mask=[True, False], diff_mask=[False, True])
+    expected = np.array(
+        [[np.nan, np.nan], [2.0, 1.0], [2.0, np.inf], [3.0, -np.inf]]
+    )
+    online = OnlineStationarizer(**kwargs, slopes=[1.0, 0.0])
+    out = np.array([online.transform(row) for row in rows])
+    np.testing.assert_array_equal(out, expected)
+    online = OnlineStationarizer(**kwargs, slopes=[1.0, 0.0])
+    np.testing.assert_array_equal(online.transform(rows), expected)
+    # a non-finite last observation only affects differentiated columns
+    online = OnlineStationarizer(
+        **kwargs, slopes=[1.0, 0.0], start=1, last_obs=[np.nan, 5.0]
+    )
+    np.testing.assert_array_equal(online.transform(rows[1:]), expected[1:])
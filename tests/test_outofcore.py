@@ -0,0 +1,244 @@
+"""Testing out-of-core stationarization."""
+
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stationarizer import stationarize_array
+from stationarizer.memory import (
+    columns_within,
+    estimate_test_bytes,
+    rows_within,
+)
+from stationarizer.outofcore import (
+    _plan_chunks,
+    stationarize_chunked,
+    stationarize_out_of_core,
+)
+
+STEPS = 300
+SEED = 5
+
+
+def _run_in_memory_callbacks(X, group_size, batch_rows, **kwargs):
+    written = []
+    def read_columns(group, out):
+        out[:] = X[:, group]
+
+    results = stationarize_out_of_core(
+        read_columns,
+        lambda: (X[i : i + batch_rows] for i in range(0, len(X), batch_rows)),
+        lambda post_nrows: written.append,
+        X.shape,
+        group_size,
+        **kwargs,
+    )
+    return np.concatenate(written), results
+
+
+@pytest.mark.parametrize("group_size", [1, 5, 100])
+@pytest.mark.parametrize("batch_rows", [1, 7, 300, 1000])
+def test_out_of_core_matches_in_memory(
+    group_size, batch_rows, assert_same_results, panel
+):
+    X = panel(STEPS, SEED, 3)
+    expected_post, expected = stationarize_array(X, backend="vectorized")
+    post, results = _run_in_memory_callbacks(
+        X, group_size, batch_rows, backend="vectorized"
+    )
+    assert post.shape == expected_post.shape
+    assert np.allclose(post, expected_post)
+    assert_same_results(results, expected)
+
+
+def test_out_of_core_without_differentiation(panel):
+    X = panel(STEPS, SEED, {"white_noise": 2, "trend_stationary": 2})
+    expected_post, expected = stationarize_array(X)
+    assert not expected.diff_mask.any()
+    post, results = _run_in_memory_callbacks(X, 3, 50)
+    assert post.shape == X.shape
+    assert np.allclose(post, expected_post)
+
+
+def test_stationarize_parquet(tmp_path, assert_same_results, panel):
+    pytest.importorskip("pyarrow")
+    from stationarizer.outofcore import stationarize_parquet
+
+    X = panel(STEPS, SEED, 3)
+    df = pd.DataFrame(X, columns=[f"col{i}" for i in range(X.shape[1])])
+    # non-numeric columns are skipped
+    df["label"] = "a"
+    source = str(tmp_path / "source.parquet")
+    destination = str(tmp_path / "destination.parquet")
+    df.to_parquet(source, row_group_size=64)
+    results = stationarize_parquet(
+        source, destination, group_size=4, batch_rows=50
+    )
+    expected_post, expected = stationarize_array(X)
+    assert_same_results(results, expected)
+    postdf = pd.read_parquet(destination)
+    assert list(postdf.columns) == list(df.columns[:-1])
+    assert np.allclose(postdf.values, expected_post)
+    # a stored index is not stationarized
+    indexed = str(tmp_path / "indexed.parquet")
+    df.drop(columns="label").set_index(df.index * 2).to_parquet(indexed)
+    results = stationarize_parquet(indexed, destination)
+    assert_same_results(results, expected)
+    assert list(pd.read_parquet(destination).columns) == list(df.columns[:-1])
+    # a subset of the columns
+    results = stationarize_parquet(
+        source, destination, columns=["col0", "col11"]
+    )
+    assert len(results.conclusions) == 2
+    assert list(pd.read_parquet(destination).columns) == ["col0", "col11"]
+
+
+@pytest.mark.parametrize("order", ["C", "F"])
+def test_stationarize_chunked_memmap(
+    tmp_path, order, assert_same_results, panel
+):
+    X = panel(STEPS, SEED, 3)
+    source_path = str(tmp_path / "source.npy")
+    source = np.lib.format.open_memmap(
+        source_path, mode="w+", shape=X.shape, fortran_order=order == "F"
+    )
+    source[:] = X
+    source.flush()
+    source = np.load(source_path, mmap_mode="r")
+    expected_post, expected = stationarize_array(X)
+    destination = tmp_path / "destination.npy"
+    post, results = stationarize_chunked(
+        source, destination, group_size=5, batch_rows=64
+    )
+    assert isinstance(post, np.memmap)
+    assert np.allclose(post, expected_post)
+    assert np.allclose(np.load(destination), expected_post)
+    assert_same_results(results, expected)
+    # into an existing array of the shape of the source
+    out = np.full(X.shape, np.nan)
+    post, results = stationarize_chunked(source, out, max_memory=2 ** 20)
+    assert post is out
+    assert np.allclose(out[: len(expected_post)], expected_post)
+    with pytest.raises(ValueError):
+        stationarize_chunked(source, np.empty((3, 3)))
+
+
+def _npy_source(path, X):
+    np.save(str(path / "source.npy"), X)
+    return np.load(str(path / "source.npy"), mmap_mode="r")
+
+
+def _hdf5_source(path, X):
+    h5py = pytest.importorskip("h5py")
+    f = h5py.File(str(path / "source.h5"), "w")
+    return f.create_dataset("X", data=X, chunks=(1000, 4))
+
+
+@pytest.mark.parametrize("open_source", [_npy_source, _hdf5_source])
+@pytest.mark.parametrize("backend", ["incremental", "vectorized"])
+def test_stationarize_chunked_within_max_memory(
+    tmp_path, open_source, backend, panel
+):
+    X = panel(10000, SEED, 2)
+    source = open_source(tmp_path, X)
+    del X
+    max_memory = estimate_test_bytes(source.shape[0], 5, backend)
+    # the first run pays for lazy imports and lookup tables
+    stationarize_chunked(
+        source, tmp_path / "warmup.npy", group_size=1, backend=backend
+    )
+    tracemalloc.start()
+    try:
+        stationarize_chunked(
+            source,
+            tmp_path / "destination.npy",
+            max_memory=max_memory,
+            backend=backend,
+        )
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak <= max_memory
+
+
+def test_stationarize_chunked_hdf5_and_zarr(
+    tmp_path, assert_same_results, panel
+):
+    h5py = pytest.importorskip("h5py")
+    zarr = pytest.importorskip("zarr")
+    X = panel(STEPS, SEED, 3)
+    expected_post, expected = stationarize_array(X)
+    with h5py.File(str(tmp_path / "data.h5"), "w") as f:
+        source = f.create_dataset("X", data=X, chunks=(64, 4))
+        destination = f.create_dataset("post", shape=X.shape, dtype=float)
+        post, results = stationarize_chunked(
+            source, destination, max_memory=2 ** 20
+        )
+        assert np.allclose(post[: len(expected_post)], expected_post)
+        assert_same_results(results, expected)
+    source = zarr.array(X, chunks=(100, 3))
+    destination = zarr.zeros(X.shape, chunks=(100, 3))
+    post, results = stationarize_chunked(source, destination)
+    assert np.allclose(post[: len(expected_post)], expected_post)
+
+
+@pytest.mark.parametrize("value", [np.nan, np.inf])
+def test_out_of_core_rejects_nonfinite_values(tmp_path, value, panel):
+    X = panel(STEPS, SEED, 3)
+    X[17, 2] = value
+    X[3, 9] = value
+    with pytest.raises(ValueError, match=r"columns \[2, 9\]"):
+        stationarize_array(X)
+    with pytest.raises(ValueError, match=r"columns \[2\]"):
+        stationarize_chunked(X, tmp_path / "post.npy", group_size=5)
+    assert not (tmp_path / "post.npy").exists()
+    with pytest.raises(ValueError, match=r"columns \[2, 9\]"):
+        stationarize_chunked(X, tmp_path / "post.npy", group_size=12)
+    pytest.importorskip("pyarrow")
+    from stationarizer.outofcore import stationarize_parquet
+
+    df = pd.DataFrame(X, columns=[f"col{i}" for i in range(X.shape[1])])
+    source = str(tmp_path / "source.parquet")
+    df.to_parquet(source)
+    with pytest.raises(ValueError, match=r"columns \['col9'\]"):
+        stationarize_parquet(
+            source, str(tmp_path / "post.parquet"), columns=["col1", "col9"]
+        )
+    assert not (tmp_path / "post.parquet").exists()
+
+
+def test_plan_chunks():
+    # an explicit size always wins
+    assert _plan_chunks((1000, 50), 2 ** 20, "incremental", 7, 9, None) == (
+        7,
+        9,
+    )
+    group_size, batch_rows = _plan_chunks(
+        (1000, 50), 2 ** 20, "incremental", None, None, None
+    )
+    assert estimate_test_bytes(1000, group_size, "incremental") <= 2 ** 20
+    assert estimate_test_bytes(1000, group_size + 1, "incremental") > 2 ** 20
+    assert batch_rows == rows_within(2 ** 20, 50)
+    # aligned with on-disk chunks
+    group_size, batch_rows = _plan_chunks(
+        (1000, 50), 2 ** 20, "incremental", None, None, (100, 16)
+    )
+    assert group_size % 16 == 0 and batch_rows % 100 == 0
+
+
+def test_memory_estimates():
+    for backend in ["incremental", "vectorized", "statsmodels"]:
+        small = estimate_test_bytes(1000, 1, backend)
+        assert small < estimate_test_bytes(1000, 2, backend)
+        assert small < estimate_test_bytes(10000, 1, backend)
+        assert columns_within(small, 1000, backend) == 1
+        with pytest.raises(ValueError):
+            columns_within(small - 8, 1000, backend)
+    # the vectorized engine trades memory for speed
+    assert columns_within(2 ** 26, 1000, "vectorized") < columns_within(
+        2 ** 26, 1000, "incremental"
+    )
+    with pytest.raises(ValueError):
+        rows_within(100, 1000)
@@ -0,0 +1,70 @@
+"""Testing parallel execution of stationarization."""
+
+import numpy as np
+import pytest
+
+from stationarizer import simple_auto_stationarize
+from stationarizer.parallel import (
+    column_chunks,
+    effective_n_jobs,
+    ColumnPool,
+)
+
+STEPS = 300
+SEED = 3
+
+
+def test_column_chunks():
+    for ncols in [1, 3, 10, 101]:
+        for n_jobs in [1, 2, 7]:
+            chunks = column_chunks(ncols, n_jobs)
+            covered = [i for chunk in chunks for i in range(ncols)[chunk]]
+            assert covered == list(range(ncols))
+            assert all(chunk.stop > chunk.start for chunk in chunks)
+
+
+def test_effective_n_jobs():
+    assert effective_n_jobs(None) == 1
+    assert effective_n_jobs(3) == 3
+    assert effective_n_jobs(-1) >= 1
+    with pytest.raises(ValueError):
+        effective_n_jobs(0)
+
+
+@pytest.mark.parametrize("backend", ["statsmodels", "vectorized"])
+def test_parallel_matches_serial(backend, processes_df):
+    df = processes_df(STEPS, SEED, copies=3)
+    serial = simple_auto_stationarize(
+        df, get_conclusions=True, get_actions=True, backend=backend
+    )
+    parallel = simple_auto_stationarize(
+        df, get_conclusions=True, get_actions=True, backend=backend, n_jobs=2
+    )
+    assert list(parallel["conclusions"]) == list(df.columns)
+    assert parallel["conclusions"] == serial["conclusions"]
+    assert parallel["actions"] == serial["actions"]
+    assert list(parallel["postdf"].columns) == list(df.columns)
+    assert np.array_equal(
+        parallel["postdf"].values, serial["postdf"].values
+    )
+
+
+def _cumsum_into(X, scale, out):
+    out[:] = np.cumsum(X, axis=0) * scale
+    return X.sum(axis=0)
+
+
+def test_column_pool_shared_output():
+    X = np.asfortranarray(np.random.RandomState(0).normal(size=(50, 9)))
+    with ColumnPool(X, 2) as pool:
+        sums = pool.map(_cumsum_into, out=True, scale=2)
+        # later calls reuse the shared input, on any subset of columns
+        subset = pool.map(_cumsum_into, [1, 2, 7], out=True, scale=3)
+        out = pool.output()
+    assert np.allclose(np.concatenate(sums), X.sum(axis=0))
+    assert np.allclose(np.concatenate(subset), X[:, [1, 2, 7]].sum(axis=0))
+    expected = np.cumsum(X, axis=0) * 2
+    expected[:, [1, 2, 7]] *= 1.5
+    # the shared output outlives the pool
+    assert np.allclose(out, expected)
+    assert np.allclose(out[:10], expected[:10])
@@ -0,0 +1,107 @@
+"""Testing run profiling."""
+
+import json
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from stationarizer import (
+    simple_auto_stationarize,
+    stationarize_array,
+    UnitRootCache,
+)
+from stationarizer.profiling import Profiler, StageProfile
+
+STEPS = 300
+SEED = 14
+NAMES = ["gauss", "trend", "uroot"]
+ARRAY_STAGES = [
+    "validation",
+    "adf",
+    "kpss",
+    "multitest",
+    "conclusions",
+    "transform",
+    "trim",
+]
+
+
+def test_profile_report(processes_df):
+    df = processes_df(STEPS, SEED, NAMES)
+    results = simple_auto_stationarize(df, profile=True)
+    assert np.allclose(
+        results["postdf"].values, simple_auto_stationarize(df).values
+    )
+    report = results["profile"]
+    stages = [stage["stage"] for stage in report["stages"]]
+    assert stages == ["dataframe_input"] + ARRAY_STAGES + ["dataframe_output"]
+    for stage in report["stages"]:
+        assert stage["wall_time"] >= 0
+        assert stage["cpu_time"] >= 0
+        assert stage["peak_memory"] >= 0
+    assert report["wall_time"] == pytest.approx(
+        sum(stage["wall_time"] for stage in report["stages"])
+    )
+    for test in ["adf", "kpss"]:
+        durations = report["column_durations"][test]
+        assert len(durations) == df.shape[1]
+        assert all(duration > 0 for duration in durations)
+    # the transform stage allocates at least its output array
+    transform = report["stages"][stages.index("transform")]
+    assert transform["peak_memory"] >= df.values.nbytes
+    json.dumps(report)
+
+
+def test_profile_callback(processes_df):
+    df = processes_df(STEPS, SEED, NAMES)
+    completed = []
+    results = simple_auto_stationarize(
+        df, profile=completed.append, backend="vectorized"
+    )
+    assert all(isinstance(stage, StageProfile) for stage in completed)
+    assert [stage.stage for stage in completed] == [
+        stage["stage"] for stage in results["profile"]["stages"]
+    ]
+
+
+def test_validation_is_profiled(processes_df):
+    X = processes_df(STEPS, SEED, NAMES).values
+    X[5, 1] = np.nan
+    completed = []
+    with pytest.raises(ValueError, match=r"columns \[1\]"):
+        stationarize_array(X, profile=completed.append)
+    assert [stage.stage for stage in completed] == ["validation"]
+
+
+def test_profile_array_and_cache(processes_df):
+    X = processes_df(STEPS, SEED, NAMES).values
+    cache = UnitRootCache()
+    post, results = stationarize_array(X, cache=cache)
+    post, results, report = stationarize_array(X, cache=cache, profile=True)
+    assert [stage["stage"] for stage in report["stages"]] == ARRAY_STAGES
+    # cached columns are not tested again
+    assert report["column_durations"]["adf"] == [0.0] * X.shape[1]
+    with pytest.raises(TypeError):
+        stationarize_array(X, profile="yes")
+
+
+def test_callers_tracing_is_left_alone():
+    tracemalloc.start()
+    try:
+        big = np.ones(10 ** 6)
+        del big
+        caller_peak = tracemalloc.get_traced_memory()[1]
+        profiler = Profiler()
+        with profiler.stage("small"):
+            small = np.ones(10 ** 4)
+        assert tracemalloc.is_tracing()
+        # the caller's peak is not reset
+        assert tracemalloc.get_traced_memory()[1] == caller_peak
+        with profiler.stage("large"):
+            large = np.ones(2 * 10 ** 6)
+    finally:
+        tracemalloc.stop()
+    small_stage, large_stage = profiler.stages
+    assert small.nbytes <= small_stage.peak_memory < caller_peak
+    assert large_stage.peak_memory >= large.nbytes
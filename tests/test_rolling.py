@@ -0,0 +1,91 @@
+"""Testing rolling-window stationarity profiles."""
+
+import numpy as np
+import pytest
+
+from stationarizer import rolling_stationarity, stationarize_array
+from stationarizer.adf import adfuller_incremental
+from stationarizer.kpss import kpss_batch
+
+
+@pytest.mark.parametrize(
+    "window, stride", [(200, 1), (200, 37), (150, 300), (600, 5)]
+)
+def test_rolling_matches_window_tests(window, stride, panel):
+    X = panel(600, 1)
+    results = rolling_stationarity(X, window, stride)
+    expected_starts = np.arange(0, len(X) - window + 1, stride)
+    np.testing.assert_array_equal(results.starts, expected_starts)
+    for i, start in enumerate(results.starts):
+        Xw = X[start : start + window]
+        kpss_stat, _, kpss_lags = kpss_batch(Xw)
+        adf = np.array([adfuller_incremental(x)[:3] for x in Xw.T])
+        np.testing.assert_allclose(results.adf_stats[i], adf[:, 0], rtol=1e-6)
+        np.testing.assert_allclose(results.adf_pvals[i], adf[:, 1], rtol=1e-5)
+        np.testing.assert_array_equal(results.adf_lags[i], adf[:, 2])
+        np.testing.assert_allclose(
+            results.kpss_stats[i], kpss_stat, rtol=1e-6
+        )
+        np.testing.assert_array_equal(results.kpss_lags[i], kpss_lags)
+
+
+def test_rolling_conclusions(panel):
+    X = panel(900, 2)
+    results = rolling_stationarity(X, 300, 300)
+    for i, start in enumerate(results.starts):
+        window = np.asfortranarray(X[start : start + 300])
+        expected = stationarize_array(window)[1].conclusions
+        np.testing.assert_array_equal(results.conclusions[i], expected)
+
+
+def test_rolling_single_series(panel):
+    x = panel(400, 3)[:, 4]
+    results = rolling_stationarity(x, 250, 50)
+    assert results.adf_stats.shape == (4, 1)
+    expected = adfuller_incremental(x[150:400])[0]
+    np.testing.assert_allclose(results.adf_stats[-1, 0], expected, rtol=1e-6)
+
+
+def test_rolling_bad_arguments(panel):
+    X = panel(100, 4)
+    with pytest.raises(ValueError):
+        rolling_stationarity(X, 101)
+    with pytest.raises(ValueError):
+        rolling_stationarity(X, 50, stride=0)
+
+
+@pytest.mark.parametrize("value", [np.nan, -np.inf])
+def test_rolling_rejects_nonfinite_values(value, panel):
+    X = panel(400, 3)
+    X[120, 5] = value
+    with pytest.raises(ValueError, match=r"columns \[5\]"):
+        rolling_stationarity(X, 100, 20)
+    with pytest.raises(ValueError, match=r"columns \[0\]"):
+        rolling_stationarity(X[:, 5], 100, 20)
+
+
+def test_rolling_rejects_flat_windows(panel):
+    X = panel(400, 3)
+    X[150:260, 3] = X[150, 3]
+    with pytest.raises(
+        ValueError, match=r"columns \[3\] .* starting at rows \[150\]"
+    ):
+        rolling_stationarity(X, 100, 50)
+    # windows barely overlapping the flat segment are tested
+    results = rolling_stationarity(X[:, 2:4], 100, 100)
+    assert np.isfinite(results.adf_stats).all()
+    assert np.isfinite(results.kpss_stats).all()
+
+
+def test_rolling_lags_beyond_bound():
+    # over-differenced noise selects more KPSS lags than positively
+    # autocorrelated series ever do
+    rng = np.random.default_rng(0)
+    X = np.diff(rng.standard_normal((301, 3)), axis=0)
+    results = rolling_stationarity(X, 200, 50)
+    for i, start in enumerate(results.starts):
+        kpss_stat, _, kpss_lags = kpss_batch(X[start : start + 200])
+        np.testing.assert_allclose(
+            results.kpss_stats[i], kpss_stat, rtol=1e-6
+        )
+        np.testing.assert_array_equal(results.kpss_lags[i], kpss_lags)
@@ -0,0 +1,108 @@
+"""Testing persisted per-column test states."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stationarizer import (
+    UnitRootStateStore,
+    simple_auto_stationarize,
+    stationarize_array,
+)
+from stationarizer.monitor import StationarityMonitor
+
+
+def test_appended_rows_are_folded(assert_same_results, panel):
+    X = panel(3000, 0)
+    store = UnitRootStateStore()
+    for nrows in (2000, 2300, 2301, 3000):
+        post, results = stationarize_array(X[:nrows], test_state=store)
+        expected_post, expected = stationarize_array(X[:nrows])
+        assert_same_results(results, expected)
+        np.testing.assert_array_equal(post, expected_post)
+    info = store.state_info()
+    assert info.rebuilds == X.shape[1]
+    assert info.folds == 3 * X.shape[1]
+    assert info.currsize == X.shape[1]
+
+
+def test_changed_history_is_rebuilt(assert_same_results, panel):
+    X = panel(1500, 1)
+    store = UnitRootStateStore()
+    stationarize_array(X[:1000], test_state=store)
+    X[500, 3] += 1
+    results = stationarize_array(X, test_state=store)[1]
+    assert_same_results(results, stationarize_array(X)[1])
+    assert store.state_info().rebuilds == X.shape[1] + 1
+    # shorter histories are tested from scratch too
+    results = stationarize_array(X[:800], test_state=store)[1]
+    assert_same_results(results, stationarize_array(X[:800])[1])
+
+
+def test_states_persist(tmp_path, panel):
+    X = panel(1500, 2)
+    labels = [f"col{i}" for i in range(X.shape[1])]
+    df = pd.DataFrame(X, columns=labels)
+    store = UnitRootStateStore(state_dir=str(tmp_path))
+    simple_auto_stationarize(df.iloc[:1200], test_state=store)
+    assert len(list(tmp_path.iterdir())) == len(labels)
+    # a new store, as in a later run, picks the states up from disk
+    store = UnitRootStateStore(state_dir=str(tmp_path))
+    results = simple_auto_stationarize(
+        df, test_state=store, get_conclusions=True
+    )
+    expected = simple_auto_stationarize(df, get_conclusions=True)
+    assert store.state_info().folds == len(labels)
+    assert results["conclusions"] == expected["conclusions"]
+    pd.testing.assert_frame_equal(results["postdf"], expected["postdf"])
+    store.clear()
+    assert len(store) == 0
+
+
+def test_unreadable_states_are_rebuilt(tmp_path, assert_same_results, panel):
+    X = panel(1200, 3)
+    store = UnitRootStateStore(state_dir=str(tmp_path))
+    stationarize_array(X[:1000], test_state=store)
+    # truncate a state file, as if its writer had been interrupted
+    fpath = sorted(tmp_path.iterdir())[0]
+    fpath.write_bytes(fpath.read_bytes()[:10])
+    store = UnitRootStateStore(state_dir=str(tmp_path))
+    results = stationarize_array(X, test_state=store)[1]
+    assert_same_results(results, stationarize_array(X)[1])
+    assert store.state_info().rebuilds == 1
+    assert store.state_info().folds == X.shape[1] - 1
+    assert all(f.suffix == ".pkl" for f in tmp_path.iterdir())
+
+
+def test_failed_folds_leave_states_untouched(monkeypatch, panel):
+    X = panel(1500, 4)
+    labels = list(range(X.shape[1]))
+    store = UnitRootStateStore()
+    store.test(X[:1000], labels)
+    stored = [store.get(label) for label in labels]
+    fold = StationarityMonitor._fold
+
+    def failing_fold(self, rows):
+        # fails after folding part of the rows in
+        fold(self, rows[:1])
+        raise MemoryError
+
+    monkeypatch.setattr(StationarityMonitor, "_fold", failing_fold)
+    with pytest.raises(MemoryError):
+        store.test(X[:1200], labels)
+    monkeypatch.undo()
+    nan_X = X.copy()
+    nan_X[1100, 2] = np.nan
+    with pytest.raises(ValueError, match=r"columns \[2\]"):
+        store.test(nan_X, labels)
+    for label, (monitor, digest) in zip(labels, stored):
+        assert store.get(label) == (monitor, digest)
+        assert monitor.n_obs == 1000
+    # the untouched states are folded into as usual
+    statistics = store.test(X, labels)[0]
+    expected = UnitRootStateStore().test(X, labels)[0]
+    for field in statistics._fields:
+        np.testing.assert_allclose(
+            getattr(statistics, field), getattr(expected, field), rtol=1e-6
+        )
+    assert store.state_info().folds == X.shape[1]
@@ -0,0 +1,71 @@
+"""Testing the batched synthetic process generators."""
+
+import numpy as np
+
+from stationarizer import stationarize_array
+from stationarizer.core import CONCLUSIONS, SimpleConclusion
+from stationarizer.synthetic import (
+    Process,
+    PROCESSES,
+    GENERATORS,
+    spawn_generators,
+    process_panel,
+    trend_stationary,
+    unit_root,
+    white_noise,
+)
+
+STEPS = 500
+
+
+def test_generators_shapes_and_reproducibility():
+    for process, generator in GENERATORS.items():
+        X = generator(STEPS, 7, random_state=3)
+        assert X.shape == (STEPS, 7)
+        assert X.flags.f_contiguous
+        assert np.array_equal(X, generator(STEPS, 7, random_state=3))
+        # columns are independent realizations
+        assert not np.allclose(X[:, 0], X[:, 1])
+
+
+def test_generators_match_process_definitions():
+    noise = white_noise(STEPS, 4, std=2.0, random_state=5)
+    assert np.allclose(
+        trend_stationary(STEPS, 4, slope=0.5, std=2.0, random_state=5),
+        noise + 0.5 * np.arange(STEPS)[:, None],
+    )
+    assert np.allclose(
+        unit_root(STEPS, 4, std=2.0, random_state=5),
+        np.cumsum(noise, axis=0),
+    )
+    slopes = np.array([0.0, 1.0, 2.0, 3.0])
+    X = trend_stationary(STEPS, 4, slope=slopes, std=0.0, random_state=5)
+    assert np.allclose(X[-1], slopes * (STEPS - 1))
+
+
+def test_spawned_streams():
+    first = [rng.standard_normal(3) for rng in spawn_generators(4, 42)]
+    second = [rng.standard_normal(3) for rng in spawn_generators(4, 42)]
+    assert all(np.array_equal(a, b) for a, b in zip(first, second))
+    assert not np.allclose(first[0], first[1])
+
+
+def test_process_panel():
+    X, processes = process_panel(STEPS, 3, random_state=7)
+    assert X.shape == (STEPS, 3 * len(PROCESSES))
+    assert list(processes) == [p for p in PROCESSES for _ in range(3)]
+    out = np.empty((STEPS, 5), order="F")
+    X, processes = process_panel(
+        STEPS,
+        {Process.UNIT_ROOT: 2, Process.TREND_STATIONARY: 3},
+        random_state=7,
+        slope=2,
+        out=out,
+    )
+    assert X is out
+    assert list(processes) == [Process.UNIT_ROOT] * 2 + [
+        Process.TREND_STATIONARY
+    ] * 3
+    post, results = stationarize_array(X)
+    conclusions = [CONCLUSIONS[code] for code in results.conclusions]
+    assert conclusions[-3:] == [SimpleConclusion.TREND_STATIONARY] * 3